@@ -0,0 +1,56 @@
+import contextlib
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+import deepl
+
+from benchmarks.fake_deepl import FAKE_LICENSE, FakeDeeplServer, FakeLicenseManager
+from polyglot import connectors
+
+TEXTS: List[str] = [f"Entry number {index}" for index in range(600)]
+LATENCY: float = 0.005
+
+
+def client_per_request(server: FakeDeeplServer) -> Callable[[str], None]:
+    # * how every DeeplCommand used to work: a new deepl.Translator for each string
+    def translate(text: str) -> None:
+        deepl.Translator(FAKE_LICENSE, server_url=server.url).translate_text(
+            [text], target_lang="IT"
+        )
+
+    return translate
+
+
+def shared_connector(server: FakeDeeplServer) -> Callable[[str], None]:
+    connector: connectors.DeeplConnector = connectors.DeeplConnector(
+        FakeLicenseManager(), server_url=server.url
+    )
+    return lambda text: connector.translate(text, "IT")
+
+
+def run(name: str, get_translate: Callable, server: FakeDeeplServer) -> None:
+    translate: Callable[[str], None] = get_translate(server)
+    server.reset()
+    start: float = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(connectors.MAX_CONCURRENT_REQUESTS) as executor:
+            list(executor.map(translate, TEXTS))
+    elapsed: float = time.perf_counter() - start
+    print(
+        f"{name:<20} requests: {server.requests['/v2/translate']:>5}  "
+        f"connections: {server.connections:>5}  "
+        f"total: {elapsed:.2f}s  "
+        f"per request: {elapsed / len(TEXTS) * 1000:.2f}ms"
+    )
+
+
+def main() -> None:
+    with FakeDeeplServer(latency=LATENCY) as server:
+        run("client per request", client_per_request, server)
+        run("shared connector", shared_connector, server)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import time
+from typing import List
+
+import deepl
+
+from benchmarks.fake_deepl import FAKE_LICENSE, FakeDeeplServer
+from polyglot import commands
+
+DOCUMENTS: int = 5
+DOCUMENT_SECONDS: float = 3.0
+
+
+def busy_polling(translator: deepl.Translator, path: str) -> None:
+    # * how TranslateDocumentCommand used to wait: status checks without any pause
+    with open(path, "rb") as document:
+        handle: deepl.DocumentHandle = translator.translate_document_upload(
+            document, target_lang="IT", filename=path
+        )
+    while not translator.translate_document_get_status(handle).done:
+        pass
+    translator.translate_document_download(handle).content
+
+
+async def backoff_polling(translator: deepl.Translator, paths: List[str]) -> None:
+    await asyncio.gather(
+        *(
+            commands.TranslateDocumentCommand(translator, path, "IT", "").execute_async()
+            for path in paths
+        )
+    )
+
+
+def run(name: str, server: FakeDeeplServer, translate: callable) -> None:
+    server.reset()
+    start: float = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        translate()
+    elapsed: float = time.perf_counter() - start
+    print(
+        f"{name:<16} documents: {DOCUMENTS}  "
+        f"status requests: {server.requests['/v2/document/status']:>6}  "
+        f"total: {elapsed:.2f}s"
+    )
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        paths: List[str] = []
+        for index in range(DOCUMENTS):
+            path: str = os.path.join(directory, f"document_{index}.docx")
+            with open(path, "wb") as document:
+                document.write(os.urandom(1024))
+            paths.append(path)
+
+        with FakeDeeplServer(document_seconds=DOCUMENT_SECONDS) as server:
+            translator: deepl.Translator = deepl.Translator(
+                FAKE_LICENSE, server_url=server.url
+            )
+            run(
+                "busy polling",
+                server,
+                lambda: [busy_polling(translator, path) for path in paths],
+            )
+            run(
+                "backoff polling",
+                server,
+                lambda: asyncio.run(backoff_polling(translator, paths)),
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+import json
+import random
+import sys
+import threading
+import time
+import urllib.parse
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+from polyglot import license
+
+FAKE_LICENSE: str = "00000000-0000-0000-0000-000000000000:fx"
+
+
+class FakeLicenseManager(license.LicenseManager):
+    def get_license(self) -> str:
+        return FAKE_LICENSE
+
+    def set_license(self) -> None:
+        pass
+
+
+class FakeDeeplServer:
+    """Local stand-in for the DeepL endpoints used by polyglot."""
+
+    requests: Counter
+    errors: Counter
+    connections: int
+    characters: int
+    latency: float
+    document_seconds: float
+    error_rate: float
+    error_status: int
+    rate_limit: Optional[float]
+
+    __documents: Dict[str, dict]
+    __server: ThreadingHTTPServer
+    __lock: threading.Lock
+    __random: random.Random
+    __tokens: float
+    __last_refill: float
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        document_seconds: float = 1.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        rate_limit: Optional[float] = None,
+        seed: int = 0,
+    ) -> None:
+        # * error_rate is the share of requests answered with error_status, rate_limit the requests per second over which 429 is answered
+        self.requests = Counter()
+        self.errors = Counter()
+        self.connections = 0
+        self.characters = 0
+        self.latency = latency
+        self.document_seconds = document_seconds
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit = rate_limit
+        self.__documents = {}
+        self.__lock = threading.Lock()
+        self.__random = random.Random(seed)
+        self.__tokens = rate_limit or 0.0
+        self.__last_refill = time.monotonic()
+        self.__server = _Server(("127.0.0.1", 0), _Handler)
+        self.__server.fake = self
+
+    def __enter__(self) -> "FakeDeeplServer":
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.__server.server_port}"
+
+    def start(self) -> None:
+        threading.Thread(target=self.__server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        self.__server.shutdown()
+        self.__server.server_close()
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.requests = Counter()
+            self.errors = Counter()
+            self.connections = 0
+            self.characters = 0
+
+    def count_connection(self) -> None:
+        with self.__lock:
+            self.connections += 1
+
+    def handle(self, request: "_Handler") -> None:
+        path: str = urllib.parse.urlparse(request.path).path
+        length: int = int(request.headers.get("Content-Length", 0))
+        body: bytes = request.rfile.read(length)
+        endpoint: str = self.__get_endpoint(path)
+
+        with self.__lock:
+            self.requests[endpoint] += 1
+            error_status: Optional[int] = self.__get_error_status(endpoint)
+            if error_status is not None:
+                self.errors[endpoint] += 1
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if error_status is not None:
+            self.__send_json(request, {"message": "Fake error"}, error_status)
+            return
+
+        if endpoint == "/v2/document":
+            self.__send_json(request, self.__upload_document(body))
+            return
+
+        # * blank texts are answered too, or the translations after them would shift
+        data: dict = urllib.parse.parse_qs(body.decode(), keep_blank_values=True)
+        if endpoint == "/v2/document/status":
+            self.__send_json(request, self.__get_document_status(path))
+        elif endpoint == "/v2/document/result":
+            self.__send_document(request, path)
+        elif endpoint == "/v2/translate":
+            self.__send_json(request, self.__translate(data))
+        elif path == "/v2/usage":
+            self.__send_json(
+                request, {"character_count": 0, "character_limit": 500000}
+            )
+        elif path == "/v2/languages":
+            self.__send_json(request, self.__languages(data))
+        else:
+            self.__send_json(request, {"message": "Not found"}, 404)
+
+    def __get_error_status(self, endpoint: str) -> Optional[int]:
+        # * the usage and the languages always answer, they are not part of the workloads
+        if endpoint in ("/v2/usage", "/v2/languages"):
+            return None
+        if self.rate_limit is not None:
+            now: float = time.monotonic()
+            self.__tokens = min(
+                self.rate_limit,
+                self.__tokens + (now - self.__last_refill) * self.rate_limit,
+            )
+            self.__last_refill = now
+            if self.__tokens < 1:
+                return 429
+            self.__tokens -= 1
+        if self.error_rate and self.__random.random() < self.error_rate:
+            return self.error_status
+        return None
+
+    def __get_endpoint(self, path: str) -> str:
+        # * documents have their ids in the path, they are counted together
+        if path.startswith("/v2/document/"):
+            return "/v2/document/result" if path.endswith("/result") else "/v2/document/status"
+        return path
+
+    def __upload_document(self, body: bytes) -> dict:
+        document_id: str = uuid.uuid4().hex
+        with self.__lock:
+            self.__documents[document_id] = {
+                "uploaded": time.monotonic(),
+                "characters": len(body),
+            }
+            self.characters += len(body)
+        return {"document_id": document_id, "document_key": uuid.uuid4().hex}
+
+    def __get_document_status(self, path: str) -> dict:
+        document_id: str = path.split("/")[3]
+        document: dict = self.__documents[document_id]
+        remaining: float = (
+            document["uploaded"] + self.document_seconds - time.monotonic()
+        )
+        if remaining > 0:
+            return {
+                "document_id": document_id,
+                "status": "translating",
+                "seconds_remaining": int(remaining) + 1,
+            }
+        return {
+            "document_id": document_id,
+            "status": "done",
+            "billed_characters": document["characters"],
+        }
+
+    def __send_document(self, request: "_Handler", path: str) -> None:
+        document_id: str = path.split("/")[3]
+        content: bytes = b"translated" * self.__documents[document_id]["characters"]
+        request.send_response(200)
+        request.send_header("Content-Type", "application/octet-stream")
+        request.send_header("Content-Length", str(len(content)))
+        request.end_headers()
+        request.wfile.write(content)
+
+    def __translate(self, data: dict) -> dict:
+        target_lang: str = data["target_lang"][0]
+        with self.__lock:
+            self.characters += sum(len(text) for text in data.get("text", []))
+        return {
+            "translations": [
+                {"detected_source_language": "EN", "text": f"{target_lang}:{text}"}
+                for text in data.get("text", [])
+            ]
+        }
+
+    def __languages(self, data: dict) -> list:
+        # * like DeepL, English is a single source language and two target ones
+        if data.get("type", [""])[0] == "target":
+            return [
+                {"language": "EN-US", "name": "English (American)"},
+                {"language": "EN-GB", "name": "English (British)"},
+                {"language": "IT", "name": "Italian", "supports_formality": True},
+                {"language": "DE", "name": "German", "supports_formality": True},
+            ]
+        return [
+            {"language": "EN", "name": "English"},
+            {"language": "IT", "name": "Italian"},
+            {"language": "DE", "name": "German"},
+        ]
+
+    def __send_json(self, request: "_Handler", body: Any, status: int = 200) -> None:
+        content: bytes = json.dumps(body).encode()
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(content)))
+        request.end_headers()
+        request.wfile.write(content)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # * the default backlog of 5 drops connections opened together, they are retried only after a second
+    request_queue_size = 128
+    fake: FakeDeeplServer
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # * clients dropping their keep-alive connections are not errors
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # * the headers and the body are written apart, with Nagle the body waits for the delayed ACK of the client
+    disable_nagle_algorithm = True
+    server: _Server
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.fake.count_connection()
+
+    def do_GET(self) -> None:
+        self.server.fake.handle(self)
+
+    def do_POST(self) -> None:
+        self.server.fake.handle(self)
+
+    def log_message(self, *args: Any) -> None:
+        pass
@@ -0,0 +1,175 @@
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional, Set, Tuple
+
+from benchmarks.fake_deepl import FAKE_LICENSE, FakeDeeplServer
+
+RUNS: int = 7
+
+# * -X importtime misses the modules imported by importlib, so the child lists the modules it ended up with
+MODULES_REPORT: str = (
+    "import atexit, sys\n"
+    "atexit.register(lambda: sys.stderr.write("
+    "''.join(f'module: {name}\\n' for name in sys.modules)))\n"
+)
+
+# * what each command runs, in a new interpreter every time
+SCENARIOS: Dict[str, str] = {
+    "startup": "import polyglot.__main__",
+    "help": (
+        "import sys\n"
+        "from polyglot import __main__\n"
+        "sys.argv = ['polyglot', '--help']\n"
+        "try:\n"
+        "    __main__.main()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+    ),
+    "set-license": (
+        "from polyglot import arguments, license, polyglot\n"
+        "class LicenseManager(license.LicenseManager):\n"
+        "    def get_license(self):\n"
+        "        return ''\n"
+        "    def set_license(self):\n"
+        "        pass\n"
+        "polyglot.Polyglot(arguments.Arguments('set-license', '', [], '', '', "
+        "LicenseManager())).execute_command()\n"
+    ),
+    # * a whole run against the fake server, the server and the files are set up by main
+    "translate-txt": (
+        "import os\n"
+        "from polyglot import arguments, connectors, license, polyglot\n"
+        "class LicenseManager(license.LicenseManager):\n"
+        "    def get_license(self):\n"
+        "        return os.environ['DEEPL_LICENSE']\n"
+        "    def set_license(self):\n"
+        "        pass\n"
+        "class Connector(connectors.AsyncDeeplConnector):\n"
+        "    def __init__(self, *args, **kwargs):\n"
+        "        super().__init__(*args, server_url=os.environ['FAKE_DEEPL_URL'], **kwargs)\n"
+        "connectors.AsyncDeeplConnector = Connector\n"
+        "polyglot.Polyglot(arguments.Arguments('translate', os.environ['SOURCE_FILE'], "
+        "['IT'], os.environ['OUTPUT_DIRECTORY'], '', LicenseManager(), "
+        "output_mode='quiet')).execute_command()\n"
+    ),
+}
+
+# * none of them is needed before a file is translated
+HEAVY_MODULES: List[str] = [
+    "aiohttp",
+    "deepl",
+    "polib",
+    "progressbar",
+    "requests",
+    "sqlite3",
+    "polyglot.connectors",
+    "polyglot.handlers",
+    "polyglot.translators",
+]
+# * the heavy modules a scenario cannot do without, the others are still regressions
+NEEDED_MODULES: Dict[str, List[str]] = {
+    "translate-txt": [
+        "aiohttp",
+        "deepl",
+        "requests",
+        "sqlite3",
+        "polyglot.connectors",
+        "polyglot.handlers",
+        "polyglot.translators",
+    ],
+}
+
+
+def measure(
+    code: str, env: Optional[Dict[str, str]] = None
+) -> Tuple[float, Set[str]]:
+    # * the time of the modules imported by site, like the .pth files of the environment, is not counted
+    stderr: str = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", MODULES_REPORT + code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    ).stderr
+
+    microseconds: int = 0
+    modules: Set[str] = set()
+    after_site: bool = False
+    for line in stderr.splitlines():
+        if line.startswith("module: "):
+            modules.add(line[len("module: ") :])
+            continue
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip() == "cumulative":
+            continue
+        module: str = name.strip()
+        top_level: bool = name.startswith(" ") and not name.startswith("  ")
+        if top_level and module == "site":
+            after_site = True
+            continue
+        if after_site and top_level:
+            microseconds += int(cumulative)
+    return microseconds / 1000, modules
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory, FakeDeeplServer() as server:
+        source_file: str = os.path.join(directory, "source.txt")
+        with open(source_file, "w") as source:
+            source.write("Hello world.\n\nA second paragraph.\n")
+        # * the memory and the language cache go in the temporary home, the first run fills them
+        env: Dict[str, str] = {
+            **os.environ,
+            "HOME": directory,
+            "DEEPL_LICENSE": FAKE_LICENSE,
+            "FAKE_DEEPL_URL": server.url,
+            "SOURCE_FILE": source_file,
+            "OUTPUT_DIRECTORY": directory,
+        }
+        regressions: List[str] = run_scenarios(env)
+
+    if regressions:
+        print("\n".join(regressions))
+        sys.exit(1)
+
+
+def run_scenarios(env: Dict[str, str]) -> List[str]:
+    # * what an empty interpreter has already imported, with site and the environment, is not counted
+    _, baseline = measure("pass", env)
+    regressions: List[str] = []
+    for name, code in SCENARIOS.items():
+        results: List[Tuple[float, Set[str]]] = [
+            (time, modules - baseline)
+            for time, modules in (measure(code, env) for _ in range(RUNS))
+        ]
+        heavy_modules: List[str] = sorted(
+            module for module in HEAVY_MODULES if module in results[0][1]
+        )
+        missing_modules: List[str] = sorted(
+            set(NEEDED_MODULES.get(name, [])) - results[0][1]
+        )
+        imports: float = statistics.median(len(modules) for _, modules in results)
+        milliseconds: float = statistics.median(time for time, _ in results)
+        print(
+            f"{name:<14} imports: {imports:>5.0f}  median: {milliseconds:>7.1f}ms  "
+            f"heavy modules: {', '.join(heavy_modules) or 'none'}"
+        )
+        regressions.extend(
+            f"{name} imports {module}"
+            for module in heavy_modules
+            if module not in NEEDED_MODULES.get(name, [])
+        )
+        # * a needed module that is not found means the measure itself is broken
+        regressions.extend(
+            f"{name} does not import {module}" for module in missing_modules
+        )
+    return regressions
+
+
+if __name__ == "__main__":
+    main()
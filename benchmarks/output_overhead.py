@@ -0,0 +1,113 @@
+import multiprocessing
+import os
+import pty
+import threading
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.fake_deepl import FakeLicenseManager
+from polyglot import commands, connectors, languages, output, translators
+from polyglot.utils import DownloadedDocumentStream
+
+ENTRIES: int = 50000
+
+
+class InstantConnector(connectors.EngineConnector):
+
+    # * no network at all, so only the output is measured
+    max_batch_size: int = 50
+    max_batch_bytes: int = 120 * 1024
+
+    def print_usage_info(self) -> None:
+        pass
+
+    def get_supported_languages(self) -> languages.SupportedLanguages:
+        return languages.SupportedLanguages([], [])
+
+    def get_remaining_characters(self) -> Optional[int]:
+        return None
+
+    def translate(self, content: str, target_lang: str, source_lang: str = "") -> str:
+        return self.translate_batch([content], target_lang, source_lang)[0]
+
+    def translate_batch(
+        self,
+        contents: List[str],
+        target_lang: str,
+        source_lang: str = "",
+        tag_handling: Optional[str] = None,
+        ignore_tags: Optional[List[str]] = None,
+    ) -> List[str]:
+        translations: List[str] = [f"{target_lang}:{content}" for content in contents]
+        commands.print_translations(contents, translations, 150)
+        return translations
+
+    def translate_document(
+        self, source_file: str, target_lang: str, source_lang: str = ""
+    ) -> DownloadedDocumentStream:
+        return None
+
+
+def measure(
+    mode: str,
+    progress_interval: float,
+    terminal_name: str,
+    results: multiprocessing.Queue,
+) -> None:
+    # * stdout and stderr are a pseudo terminal, like a run from a shell
+    terminal: int = os.open(terminal_name, os.O_WRONLY)
+    os.dup2(terminal, 1)
+    os.dup2(terminal, 2)
+    output.set_mode(mode)
+    output.PROGRESS_INTERVAL = progress_interval
+
+    content: Dict[str, str] = {
+        f"key_{index}": f"Entry number {index}" for index in range(ENTRIES)
+    }
+    translator: translators.DictionaryTranslator = translators.DictionaryTranslator(
+        "IT", "", InstantConnector(FakeLicenseManager())
+    )
+    start: float = time.perf_counter()
+    with translator:
+        translator.translate(content)
+    results.put(time.perf_counter() - start)
+
+
+def drain(terminal: int) -> None:
+    try:
+        while os.read(terminal, 64 * 1024):
+            pass
+    except OSError:
+        pass
+
+
+def main() -> None:
+    context = multiprocessing.get_context("spawn")
+    variants: Dict[str, tuple] = {
+        "text, bar on every entry": (output.TEXT, 0.0),
+        "text": (output.TEXT, output.PROGRESS_INTERVAL),
+        "json": (output.JSON, output.PROGRESS_INTERVAL),
+        "quiet": (output.QUIET, output.PROGRESS_INTERVAL),
+    }
+
+    for name, (mode, progress_interval) in variants.items():
+        controller, terminal = pty.openpty()
+        threading.Thread(target=drain, args=(controller,), daemon=True).start()
+        results: multiprocessing.Queue = context.Queue()
+        process = context.Process(
+            target=measure,
+            args=(mode, progress_interval, os.ttyname(terminal), results),
+        )
+        process.start()
+        elapsed: float = results.get()
+        process.join()
+        os.close(terminal)
+        os.close(controller)
+        print(
+            f"{name:<26} entries: {ENTRIES}  total: {elapsed:.2f}s  "
+            f"per entry: {elapsed / ENTRIES * 1000000:.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from typing import Callable, Dict, Tuple
+
+import polib
+
+from polyglot import handlers
+
+ENTRIES: int = 100000
+
+
+def write_catalog(path: str) -> None:
+    with open(path, "w") as catalog:
+        catalog.write(
+            'msgid ""\nmsgstr ""\n'
+            '"Content-Type: text/plain; charset=UTF-8\\n"\n'
+            '"Plural-Forms: nplurals=2; plural=(n != 1);\\n"\n'
+        )
+        for index in range(ENTRIES):
+            catalog.write(f"\n#: src/module_{index % 100}.py:{index}\n")
+            if index % 10 == 0:
+                catalog.write(
+                    f'msgid "{index} item"\nmsgid_plural "{index} items"\n'
+                    'msgstr[0] ""\nmsgstr[1] ""\n'
+                )
+            else:
+                if index % 7 == 0:
+                    catalog.write('msgctxt "button"\n')
+                catalog.write(f'msgid "Message number {index}"\nmsgstr ""\n')
+
+
+def translate(content: dict) -> dict:
+    return {
+        key: {index: f"IT:{text}" for index, text in value.items()}
+        if isinstance(value, dict)
+        else f"IT:{value}"
+        for key, value in content.items()
+    }
+
+
+def polib_handler(source: str, directory: str) -> Tuple[float, float]:
+    # * how POHandler used to work: the catalog is parsed again to write it
+    start: float = time.perf_counter()
+    content: dict = {}
+    occurrences: dict = {}
+    for entry in polib.pofile(source):
+        content[entry.msgid] = entry.msgid if entry.msgstr == "" else entry.msgstr
+        occurrences[entry.msgid] = entry.occurrences
+    read_time: float = time.perf_counter() - start
+
+    translated_content: dict = translate(content)
+    start = time.perf_counter()
+    pofile: polib.POFile = polib.POFile()
+    pofile.metadata = polib.pofile(source).metadata
+    for key, value in content.items():
+        pofile.append(
+            polib.POEntry(
+                msgid=key,
+                msgstr=translated_content.get(key, value),
+                occurrences=occurrences[key],
+            )
+        )
+    pofile.save(os.path.join(directory, "polib.po"))
+    pofile.save_as_mofile(os.path.join(directory, "polib.mo"))
+    return read_time, time.perf_counter() - start
+
+
+def po_handler(source: str, directory: str) -> Tuple[float, float]:
+    start: float = time.perf_counter()
+    handler: handlers.POHandler = handlers.POHandler(source, directory, "IT")
+    content: dict = handler.read()
+    read_time: float = time.perf_counter() - start
+
+    translated_content: dict = translate(content)
+    start = time.perf_counter()
+    handler.write(translated_content)
+    return read_time, time.perf_counter() - start
+
+
+def measure(
+    handler: Callable[[str, str], Tuple[float, float]],
+    source: str,
+    results: multiprocessing.Queue,
+) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.devnull, "w") as devnull:
+            os.dup2(devnull.fileno(), 1)
+            read_time, write_time = handler(source, directory)
+    peak_rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results.put((read_time, write_time, peak_rss))
+
+
+def main() -> None:
+    # * each handler runs in a new process, so the peak RSS of one does not hide the other
+    context = multiprocessing.get_context("spawn")
+    handlers_by_name: Dict[str, Callable[[str, str], Tuple[float, float]]] = {
+        "polib": polib_handler,
+        "POHandler": po_handler,
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        source: str = os.path.join(directory, "catalog.po")
+        write_catalog(source)
+
+        for name, handler in handlers_by_name.items():
+            results: multiprocessing.Queue = context.Queue()
+            process = context.Process(target=measure, args=(handler, source, results))
+            process.start()
+            read_time, write_time, peak_rss = results.get()
+            process.join()
+            print(
+                f"{name:<10} entries: {ENTRIES}  "
+                f"parse: {read_time:.2f}s  write: {write_time:.2f}s  "
+                f"peak RSS: {peak_rss / 1024:.0f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
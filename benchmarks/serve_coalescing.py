@@ -0,0 +1,130 @@
+import argparse
+import functools
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from benchmarks.fake_deepl import FakeDeeplServer, FakeLicenseManager
+from polyglot import connectors, languages, output, server, translators
+
+LANGUAGES: languages.SupportedLanguages = languages.SupportedLanguages(
+    [languages.Language("EN", "English")], [languages.Language("IT", "Italian")]
+)
+
+
+def get_texts(client: int, texts: int, shared_rate: float) -> List[str]:
+    # * the shared texts are the same for every client, like the strings of a common library
+    shared: int = int(texts * shared_rate)
+    return [f"Shared string number {index}" for index in range(shared)] + [
+        f"String {index} of client {client}" for index in range(texts - shared)
+    ]
+
+
+def run_clients(clients: int, translate: Callable[[int], None]) -> float:
+    start: float = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        list(executor.map(translate, range(clients)))
+    return time.perf_counter() - start
+
+
+def measure_processes(
+    fake_server: FakeDeeplServer, clients: int, texts: int, shared_rate: float
+) -> float:
+    # * every client with its own connector, like a CLI run for each build agent
+    def translate(client: int) -> None:
+        connector: connectors.AsyncDeeplConnector = connectors.AsyncDeeplConnector(
+            FakeLicenseManager(), server_url=fake_server.url
+        )
+        content: dict = dict(enumerate(get_texts(client, texts, shared_rate)))
+        with translators.DictionaryTranslator(
+            "IT", "", connector, show_progress=False, show_summary=False
+        ) as translator:
+            translator.translate(content)
+        connector.close()
+
+    return run_clients(clients, translate)
+
+
+def measure_gateway(
+    fake_server: FakeDeeplServer,
+    clients: int,
+    texts: int,
+    shared_rate: float,
+    texts_per_request: int,
+) -> float:
+    connector: connectors.AsyncDeeplConnector = connectors.AsyncDeeplConnector(
+        FakeLicenseManager(), server_url=fake_server.url
+    )
+    gateway: server.Gateway = server.Gateway(connector, LANGUAGES)
+    translation_server: server.TranslationServer = server.TranslationServer(0, gateway)
+    threading.Thread(target=translation_server.serve_forever, daemon=True).start()
+
+    def translate(client: int) -> None:
+        # * one connection for each client, kept alive like a build agent would
+        client_texts: List[str] = get_texts(client, texts, shared_rate)
+        connection: http.client.HTTPConnection = http.client.HTTPConnection(
+            *translation_server.server_address
+        )
+        for index in range(0, len(client_texts), texts_per_request):
+            body: dict = {
+                "texts": client_texts[index : index + texts_per_request],
+                "target_lang": "IT",
+            }
+            connection.request("POST", "/translate", body=json.dumps(body))
+            response: http.client.HTTPResponse = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                raise RuntimeError(f"The gateway answered {response.status}.")
+        connection.close()
+
+    elapsed: float = run_clients(clients, translate)
+    translation_server.shutdown()
+    translation_server.server_close()
+    gateway.close()
+    connector.close()
+    return elapsed
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Compare uncoordinated clients with the serve gateway against a local fake DeepL server."
+    )
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--texts", type=int, default=50, help="Texts for each client.")
+    parser.add_argument(
+        "--shared-rate",
+        type=float,
+        default=0.5,
+        help="Share of the texts that every client translates.",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="Seconds added to every request."
+    )
+    options: argparse.Namespace = parser.parse_args()
+
+    output.set_mode(output.QUIET)
+    # * one text for each request is the worst case, the gateway has to batch them again
+    variants: Dict[str, Callable[..., float]] = {
+        "processes": measure_processes,
+        "gateway": functools.partial(measure_gateway, texts_per_request=options.texts),
+        "gateway, one text per request": functools.partial(
+            measure_gateway, texts_per_request=1
+        ),
+    }
+    for name, measure in variants.items():
+        with FakeDeeplServer(latency=options.latency) as fake_server:
+            elapsed: float = measure(
+                fake_server, options.clients, options.texts, options.shared_rate
+            )
+            print(
+                f"{name:<30} clients: {options.clients}  total: {elapsed:>6.2f}s  "
+                f"requests: {sum(fake_server.requests.values()):>5}  "
+                f"characters: {fake_server.characters:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
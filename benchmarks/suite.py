@@ -0,0 +1,256 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Callable, Dict, List, NamedTuple
+
+from benchmarks.fake_deepl import FakeDeeplServer, FakeLicenseManager
+from polyglot import connectors, handlers, output, translators
+from polyglot.utils import TranslatedDocument
+
+# * entries for JSON and PO, paragraphs for text, files for documents
+SIZES: Dict[str, Dict[str, int]] = {
+    "small": {"json": 1000, "po": 1000, "text": 1000, "documents": 1},
+    "medium": {"json": 10000, "po": 10000, "text": 10000, "documents": 5},
+    "large": {"json": 50000, "po": 50000, "text": 50000, "documents": 10},
+}
+WORDS: List[str] = (
+    "the file could not be saved because of an unknown error please try again "
+    "later open settings cancel delete all items selected {count} %s <b>bold</b>"
+).split()
+DUPLICATE_RATE: float = 0.1
+
+
+class Result(NamedTuple):
+    workload: str
+    size: str
+    units: int
+    seconds: float
+    requests: int
+    errors: int
+    characters: int
+    failed: bool
+
+
+def get_sentence(generator: random.Random) -> str:
+    return " ".join(generator.choices(WORDS, k=generator.randint(2, 12))).capitalize()
+
+
+def get_sentences(count: int, generator: random.Random) -> List[str]:
+    # * some sentences are repeated, like the labels of a real catalog
+    sentences: List[str] = []
+    for _ in range(count):
+        if sentences and generator.random() < DUPLICATE_RATE:
+            sentences.append(generator.choice(sentences))
+        else:
+            sentences.append(get_sentence(generator))
+    return sentences
+
+
+def write_json(directory: str, count: int, generator: random.Random) -> List[str]:
+    path: str = os.path.join(directory, "source.json")
+    content: dict = {}
+    for index, sentence in enumerate(get_sentences(count, generator)):
+        content.setdefault(f"section_{index // 100}", {})[f"key_{index}"] = sentence
+    with open(path, "w") as source:
+        json.dump(content, source, indent=2)
+    return [path]
+
+
+def write_po(directory: str, count: int, generator: random.Random) -> List[str]:
+    path: str = os.path.join(directory, "source.po")
+    with open(path, "w") as source:
+        source.write(
+            'msgid ""\nmsgstr ""\n"Content-Type: text/plain; charset=UTF-8\\n"\n'
+        )
+        for index, sentence in enumerate(get_sentences(count, generator)):
+            source.write(f"\n#: src/module.py:{index}\n")
+            source.write(f'msgctxt "{index}"\nmsgid "{sentence}"\nmsgstr ""\n')
+    return [path]
+
+
+def write_text(directory: str, count: int, generator: random.Random) -> List[str]:
+    path: str = os.path.join(directory, "source.txt")
+    with open(path, "w") as source:
+        for sentence in get_sentences(count, generator):
+            source.write(f"{sentence}. {get_sentence(generator)}.\n\n")
+    return [path]
+
+
+def write_documents(directory: str, count: int, generator: random.Random) -> List[str]:
+    paths: List[str] = []
+    for index in range(count):
+        path: str = os.path.join(directory, f"document_{index}.docx")
+        with open(path, "wb") as document:
+            document.write(generator.getrandbits(8 * 16384).to_bytes(16384, "little"))
+        paths.append(path)
+    return paths
+
+
+def translate_dictionaries(
+    paths: List[str], directory: str, connector: connectors.AsyncDeeplConnector
+) -> None:
+    for path in paths:
+        handler: handlers.FileHandler = (
+            handlers.JSONHandler(path, directory, "IT")
+            if path.endswith(".json")
+            else handlers.POHandler(path, directory, "IT")
+        )
+        with translators.DictionaryTranslator(
+            "IT", "", connector, show_progress=False
+        ) as translator:
+            handler.write(translator.translate(handler.read()))
+
+
+def translate_text(
+    paths: List[str], directory: str, connector: connectors.AsyncDeeplConnector
+) -> None:
+    for path in paths:
+        handler: handlers.TextHandler = handlers.TextHandler(path, directory, "IT")
+        translator: translators.TextTranslator = translators.TextTranslator(
+            "IT", "", connector
+        )
+        handler.write(translator.translate(handler.read()))
+
+
+def translate_documents(
+    paths: List[str], directory: str, connector: connectors.AsyncDeeplConnector
+) -> None:
+    async def translate_document(path: str) -> None:
+        handler: handlers.DocumentHandler = handlers.DocumentHandler(
+            path, directory, "IT"
+        )
+        document: TranslatedDocument = await translators.DocumentTranslator(
+            "IT", "", connector
+        ).translate_async(handler.read())
+        handler.write(document.stream)
+
+    async def translate_all() -> None:
+        await asyncio.gather(*(translate_document(path) for path in paths))
+
+    asyncio.run(translate_all())
+
+
+WORKLOADS: Dict[str, tuple] = {
+    "json": (write_json, translate_dictionaries),
+    "po": (write_po, translate_dictionaries),
+    "text": (write_text, translate_text),
+    "documents": (write_documents, translate_documents),
+}
+
+
+def run(
+    workload: str,
+    size: str,
+    server: FakeDeeplServer,
+    seed: int,
+) -> Result:
+    write_sources: Callable[[str, int, random.Random], List[str]]
+    translate: Callable[[List[str], str, connectors.AsyncDeeplConnector], None]
+    write_sources, translate = WORKLOADS[workload]
+    units: int = SIZES[size][workload]
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths: List[str] = write_sources(directory, units, random.Random(seed))
+        output_directory: str = os.path.join(directory, "output")
+        os.mkdir(output_directory)
+
+        connector: connectors.AsyncDeeplConnector = connectors.AsyncDeeplConnector(
+            FakeLicenseManager(), server_url=server.url
+        )
+        server.reset()
+        failed: bool = False
+        start: float = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                translate(paths, output_directory, connector)
+        except (SystemExit, Exception):
+            # ! DeeplError quits and the documents raise, the run is reported as failed and the others go on
+            failed = True
+        seconds: float = time.perf_counter() - start
+        connector.close()
+
+    return Result(
+        workload,
+        size,
+        units,
+        seconds,
+        sum(server.requests.values()),
+        sum(server.errors.values()),
+        server.characters,
+        failed,
+    )
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Translate JSON, PO, text and document workloads against a local fake DeepL server."
+    )
+    parser.add_argument(
+        "--workloads", nargs="+", choices=list(WORKLOADS), default=list(WORKLOADS)
+    )
+    parser.add_argument(
+        "--sizes", nargs="+", choices=list(SIZES), default=["small", "medium"]
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.01, help="Seconds added to every request."
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Share of requests answered with 503.",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=None,
+        help="Requests per second over which 429 is answered.",
+    )
+    parser.add_argument(
+        "--document-seconds",
+        type=float,
+        default=0.5,
+        help="Seconds the documents take to be translated.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output", help="Write the results to this JSON file, to compare runs."
+    )
+    options: argparse.Namespace = parser.parse_args()
+
+    output.set_mode(output.QUIET)
+    results: List[Result] = []
+    for size in options.sizes:
+        for workload in options.workloads:
+            # * a new server for every run, so its errors are drawn from the same seed
+            with FakeDeeplServer(
+                latency=options.latency,
+                document_seconds=options.document_seconds,
+                error_rate=options.error_rate,
+                rate_limit=options.rate_limit,
+                seed=options.seed,
+            ) as server:
+                result: Result = run(workload, size, server, options.seed)
+            results.append(result)
+            print(
+                f"{result.workload:<10} {result.size:<7} units: {result.units:>6}  "
+                f"total: {result.seconds:>6.2f}s  "
+                f"per second: {result.units / result.seconds:>8.0f}  "
+                f"requests: {result.requests:>5}  errors: {result.errors:>4}  "
+                f"characters: {result.characters:>8}"
+                + ("  FAILED" if result.failed else "")
+            )
+
+    if options.output:
+        with open(options.output, "w") as results_file:
+            json.dump([result._asdict() for result in results], results_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
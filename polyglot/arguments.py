@@ -1,11 +1,18 @@
 import argparse
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from typing import Optional
 
-from polyglot import license
+from polyglot import license, output
+from polyglot.utils import JOB_FILE, MAX_CONCURRENT_REQUESTS, SERVE_PORT, SHARD_SIZE
 
 ACTIONS: list = [
     "translate",
+    "watch",
+    "serve",
+    "job-create",
+    "job-work",
+    "job-merge",
     "set-license",
     "languages",
     "info",
@@ -16,10 +23,24 @@ ACTIONS: list = [
 class Arguments:
     action: str
     source_file: str
-    target_lang: str
+    target_langs: list
     output_directory: str
     source_lang: str
     license_manager: license.LicenseManager
+    use_cache: bool = True
+    max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS
+    purge_cache: bool = False
+    incremental: bool = False
+    resume: bool = False
+    stream: bool = False
+    max_characters: Optional[int] = None
+    dry_run: bool = False
+    metrics_file: Optional[str] = None
+    output_mode: str = "text"
+    port: int = SERVE_PORT
+    job_file: str = JOB_FILE
+    shard_size: int = SHARD_SIZE
+    workers: int = 1
 
 
 class ArgumentsCollector(ABC):
@@ -49,17 +70,50 @@ class CLIArgumentsCollector(ArgumentsCollector):
         self.arguments = Arguments(
             action=self.__namespace.action,
             source_file=self.__namespace.source_file,
-            target_lang=self.__namespace.target_lang,
+            target_langs=self.__namespace.target_langs,
             output_directory=self.__namespace.output_directory,
             source_lang=self.__namespace.source_lang,
             license_manager=license.CLILicenseManager(),
+            use_cache=self.__namespace.use_cache,
+            max_concurrent_requests=self.__namespace.max_concurrent_requests,
+            purge_cache=self.__namespace.purge_cache,
+            incremental=self.__namespace.incremental,
+            resume=self.__namespace.resume,
+            stream=self.__namespace.stream,
+            max_characters=self.__namespace.max_characters,
+            dry_run=self.__namespace.dry_run,
+            metrics_file=self.__namespace.metrics_file,
+            output_mode=self.__namespace.output_mode,
+            port=self.__namespace.port,
+            job_file=self.__namespace.job_file,
+            shard_size=self.__namespace.shard_size,
+            workers=self.__namespace.workers,
         )
 
     def _validate_arguments(self) -> None:
-        if self.__namespace.action == "translate" and (
-            self.__namespace.source_file == "" or self.__namespace.target_lang == ""
+        if self.__namespace.action in ("translate", "watch", "job-create") and (
+            self.__namespace.source_file == "" or not self.__namespace.target_langs
         ):
-            self.__parser.error("translate requires --source-file and --target-lang.")
+            self.__parser.error(
+                f"{self.__namespace.action} requires --source-file and --target-lang."
+            )
+        if self.__namespace.action == "watch" and self.__namespace.dry_run:
+            self.__parser.error("watch cannot be used with --dry-run.")
+        if self.__namespace.max_concurrent_requests < 1:
+            self.__parser.error("--concurrency must be greater than 0.")
+        if (
+            self.__namespace.max_characters is not None
+            and self.__namespace.max_characters < 0
+        ):
+            self.__parser.error("--max-characters cannot be negative.")
+        if not 0 <= self.__namespace.port <= 65535:
+            self.__parser.error("--port must be between 0 and 65535.")
+        if self.__namespace.shard_size < 1:
+            self.__parser.error("--shard-size must be greater than 0.")
+        if self.__namespace.workers < 1:
+            self.__parser.error("--workers must be greater than 0.")
+        if self.__namespace.action.startswith("job-") and self.__namespace.stream:
+            self.__parser.error("--stream cannot be used with the job commands.")
 
     def __set_parser(self) -> None:
 
@@ -70,7 +124,7 @@ class CLIArgumentsCollector(ArgumentsCollector):
         parser.add_argument(
             "action",
             type=str,
-            help="The command that will be exectued. The following options are for the translate command.",
+            help="The command that will be exectued. The following options are for the translate and watch commands.",
             choices=ACTIONS,
         )
 
@@ -78,7 +132,7 @@ class CLIArgumentsCollector(ArgumentsCollector):
             "-s",
             "--source-file",
             type=str,
-            help='The file to be translated. Required if the action is "translate."',
+            help='The file to be translated, or a directory or a glob pattern to translate many files. Required if the action is "translate."',
             default="",
             dest="source_file",
         )
@@ -87,9 +141,10 @@ class CLIArgumentsCollector(ArgumentsCollector):
             "--to",
             "--target-lang",
             type=str,
-            help='The code of the language into which you want to translate the source file. Required if the action is "translate".',
-            default="",
-            dest="target_lang",
+            nargs="+",
+            help='The codes of the languages into which you want to translate the source file. Required if the action is "translate".',
+            default=[],
+            dest="target_langs",
         )
 
         parser.add_argument(
@@ -110,4 +165,110 @@ class CLIArgumentsCollector(ArgumentsCollector):
             dest="output_directory",
         )
 
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            help=f"The maximum number of requests sent to DeepL at the same time, it is lowered automatically while DeepL is overloaded. Default: {MAX_CONCURRENT_REQUESTS}.",
+            default=MAX_CONCURRENT_REQUESTS,
+            dest="max_concurrent_requests",
+        )
+
+        parser.add_argument(
+            "--no-cache",
+            action="store_false",
+            help="Do not use the translation memory, every entry will be sent to DeepL.",
+            dest="use_cache",
+        )
+
+        parser.add_argument(
+            "--purge-cache",
+            action="store_true",
+            help="Delete every translation stored in the translation memory, and the cached list of languages, before running the command.",
+            dest="purge_cache",
+        )
+
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Translate only the entries of JSON and PO files that changed since the last run, the others are taken from the existing output files.",
+            dest="incremental",
+        )
+
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue an interrupted translation of JSON and PO files, the entries already translated are taken from its journal.",
+            dest="resume",
+        )
+
+        parser.add_argument(
+            "--stream",
+            action="store_true",
+            help="Translate JSON files while they are read, without loading them in memory. Useful for very large files, but --incremental and --resume are ignored.",
+            dest="stream",
+        )
+
+        parser.add_argument(
+            "--max-characters",
+            type=int,
+            help="The maximum number of characters that can be billed. The files that do not fit are skipped and can be translated in a later run.",
+            default=None,
+            dest="max_characters",
+        )
+
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Print the characters that would be billed without translating anything. Exits with an error if they do not fit in --max-characters or in the remaining quota.",
+            dest="dry_run",
+        )
+
+        parser.add_argument(
+            "--metrics-json",
+            help="Write the metrics of the requests sent to DeepL to this JSON file: latency percentiles, retries, texts per request, billed characters, cache hits and requests in flight over time.",
+            default=None,
+            dest="metrics_file",
+        )
+
+        parser.add_argument(
+            "--output",
+            type=str,
+            help="text prints every translated entry and the progress bar, quiet prints only the summaries, json writes the entries and the progress to stdout as JSON lines and the messages to stderr.",
+            choices=output.MODES,
+            default=output.TEXT,
+            dest="output_mode",
+        )
+
+        parser.add_argument(
+            "--port",
+            type=int,
+            help=f"The port on which the serve command listens, on localhost only. --max-characters is the budget of the whole session. Default: {SERVE_PORT}.",
+            default=SERVE_PORT,
+            dest="port",
+        )
+
+        parser.add_argument(
+            "--job",
+            type=str,
+            help=f"The SQLite file of the job used by job-create, job-work and job-merge. It can be on a filesystem shared by many machines, if it supports file locks. Default: {JOB_FILE}.",
+            default=JOB_FILE,
+            dest="job_file",
+        )
+
+        parser.add_argument(
+            "--shard-size",
+            type=int,
+            help=f"The number of texts in each shard of a job, a shard is the unit claimed by a worker. Default: {SHARD_SIZE}.",
+            default=SHARD_SIZE,
+            dest="shard_size",
+        )
+
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="The number of worker processes started by job-work on this machine. Default: 1.",
+            default=1,
+            dest="workers",
+        )
+
         self.__parser = parser
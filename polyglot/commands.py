@@ -1,11 +1,16 @@
+from __future__ import annotations
+
 import asyncio
-from typing import Any, Callable, Optional
+import json
+import urllib.parse
+from typing import Any, Awaitable, Callable, List, Optional
 from abc import ABC, abstractmethod
 
 import colorama
 import deepl
 
 import polyglot
+from polyglot import languages, lazy, output
 from polyglot.utils import (
     DownloadedDocumentStream,
     get_color_by_percentage,
@@ -14,6 +19,15 @@ from polyglot.utils import (
 from polyglot.errors import DeeplError
 
 
+RETRYABLE_STATUS_CODES: list = [429, 500, 502, 503, 504]
+
+aiohttp = lazy.load("aiohttp")
+
+
+class RetryableDeeplException(deepl.DeepLException):
+    pass
+
+
 def handle_error(function: Callable) -> Callable:
     def function_wrapper(instance: DeeplCommand):
         try:
@@ -24,14 +38,48 @@ def handle_error(function: Callable) -> Callable:
     return function_wrapper
 
 
+def raise_retryable(function: Callable) -> Callable:
+    # ! deepl retries 429 and 5xx on its own, except 503 which it raises as a plain DeepLException
+    def function_wrapper(*args: Any) -> Any:
+        try:
+            return function(*args)
+        except (
+            deepl.TooManyRequestsException,
+            deepl.DocumentNotReadyException,
+        ) as error:
+            raise RetryableDeeplException(str(error)) from error
+        except deepl.DeepLException as error:
+            if str(error).startswith("Service unavailable"):
+                raise RetryableDeeplException(str(error)) from error
+            raise
+
+    return function_wrapper
+
+
+def print_translations(texts: List[str], translations: List[str], limit: int) -> None:
+    if output.mode == output.QUIET or not texts:
+        return
+    if output.mode == output.JSON:
+        output.write_records(
+            {"event": "translation", "text": text, "translation": translation}
+            for text, translation in zip(texts, translations)
+        )
+        return
+    # * a single print for the batch, the terminal is written once per request
+    print(
+        "\n".join(
+            f'"{get_truncated_text(text, limit)}" => "{get_truncated_text(translation, limit)}"'
+            for text, translation in zip(texts, translations)
+        )
+    )
+
+
 class DeeplCommand(ABC):
 
-    _license: str
     _translator: deepl.Translator
 
-    def __init__(self, license: str) -> None:
-        self._license = license
-        self._translator = deepl.Translator(self._license)
+    def __init__(self, translator: deepl.Translator) -> None:
+        self._translator = translator
 
     @abstractmethod
     def execute(self) -> Any:
@@ -43,16 +91,24 @@ class TranslateCommand(DeeplCommand, ABC):
     _content: Any
     _target_lang: str
     _source_lang: str
+    _tag_handling: Optional[str]
+    _ignore_tags: Optional[List[str]]
 
     def __init__(
-        self, license: str, content: Any, target_lang: str, source_lang: str
+        self,
+        translator: deepl.Translator,
+        content: Any,
+        target_lang: str,
+        source_lang: str,
+        tag_handling: Optional[str] = None,
+        ignore_tags: Optional[List[str]] = None,
     ) -> None:
-        super().__init__(license)
+        super().__init__(translator)
         self._content = content
-        if target_lang == "EN":  # * EN as a target language is deprecated
-            target_lang = "EN-US"
-        self._target_lang = target_lang
+        self._target_lang = languages.get_target_code(target_lang)
         self._source_lang = source_lang
+        self._tag_handling = tag_handling
+        self._ignore_tags = ignore_tags
 
     @abstractmethod
     def execute(self) -> Any:
@@ -60,6 +116,13 @@ class TranslateCommand(DeeplCommand, ABC):
 
 
 class PrintUsageInfo(DeeplCommand):
+
+    __license: str
+
+    def __init__(self, translator: deepl.Translator, license: str) -> None:
+        super().__init__(translator)
+        self.__license = license
+
     @handle_error
     def execute(self) -> None:
         usage: deepl.Usage = self._translator.get_usage()
@@ -68,7 +131,7 @@ class PrintUsageInfo(DeeplCommand):
         count: Optional[int] = usage.character.count
 
         print(
-            f"\nPolyglot version: {polyglot.__version__}\nDeepL version: {deepl.__version__}\nAPI key: {self._license}"
+            f"\nPolyglot version: {polyglot.__version__}\nDeepL version: {deepl.__version__}\nAPI key: {self.__license}"
         )
 
         if limit is not None:
@@ -83,19 +146,30 @@ class PrintUsageInfo(DeeplCommand):
             print(count_text)
 
 
-class PrintSupportedLanguages(DeeplCommand):
+class GetRemainingCharacters(DeeplCommand):
     @handle_error
-    def execute(self) -> None:
-        print("\nAvailable source languages:")
-        for language in self._translator.get_source_languages():
-            print(f"{language.name} ({language.code})")
+    def execute(self) -> Optional[int]:
+        character: deepl.Usage.Detail = self._translator.get_usage().character
+        if not character.valid:
+            return None
+        return max(character.limit - character.count, 0)
+
 
-        print("\nAvailable target languages:")
-        for language in self._translator.get_target_languages():
-            lang: str = f"{language.name} ({language.code})"
-            if language.supports_formality:
-                lang += " - formality supported"
-            print(lang)
+class GetSupportedLanguages(DeeplCommand):
+    @handle_error
+    def execute(self) -> languages.SupportedLanguages:
+        return languages.SupportedLanguages(
+            source=[
+                languages.Language(language.code, language.name)
+                for language in self._translator.get_source_languages()
+            ],
+            target=[
+                languages.Language(
+                    language.code, language.name, bool(language.supports_formality)
+                )
+                for language in self._translator.get_target_languages()
+            ],
+        )
 
 
 class TranslateText(TranslateCommand):
@@ -112,10 +186,7 @@ class TranslateText(TranslateCommand):
         )
         try:
             translation: str = response[0].text
-            truncated_translation: str = get_truncated_text(
-                translation, self.__LEN_LIMIT
-            )
-            print(f'"{truncated_text}" => "{truncated_translation}"')
+            print_translations([self._content], [translation], self.__LEN_LIMIT)
             return translation
         except KeyError:
             print(
@@ -124,16 +195,127 @@ class TranslateText(TranslateCommand):
         return ""
 
 
+class TranslateTexts(TranslateCommand):
+
+    __LEN_LIMIT: int = 150
+
+    @handle_error
+    def execute(self) -> List[str]:
+        response: Any = self._translator.translate_text(
+            self._content,
+            target_lang=self._target_lang,
+            source_lang=self._source_lang,
+            tag_handling=self._tag_handling,
+            ignore_tags=self._ignore_tags,
+        )
+        translations: List[str] = [result.text for result in response]
+        print_translations(self._content, translations, self.__LEN_LIMIT)
+        return translations
+
+
+class AsyncTranslateTexts(TranslateCommand):
+
+    __LEN_LIMIT: int = 150
+    __session: aiohttp.ClientSession
+
+    def __init__(
+        self,
+        translator: deepl.Translator,
+        session: aiohttp.ClientSession,
+        content: List[str],
+        target_lang: str,
+        source_lang: str,
+        tag_handling: Optional[str] = None,
+        ignore_tags: Optional[List[str]] = None,
+    ) -> None:
+        super().__init__(
+            translator, content, target_lang, source_lang, tag_handling, ignore_tags
+        )
+        self.__session = session
+
+    async def execute(self) -> List[str]:
+        data: list = [("target_lang", self._target_lang.upper())]
+        if self._source_lang:
+            data.append(("source_lang", self._source_lang.upper()))
+        if self._tag_handling:
+            data.append(("tag_handling", self._tag_handling))
+        if self._ignore_tags:
+            data.append(("ignore_tags", ",".join(self._ignore_tags)))
+        data.extend(("text", text) for text in self._content)
+
+        url: str = urllib.parse.urljoin(self._translator.server_url, "v2/translate")
+        try:
+            async with self.__session.post(
+                url, data=data, headers=self._translator.headers
+            ) as response:
+                status: int = response.status
+                content: str = await response.text()
+        except aiohttp.ClientError as error:
+            raise deepl.ConnectionException(
+                f"Connection failed: {error}", should_retry=True
+            ) from error
+
+        if status in RETRYABLE_STATUS_CODES:
+            raise RetryableDeeplException(f"DeepL responded with status code {status}")
+
+        try:
+            body: Optional[dict] = json.loads(content)
+        except json.JSONDecodeError:
+            body = None
+
+        # ! private, but it raises the same exceptions of the synchronous commands
+        self._translator._raise_for_status(status, content, body)
+
+        translations: List[str] = [
+            translation["text"] for translation in body["translations"]
+        ]
+        print_translations(self._content, translations, self.__LEN_LIMIT)
+        return translations
+
+
 class TranslateDocumentCommand(TranslateCommand):
 
-    __document: DownloadedDocumentStream
-    __remaining: int = 0
+    __MIN_POLLING_INTERVAL: float = 0.5
+    __MAX_POLLING_INTERVAL: float = 30.0
+    __DOWNLOAD_CHUNK_SIZE: int = 64 * 1024
+
+    billed_characters: Optional[int] = None
+    __run_request: Callable[[Callable[[], Awaitable[Any]]], Awaitable[Any]]
+
+    def __init__(
+        self,
+        translator: deepl.Translator,
+        content: str,
+        target_lang: str,
+        source_lang: str,
+        run_request: Optional[
+            Callable[[Callable[[], Awaitable[Any]]], Awaitable[Any]]
+        ] = None,
+    ) -> None:
+        super().__init__(translator, content, target_lang, source_lang)
+        # * the asynchronous connector passes its scheduler, so every request is retried and limited with the others
+        self.__run_request = run_request or (lambda request: request())
 
     @handle_error
     def execute(self) -> DownloadedDocumentStream:
-        document_data: deepl.DocumentHandle = self.__send_document()
-        asyncio.run(self.__get_document(document_data))
-        return self.__document
+        return asyncio.run(self.execute_async())
+
+    async def execute_async(self) -> DownloadedDocumentStream:
+        document_handle: deepl.DocumentHandle = await self.__request(
+            self.__send_document
+        )
+        await self.__wait_document(document_handle)
+        return await self.__request(
+            self.__download_translated_document, document_handle
+        )
+
+    async def __request(self, function: Callable, *args: Any) -> Any:
+        # * deepl calls block, they run in the default executor so many documents can be awaited together
+        return await self.__run_request(
+            lambda: asyncio.get_running_loop().run_in_executor(
+                None, raise_retryable(function), *args
+            )
+        )
 
     def __send_document(self) -> deepl.DocumentHandle:
         with open(self._content, "rb") as document:
@@ -144,26 +326,41 @@ class TranslateDocumentCommand(TranslateCommand):
                 filename=self._content,
             )
 
-    async def __get_document(self, document_handle: deepl.DocumentHandle) -> None:
-        status: deepl.DocumentStatus = self.__check_document_status(document_handle)
+    async def __wait_document(self, document_handle: deepl.DocumentHandle) -> None:
+        interval: float = self.__MIN_POLLING_INTERVAL
+        remaining: Optional[int] = None
 
-        if status.ok and status.done:
-            print(
-                f"Translation completed. Billed characters: {status.billed_characters}."
+        while True:
+            status: deepl.DocumentStatus = await self.__request(
+                self.__check_document_status, document_handle
             )
-            self.__document = self.__download_translated_document(document_handle)
-            self.__remaining = 0
-            return
-
-        # * sometimes there are no seconds even if it's still translating
-        if (
-            status.seconds_remaining is not None
-            and self.__remaining != status.seconds_remaining
-        ):
-            self.__remaining = status.seconds_remaining
-            print(f"Remaining {status.seconds_remaining} seconds...")
 
-        await self.__get_document(document_handle)
+            if not status.ok:
+                raise deepl.DocumentTranslationException(
+                    str(status.error_message), document_handle
+                )
+
+            if status.done:
+                self.billed_characters = status.billed_characters
+                print(
+                    f"Translation of {self._content} completed. Billed characters: {status.billed_characters}."
+                )
+                return
+
+            # * sometimes there are no seconds even if it's still translating
+            if status.seconds_remaining is not None:
+                if remaining != status.seconds_remaining:
+                    remaining = status.seconds_remaining
+                    print(f"{self._content}: remaining {remaining} seconds...")
+                # * the estimate is trusted only halfway, it is often pessimistic
+                interval = status.seconds_remaining / 2
+            else:
+                interval *= 2
+
+            interval = min(
+                max(interval, self.__MIN_POLLING_INTERVAL), self.__MAX_POLLING_INTERVAL
+            )
+            await asyncio.sleep(interval)
 
     def __check_document_status(
         self, document_handle: deepl.DocumentHandle
@@ -174,4 +371,4 @@ class TranslateDocumentCommand(TranslateCommand):
         self, document_handle: deepl.DocumentHandle
     ) -> DownloadedDocumentStream:
         response: Any = self._translator.translate_document_download(document_handle)
-        return response.iter_content()
+        return response.iter_content(chunk_size=self.__DOWNLOAD_CHUNK_SIZE)
@@ -1,33 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
 from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Coroutine, List, Optional
+
+import deepl
+import requests
+
+from polyglot import commands, languages, lazy, license, metrics, scheduler
+from polyglot.errors import DeeplError, DeeplVersionError
+from polyglot.utils import (
+    MAX_CONCURRENT_REQUESTS,
+    DownloadedDocumentStream,
+    TranslatedDocument,
+)
 
-from polyglot import commands, license
-from polyglot.utils import DownloadedDocumentStream
+# * only the asynchronous connector needs it, when it opens its session
+aiohttp = lazy.load("aiohttp")
+
+
+def get_deepl_internal(target: Any, attribute: str) -> Any:
+    # ! deepl does not expose it, setup.py pins the versions known to have it
+    value: Any = target
+    for name in attribute.split("."):
+        if not hasattr(value, name):
+            DeeplVersionError(attribute)
+        value = getattr(value, name)
+    return value
 
 
 class EngineConnector(ABC):
 
+    max_batch_size: int = 1
+    max_batch_bytes: int = 0
+    max_concurrent_requests: int
+
     _license: str
     __license_manager: license.LicenseManager
+    __listeners: List[metrics.Listener]
 
     def __init__(
         self,
         license_manager: license.LicenseManager,
+        max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS,
     ) -> None:
         self.__license_manager = license_manager
         self._license = self.__license_manager.get_license()
+        self.max_concurrent_requests = max_concurrent_requests
+        self.__listeners = []
+
+    def close(self) -> None:
+        pass
+
+    def add_listener(self, listener: metrics.Listener) -> None:
+        # * listeners get the metrics of every request, they are called from the thread that sent it and should return quickly
+        self.__listeners.append(listener)
+
+    def remove_listener(self, listener: metrics.Listener) -> None:
+        self.__listeners.remove(listener)
+
+    def _notify(self, request_metrics: metrics.RequestMetrics) -> None:
+        for listener in list(self.__listeners):
+            listener(request_metrics)
+
+    def handle_error(self, error: Exception) -> None:
+        raise error
 
     @abstractmethod
     def print_usage_info(self) -> None:
         pass
 
     @abstractmethod
-    def print_supported_languages(self) -> None:
+    def get_supported_languages(self) -> languages.SupportedLanguages:
+        pass
+
+    @abstractmethod
+    def get_remaining_characters(self) -> Optional[int]:
         pass
 
     @abstractmethod
     def translate(self, content: str, target_lang: str, source_lang: str = "") -> str:
         pass
 
+    @abstractmethod
+    def translate_batch(
+        self,
+        contents: List[str],
+        target_lang: str,
+        source_lang: str = "",
+        tag_handling: Optional[str] = None,
+        ignore_tags: Optional[List[str]] = None,
+    ) -> List[str]:
+        pass
+
     @abstractmethod
     def translate_document(
         self, source_file: str, target_lang: str, source_lang: str = ""
@@ -35,21 +102,301 @@ class EngineConnector(ABC):
         pass
 
 
+class AsyncEngineConnector(ABC):
+
+    # * errors are raised, callers pass them to handle_error once they are out of the loop
+
+    @abstractmethod
+    async def translate_async(
+        self, content: str, target_lang: str, source_lang: str = ""
+    ) -> str:
+        pass
+
+    @abstractmethod
+    async def translate_batch_async(
+        self,
+        contents: List[str],
+        target_lang: str,
+        source_lang: str = "",
+        tag_handling: Optional[str] = None,
+        ignore_tags: Optional[List[str]] = None,
+    ) -> List[str]:
+        pass
+
+    @abstractmethod
+    async def translate_document_async(
+        self, source_file: str, target_lang: str, source_lang: str = ""
+    ) -> TranslatedDocument:
+        pass
+
+
 class DeeplConnector(EngineConnector):
+
+    # * DeepL accepts up to 50 texts and 128 KiB per request, some room is left for the other parameters
+    max_batch_size: int = 50
+    max_batch_bytes: int = 120 * 1024
+
+    _translator: deepl.Translator
+    __semaphore: threading.BoundedSemaphore
+
+    def __init__(
+        self,
+        license_manager: license.LicenseManager,
+        max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS,
+        server_url: Optional[str] = None,
+    ) -> None:
+        super().__init__(license_manager, max_concurrent_requests)
+        # * one client for every command, so its connections are reused across requests
+        self._translator = deepl.Translator(self._license, server_url=server_url)
+        self.__semaphore = threading.BoundedSemaphore(max_concurrent_requests)
+        self.__set_connection_pool(max_concurrent_requests)
+
+    def close(self) -> None:
+        self._translator.close()
+
+    def handle_error(self, error: Exception) -> None:
+        if isinstance(error, deepl.DeepLException):
+            DeeplError(error)
+        raise error
+
     def print_usage_info(self) -> None:
-        return commands.PrintUsageInfo(self._license).execute()
+        return commands.PrintUsageInfo(self._translator, self._license).execute()
+
+    def get_supported_languages(self) -> languages.SupportedLanguages:
+        return commands.GetSupportedLanguages(self._translator).execute()
 
-    def print_supported_languages(self) -> None:
-        return commands.PrintSupportedLanguages(self._license).execute()
+    def get_remaining_characters(self) -> Optional[int]:
+        return commands.GetRemainingCharacters(self._translator).execute()
 
     def translate(self, content: str, target_lang: str, source_lang: str = "") -> str:
-        return commands.TranslateText(
-            self._license, content, target_lang, source_lang
-        ).execute()
+        with self.__semaphore, metrics.measure(self._notify, [content]):
+            return commands.TranslateText(
+                self._translator, content, target_lang, source_lang
+            ).execute()
+
+    def translate_batch(
+        self,
+        contents: List[str],
+        target_lang: str,
+        source_lang: str = "",
+        tag_handling: Optional[str] = None,
+        ignore_tags: Optional[List[str]] = None,
+    ) -> List[str]:
+        with self.__semaphore, metrics.measure(self._notify, contents):
+            return commands.TranslateTexts(
+                self._translator,
+                contents,
+                target_lang,
+                source_lang,
+                tag_handling,
+                ignore_tags,
+            ).execute()
 
     def translate_document(
         self, source_file: str, target_lang: str, source_lang: str = ""
     ) -> DownloadedDocumentStream:
         return commands.TranslateDocumentCommand(
-            self._license, source_file, target_lang, source_lang
+            self._translator, source_file, target_lang, source_lang
         ).execute()
+
+    def __set_connection_pool(self, max_connections: int) -> None:
+        # ! the session is not exposed by deepl, but its default pool keeps only 10 connections
+        session: requests.Session = get_deepl_internal(
+            self._translator, "_client._session"
+        )
+        adapter: requests.adapters.HTTPAdapter = requests.adapters.HTTPAdapter(
+            pool_maxsize=max_connections
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+
+class AsyncDeeplConnector(DeeplConnector, AsyncEngineConnector):
+
+    # * the requests run on a loop owned by the connector, so it can be awaited from any thread or loop
+    __loop: Optional[asyncio.AbstractEventLoop] = None
+    __thread: threading.Thread
+    __session: aiohttp.ClientSession
+    __scheduler: scheduler.AdaptiveScheduler
+    __lock: threading.Lock
+
+    def __init__(
+        self,
+        license_manager: license.LicenseManager,
+        max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS,
+        server_url: Optional[str] = None,
+    ) -> None:
+        super().__init__(license_manager, max_concurrent_requests, server_url)
+        # * the commands raise the errors of deepl with it, checked before any request is sent
+        get_deepl_internal(self._translator, "_raise_for_status")
+        self.__lock = threading.Lock()
+
+    def close(self) -> None:
+        with self.__lock:
+            if self.__loop is not None:
+                asyncio.run_coroutine_threadsafe(
+                    self.__session.close(), self.__loop
+                ).result()
+                self.__loop.call_soon_threadsafe(self.__loop.stop)
+                self.__thread.join()
+                self.__loop.close()
+                self.__loop = None
+        super().close()
+
+    def translate(self, content: str, target_lang: str, source_lang: str = "") -> str:
+        translations: List[str] = self.translate_batch(
+            [content], target_lang, source_lang
+        )
+        return translations[0] if translations else ""
+
+    def translate_batch(
+        self,
+        contents: List[str],
+        target_lang: str,
+        source_lang: str = "",
+        tag_handling: Optional[str] = None,
+        ignore_tags: Optional[List[str]] = None,
+    ) -> List[str]:
+        # * the blocking callers share the retries and the limit of the asynchronous ones
+        try:
+            return asyncio.run_coroutine_threadsafe(
+                self.__translate_batch(
+                    contents, target_lang, source_lang, tag_handling, ignore_tags
+                ),
+                self.__get_loop(),
+            ).result()
+        except Exception as error:
+            self.handle_error(error)
+
+    def translate_document(
+        self, source_file: str, target_lang: str, source_lang: str = ""
+    ) -> DownloadedDocumentStream:
+        try:
+            return asyncio.run(
+                self.translate_document_async(source_file, target_lang, source_lang)
+            ).stream
+        except Exception as error:
+            self.handle_error(error)
+
+    async def translate_async(
+        self, content: str, target_lang: str, source_lang: str = ""
+    ) -> str:
+        translations: List[str] = await self.translate_batch_async(
+            [content], target_lang, source_lang
+        )
+        return translations[0] if translations else ""
+
+    async def translate_batch_async(
+        self,
+        contents: List[str],
+        target_lang: str,
+        source_lang: str = "",
+        tag_handling: Optional[str] = None,
+        ignore_tags: Optional[List[str]] = None,
+    ) -> List[str]:
+        return await self.__run(
+            self.__translate_batch(
+                contents, target_lang, source_lang, tag_handling, ignore_tags
+            )
+        )
+
+    async def translate_document_async(
+        self, source_file: str, target_lang: str, source_lang: str = ""
+    ) -> TranslatedDocument:
+        # * documents are polled from the caller's loop, their requests are few and slow
+        command: commands.TranslateDocumentCommand = commands.TranslateDocumentCommand(
+            self._translator,
+            source_file,
+            target_lang,
+            source_lang,
+            self.__schedule_document_request,
+        )
+        started: float = time.perf_counter()
+        stream: DownloadedDocumentStream = await command.execute_async()
+        # * documents are billed by DeepL after their conversion, the count comes with their status
+        self._notify(
+            metrics.RequestMetrics(
+                started=started,
+                latency=time.perf_counter() - started,
+                texts=1,
+                characters=command.billed_characters or 0,
+            )
+        )
+        return TranslatedDocument(stream, command.billed_characters)
+
+    async def __translate_batch(
+        self,
+        contents: List[str],
+        target_lang: str,
+        source_lang: str,
+        tag_handling: Optional[str],
+        ignore_tags: Optional[List[str]],
+    ) -> List[str]:
+        return await self.__scheduler.run(
+            self.__measure_attempts(
+                commands.AsyncTranslateTexts(
+                    self._translator,
+                    self.__session,
+                    contents,
+                    target_lang,
+                    source_lang,
+                    tag_handling,
+                    ignore_tags,
+                ).execute,
+                contents,
+            )
+        )
+
+    async def __schedule_document_request(
+        self, request: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        # * the upload, every status check and the download are retried on their own
+        return await self.__run(self.__schedule(request))
+
+    async def __schedule(self, request: Callable[[], Awaitable[Any]]) -> Any:
+        return await self.__scheduler.run(request)
+
+    def __measure_attempts(
+        self, request: Callable[[], Awaitable[Any]], contents: List[str]
+    ) -> Callable[[], Awaitable[Any]]:
+        # * the scheduler calls the request again for every retry, each attempt is measured on its own
+        attempts: int = 0
+
+        async def measured_request() -> Any:
+            nonlocal attempts
+            attempt: int = attempts
+            attempts += 1
+            with metrics.measure(self._notify, contents, attempt):
+                return await request()
+
+        return measured_request
+
+    async def __run(self, coroutine: Coroutine) -> Any:
+        loop: asyncio.AbstractEventLoop = self.__get_loop()
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(coroutine, loop)
+        )
+
+    def __get_loop(self) -> asyncio.AbstractEventLoop:
+        with self.__lock:
+            if self.__loop is None:
+                loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+                self.__thread = threading.Thread(target=loop.run_forever, daemon=True)
+                self.__thread.start()
+                asyncio.run_coroutine_threadsafe(self.__open_session(), loop).result()
+                self.__loop = loop
+            return self.__loop
+
+    async def __open_session(self) -> None:
+        self.__scheduler = scheduler.AdaptiveScheduler(
+            self.max_concurrent_requests, self.__is_retryable
+        )
+        self.__session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_concurrent_requests),
+            headers={"User-Agent": deepl.http_client.user_agent},
+        )
+
+    def __is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, deepl.ConnectionException):
+            return error.should_retry
+        return isinstance(error, commands.RetryableDeeplException)
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class Claim:
+    owned: Dict[str, Future]
+    pending: Dict[str, Future]
+    saved_characters: int
+    target_lang: str = ""
+    source_lang: str = ""
+
+
+class Deduplicator:
+
+    # * shared by every translator of a run, each text is sent once per language pair no matter how many keys or files use it
+
+    saved_characters: int
+
+    __futures: Dict[Tuple[str, str, str], Future]
+    __keep_translations: bool
+    __lock: threading.Lock
+
+    def __init__(self, keep_translations: bool = True) -> None:
+        # * a long-lived deduplicator keeps only the texts in flight, the finished ones are left to the memory
+        self.saved_characters = 0
+        self.__futures = {}
+        self.__keep_translations = keep_translations
+        self.__lock = threading.Lock()
+
+    def claim(self, texts: List[str], target_lang: str, source_lang: str = "") -> Claim:
+        # * the caller has to resolve the owned futures, the pending ones are resolved by whoever claimed them first
+        owned: Dict[str, Future] = {}
+        pending: Dict[str, Future] = {}
+        saved_characters: int = 0
+
+        with self.__lock:
+            for text in texts:
+                if text in owned or text in pending:
+                    saved_characters += len(text)
+                    continue
+
+                key: Tuple[str, str, str] = (text, target_lang, source_lang)
+                future: Optional[Future] = self.__futures.get(key)
+                if future is None:
+                    owned[text] = self.__futures[key] = Future()
+                else:
+                    pending[text] = future
+                    saved_characters += len(text)
+            self.saved_characters += saved_characters
+
+        return Claim(owned, pending, saved_characters, target_lang, source_lang)
+
+    def release(self, claim: Claim, error: Optional[Exception] = None) -> None:
+        # ! an unresolved future would block every translator waiting for it
+        for future in claim.owned.values():
+            if future.done():
+                continue
+            if error:
+                future.set_exception(error)
+            else:
+                future.cancel()
+
+        if self.__keep_translations:
+            return
+        with self.__lock:
+            for text, future in claim.owned.items():
+                key: Tuple[str, str, str] = (text, claim.target_lang, claim.source_lang)
+                if self.__futures.get(key) is future:
+                    del self.__futures[key]
+
+
+async def wait(future: Future) -> str:
+    # * unlike awaiting asyncio.wrap_future, cancelling the waiter leaves the shared future to the other translators
+    waiter: Future = Future()
+
+    def copy_state(done: Future) -> None:
+        if not waiter.set_running_or_notify_cancel():
+            return
+        if done.cancelled():
+            waiter.set_exception(asyncio.CancelledError())
+        elif done.exception() is not None:
+            waiter.set_exception(done.exception())
+        else:
+            waiter.set_result(done.result())
+
+    future.add_done_callback(copy_state)
+    return await asyncio.wrap_future(waiter)
@@ -1,14 +1,22 @@
+from typing import Optional
+
 import colorama
-import deepl
+
+from polyglot import lazy
+
+# * the errors are imported by every command, deepl only when a DeepL error is reported
+deepl = lazy.load("deepl")
 
 
 class Error:
     __message: str
 
-    def __init__(self, message: str = "Something went wrong!") -> None:
+    def __init__(
+        self, message: str = "Something went wrong!", exit_code: Optional[int] = None
+    ) -> None:
         self.__message = message
         print(f"\n{colorama.Fore.RED}{self.__message}\n")
-        quit()
+        quit(exit_code)
 
 
 class HandlerError(Error):
@@ -18,6 +26,36 @@ class HandlerError(Error):
         super().__init__(message)
 
 
+class BudgetError(Error):
+    def __init__(self, characters: int, budget: int) -> None:
+        # * a failing exit code, so the dry run can gate a CI pipeline
+        super().__init__(
+            f"The translation needs {characters} characters, but only {budget} are available.",
+            exit_code=1,
+        )
+
+
+class LanguageError(Error):
+    def __init__(self, language: str, kind: str) -> None:
+        super().__init__(
+            f"{language} is not a supported {kind} language. Run polyglot languages to see the supported ones.",
+            exit_code=1,
+        )
+
+
+class JobError(Error):
+    def __init__(self, message: str, job_file: str) -> None:
+        super().__init__(f"Job {job_file}: {message}", exit_code=1)
+
+
+class DeeplVersionError(Error):
+    def __init__(self, attribute: str) -> None:
+        super().__init__(
+            f"deepl {deepl.__version__} is not supported, it has no {attribute}. Install a version from 1.10 up to 2.",
+            exit_code=1,
+        )
+
+
 class DeeplError(Error):
     def __init__(self, exception: Exception) -> None:
         super().__init__(self.__get_message(exception))
@@ -28,7 +66,7 @@ class DeeplError(Error):
         if isinstance(exception, deepl.QuotaExceededException):
             return "DeepL error: quota for this billing period has been exceeded!"
         if isinstance(exception, deepl.DocumentTranslationException):
-            return f"Error translating document with id {exception.document_handle.id} and key {exception.document_handle.key}!"
+            return f"Error translating document with id {exception.document_handle.document_id} and key {exception.document_handle.document_key}!"
         if isinstance(exception, deepl.DeepLException):
             return f"DeepL API error - {exception}"
         return "Error using DeepL API!"
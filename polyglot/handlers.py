@@ -1,13 +1,30 @@
+from __future__ import annotations
+
+import array
+import copy
 import json
 import os
+import struct
 from abc import ABC, abstractmethod
-from typing import Any, Callable
-
-import polib
-
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from polyglot import json_stream, lazy
 from polyglot.utils import DownloadedDocumentStream
 from polyglot.errors import HandlerError
 
+# * only PO files need it
+polib = lazy.load("polib")
+
 
 def verfiy_source(function: Callable) -> Callable:
     def function_wrapper(instance: FileHandler):
@@ -24,15 +41,31 @@ def verfiy_source(function: Callable) -> Callable:
 class FileHandler(ABC):
 
     source_file: str
+    target_lang: str
     _target_file: str
+    __output_directory: str
+    __source_root: Optional[str]
 
     def __init__(
-        self, source_file: str, output_directory: str, target_lang: str
+        self,
+        source_file: str,
+        output_directory: str,
+        target_lang: str,
+        source_root: Optional[str] = None,
     ) -> None:
         self.source_file = source_file
         self.target_lang = target_lang
+        self.__output_directory = output_directory
+        self.__source_root = source_root
         self.__set_target_file(output_directory, target_lang)
 
+    def for_target_lang(self, target_lang: str) -> "FileHandler":
+        # * the copy shares what has already been read, so the source is read only once
+        handler: FileHandler = copy.copy(self)
+        handler.target_lang = target_lang
+        handler.__set_target_file(self.__output_directory, target_lang)
+        return handler
+
     @abstractmethod
     def read(self) -> Any:
         pass
@@ -41,10 +74,44 @@ class FileHandler(ABC):
     def write(self, translated_content: Any) -> None:
         pass
 
+    def read_previous(self) -> Optional[Any]:
+        # * the output of the last run, in the same format returned by read
+        return None
+
+    def read_snapshot(self) -> Optional[Any]:
+        try:
+            with open(self.__snapshot_file, "r") as snapshot:
+                return json.load(snapshot)
+        except (OSError, ValueError):
+            return None
+
+    def write_snapshot(self, content: Any) -> None:
+        self._make_target_directory()
+        with open(self.__snapshot_file, "w+") as snapshot:
+            json.dump(content, snapshot)
+
+    @property
+    def target_file(self) -> str:
+        return self._target_file
+
+    @property
+    def journal_file(self) -> str:
+        directory, name = os.path.split(self._target_file)
+        return os.path.join(directory, f".{os.path.splitext(name)[0]}.polyglot.jsonl")
+
+    def _make_target_directory(self) -> None:
+        # * created when the file is written, so a dry run leaves the output directory as it is
+        os.makedirs(os.path.dirname(self._target_file), exist_ok=True)
+
     @property
     def _extension(self) -> str:
         return os.path.splitext(self.source_file)[1]
 
+    @property
+    def __snapshot_file(self) -> str:
+        directory, name = os.path.split(self._target_file)
+        return os.path.join(directory, f".{os.path.splitext(name)[0]}.polyglot.json")
+
     def __set_target_file(self, output_directory: str, target_lang: str) -> None:
         output_directory = (
             output_directory
@@ -53,18 +120,59 @@ class FileHandler(ABC):
         )
         if output_directory[-1] == "/":
             output_directory = output_directory[:-1]
-        self._target_file = f"{output_directory}/{target_lang.lower()}{self._extension}"
+
+        # * when many files are translated together, each language gets a directory with their paths under the source root
+        if self.__source_root is not None:
+            self._target_file = f"{output_directory}/{target_lang.lower()}/{os.path.relpath(self.source_file, self.__source_root)}"
+        else:
+            self._target_file = f"{output_directory}/{target_lang.lower()}{self._extension}"
+
+
+class TextBlocks:
+
+    # * lines are grouped in paragraphs, long paragraphs are cut at the first line past the limit
+
+    __BLOCK_SIZE: int = 16 * 1024
+
+    source_file: str
+
+    def __init__(self, source_file: str) -> None:
+        self.source_file = source_file
+
+    def __iter__(self) -> Iterator[str]:
+        with open(self.source_file, "r") as source:
+            block: str = ""
+            after_blank_line: bool = False
+            for line in source:
+                blank_line: bool = not line.strip()
+                if (
+                    block
+                    and not blank_line
+                    and (after_blank_line or len(block) >= self.__BLOCK_SIZE)
+                ):
+                    yield block
+                    block = ""
+                block += line
+                after_blank_line = blank_line
+            if block:
+                yield block
 
 
 class TextHandler(FileHandler):
     @verfiy_source
-    def read(self) -> str:
+    def read(self) -> TextBlocks:
+        # * the file is read lazily, every iteration reads it again
         with open(self.source_file, "r") as source:
-            return source.read()
+            source.read(1)
+        return TextBlocks(self.source_file)
 
-    def write(self, translated_content: str) -> None:
+    def write(self, translated_content: Iterable[str]) -> None:
+        if isinstance(translated_content, str):
+            translated_content = [translated_content]
+        self._make_target_directory()
         with open(self._target_file, "w+") as destination:
-            destination.write(translated_content)
+            for chunk in translated_content:
+                destination.write(chunk)
             print(f"Generated {self._target_file}.")
 
 
@@ -75,55 +183,271 @@ class JSONHandler(FileHandler):
             return json.load(source)
 
     def write(self, translated_content: dict) -> None:
+        self._make_target_directory()
         with open(self._target_file, "w+") as destination:
             destination.write(json.dumps(translated_content, indent=2))
             print(f"Generated {self._target_file}.")
 
+    def read_previous(self) -> Optional[dict]:
+        try:
+            with open(self._target_file, "r") as previous:
+                return json.load(previous)
+        except (OSError, ValueError):
+            return None
 
-class POHandler(FileHandler):
 
-    __content: dict = {}
+class JSONLeaves:
 
+    # * the strings of the file with their paths, every iteration parses the file again
+
+    source_file: str
+
+    def __init__(self, source_file: str) -> None:
+        self.source_file = source_file
+
+    def __iter__(self) -> Iterator[Tuple[Tuple[Any, ...], str]]:
+        with open(self.source_file, "r") as source:
+            yield from json_stream.iterleaves(source)
+
+
+class JSONStreamHandler(FileHandler):
     @verfiy_source
-    def read(self) -> dict:
+    def read(self) -> JSONLeaves:
+        # * the file is read lazily, the tree is never built
+        with open(self.source_file, "r") as source:
+            source.read(1)
+        return JSONLeaves(self.source_file)
+
+    def write(self, translated_content: Iterable[str]) -> None:
+        # * the source is parsed again and each of its strings is replaced with the next translation
+        translations: Iterator[str] = iter(translated_content)
+        self._make_target_directory()
+        with open(self.source_file, "r") as source, open(
+            self._target_file, "w+"
+        ) as destination:
+            writer: json_stream.JSONStreamWriter = json_stream.JSONStreamWriter(
+                destination
+            )
+            for event, value in json_stream.iterparse(source):
+                writer.write(event, next(translations) if event == "string" else value)
+            print(f"Generated {self._target_file}.")
 
-        translatables: dict = {}
 
-        for entry in self.__pofile_source:
-            message: str = entry.msgid if entry.msgstr == "" else entry.msgstr
-            self.__content[entry.msgid] = {
-                "msgstr": message,
-                "occurrences": entry.occurrences,
-            }
-            translatables[entry.msgid] = message
+class POMessage(NamedTuple):
+    msgid: str
+    msgstr: str
+    msgctxt: Optional[str] = None
+    msgid_plural: str = ""
+    msgstr_plural: Optional[Dict[int, str]] = None
+    occurrences: Tuple[Tuple[str, str], ...] = ()
+    flags: Tuple[str, ...] = ()
+    comment: str = ""
+    tcomment: str = ""
+    obsolete: bool = False
 
-        return translatables
+    @property
+    def key(self) -> str:
+        # * the same separator used by gettext, so entries that differ only by context get different keys
+        return f"{self.msgctxt}\x04{self.msgid}" if self.msgctxt else self.msgid
 
-    def write(self, translated_content: dict) -> None:
-        pofile: polib.POFile = polib.POFile()
-        pofile.metadata = self.__pofile_source.metadata
+    @property
+    def translated(self) -> bool:
+        # * fuzzy messages are translated and billed like the others, so they go in the .mo too, as they always did
+        # * the .po keeps their flag, a reviewer can still find them
+        if self.obsolete:
+            return False
+        if self.msgstr_plural:
+            return all(self.msgstr_plural.values())
+        return self.msgstr != ""
 
-        self.__update_content(translated_content)
 
-        for key, value in self.__content.items():
-            entry: polib.POEntry = polib.POEntry(
-                msgid=key, msgstr=value["msgstr"], occurrences=value["occurrences"]
-            )
-            pofile.append(entry)
+class POHandler(FileHandler):
+
+    # * the catalog is parsed once, only the messages and the header are kept
 
+    __MO_MAGIC: int = 0x950412DE
+
+    __messages: List[POMessage]
+    __header: polib.POFile
+
+    @verfiy_source
+    def read(self) -> dict:
+        # * polib parses the argument as content when it is not an existing file
+        if not os.path.isfile(self.source_file):
+            raise FileNotFoundError(self.source_file)
+
+        pofile: polib.POFile = polib.pofile(self.source_file)
+        self.__header = polib.POFile(
+            wrapwidth=pofile.wrapwidth, encoding=pofile.encoding
+        )
+        self.__header.header = pofile.header
+        self.__header.metadata = pofile.metadata
+        self.__header.metadata_is_fuzzy = pofile.metadata_is_fuzzy
+        self.__messages = [self.__get_message(entry) for entry in pofile]
+
+        return {
+            message.key: self.__get_translatable(message)
+            for message in self.__messages
+            if not message.obsolete
+        }
+
+    def write(self, translated_content: dict) -> None:
         basename: str = os.path.splitext(self._target_file)[0]
-        pofile.save(f"{basename}.po")
-        pofile.save_as_mofile(f"{basename}.mo")
+        self._make_target_directory()
+        self.__write_pofile(f"{basename}.po", translated_content)
+        self.__write_mofile(f"{basename}.mo", translated_content)
 
         print(f"Generated {basename}.po and {basename}.mo.")
 
+    def read_previous(self) -> Optional[dict]:
+        if not os.path.isfile(self.__target_po_file):
+            return None
+        try:
+            pofile: polib.POFile = polib.pofile(self.__target_po_file)
+        except (OSError, ValueError):
+            return None
+
+        previous_translation: dict = {}
+        for entry in pofile:
+            message: POMessage = self.__get_message(entry)
+            if message.obsolete:
+                continue
+            if message.msgstr_plural:
+                plural_forms: dict = {
+                    str(index): text
+                    for index, text in message.msgstr_plural.items()
+                    if text
+                }
+                if plural_forms:
+                    previous_translation[message.key] = plural_forms
+            elif message.msgstr:
+                previous_translation[message.key] = message.msgstr
+        return previous_translation
+
     @property
-    def __pofile_source(self) -> polib.POFile:
-        return polib.pofile(self.source_file)
+    def __target_po_file(self) -> str:
+        return f"{os.path.splitext(self._target_file)[0]}.po"
+
+    def __get_message(self, entry: polib.POEntry) -> POMessage:
+        return POMessage(
+            msgid=entry.msgid,
+            msgstr=entry.msgstr,
+            msgctxt=entry.msgctxt,
+            msgid_plural=entry.msgid_plural,
+            msgstr_plural=dict(entry.msgstr_plural) if entry.msgid_plural else None,
+            occurrences=tuple(tuple(occurrence) for occurrence in entry.occurrences),
+            flags=tuple(entry.flags),
+            comment=entry.comment,
+            tcomment=entry.tcomment,
+            obsolete=bool(entry.obsolete),
+        )
 
-    def __update_content(self, translated_content: dict) -> None:
-        for key, value in translated_content.items():
-            self.__content[key]["msgstr"] = value
+    def __get_translatable(self, message: POMessage) -> Any:
+        if not message.msgid_plural:
+            return message.msgid if message.msgstr == "" else message.msgstr
+
+        # * a plural entry is translated as a dictionary, one key for each form
+        return {
+            str(index): message.msgstr_plural.get(index)
+            or (message.msgid if index == 0 else message.msgid_plural)
+            for index in sorted(message.msgstr_plural) or [0, 1]
+        }
+
+    def __get_translated_message(
+        self, message: POMessage, translated_content: dict
+    ) -> POMessage:
+        if message.obsolete or message.key not in translated_content:
+            return message
+
+        translation: Any = translated_content[message.key]
+        if not message.msgid_plural:
+            return message._replace(msgstr=translation)
+        return message._replace(
+            msgstr_plural={int(index): text for index, text in translation.items()}
+        )
+
+    def __get_translated_messages(
+        self, translated_content: dict
+    ) -> Iterator[POMessage]:
+        # * obsolete messages go at the end of the file, as polib writes them
+        for obsolete in (False, True):
+            for message in self.__messages:
+                if message.obsolete == obsolete:
+                    yield self.__get_translated_message(message, translated_content)
+
+    def __write_pofile(self, path: str, translated_content: dict) -> None:
+        wrapwidth: int = self.__header.wrapwidth
+        with open(path, "w+", encoding=self.__header.encoding) as destination:
+            destination.write(str(self.__header))
+            for message in self.__get_translated_messages(translated_content):
+                entry: polib.POEntry = polib.POEntry(
+                    msgid=message.msgid,
+                    msgstr=message.msgstr,
+                    msgctxt=message.msgctxt,
+                    msgid_plural=message.msgid_plural,
+                    msgstr_plural=message.msgstr_plural or {},
+                    occurrences=list(message.occurrences),
+                    flags=list(message.flags),
+                    comment=message.comment,
+                    tcomment=message.tcomment,
+                    obsolete=message.obsolete,
+                )
+                destination.write("\n")
+                destination.write(entry.__unicode__(wrapwidth))
+
+    def __write_mofile(self, path: str, translated_content: dict) -> None:
+        encoding: str = self.__header.encoding
+        strings: List[Tuple[bytes, bytes]] = [
+            (b"", self.__header.metadata_as_entry().msgstr.encode(encoding))
+        ]
+        for message in self.__get_translated_messages(translated_content):
+            if not message.translated:
+                continue
+            if message.msgid_plural:
+                msgid: str = f"{message.msgid}\0{message.msgid_plural}"
+                msgstr: str = "\0".join(
+                    message.msgstr_plural[index]
+                    for index in sorted(message.msgstr_plural)
+                )
+            else:
+                msgid, msgstr = message.msgid, message.msgstr
+            if message.msgctxt:
+                msgid = f"{message.msgctxt}\x04{msgid}"
+            strings.append((msgid.encode(encoding), msgstr.encode(encoding)))
+        # * the originals are sorted so gettext can look them up with a binary search
+        strings.sort(key=lambda pair: pair[0])
+
+        # * every string is followed by a NUL, the header is 7 integers and each string has a size and an offset
+        count: int = len(strings)
+        ids_start: int = 7 * 4 + 16 * count
+        strs_start: int = ids_start + sum(len(msgid) + 1 for msgid, _ in strings)
+        ids_offsets: array.array = array.array("i")
+        strs_offsets: array.array = array.array("i")
+        for msgid, msgstr in strings:
+            ids_offsets.extend((len(msgid), ids_start))
+            strs_offsets.extend((len(msgstr), strs_start))
+            ids_start += len(msgid) + 1
+            strs_start += len(msgstr) + 1
+
+        with open(path, "wb+") as destination:
+            destination.write(
+                struct.pack(
+                    "Iiiiiii",
+                    self.__MO_MAGIC,
+                    0,
+                    count,
+                    7 * 4,
+                    7 * 4 + count * 8,
+                    0,
+                    7 * 4 + 16 * count,
+                )
+            )
+            destination.write(ids_offsets.tobytes())
+            destination.write(strs_offsets.tobytes())
+            for msgid, _ in strings:
+                destination.write(msgid + b"\0")
+            for _, msgstr in strings:
+                destination.write(msgstr + b"\0")
 
 
 class DocumentHandler(FileHandler):
@@ -133,6 +457,7 @@ class DocumentHandler(FileHandler):
 
     def write(self, translated_content: DownloadedDocumentStream) -> None:
         if translated_content:
+            self._make_target_directory()
             with open(self._target_file, "wb+") as destination:
                 for chunk in translated_content:
                     destination.write(chunk)
@@ -0,0 +1,92 @@
+from typing import Any, Iterable, Optional, Union
+
+# * a leaf is reused when it was translated before and its source has not changed since
+# * only the strings the dictionary translator sends are leaves, numbers, booleans, nulls and blank strings are copied from the source
+# * the changes of a list are a dictionary keyed by index, so its unchanged items are not sent again
+
+Container = Union[dict, list]
+
+
+def get_changes(
+    source: Container, snapshot: Optional[Container], target: Optional[Container]
+) -> dict:
+    changes: dict = {}
+    for key, value in get_items(source):
+        previous_source: Any = get_value(snapshot, key)
+        translation: Any = get_value(target, key)
+
+        if isinstance(value, (dict, list)):
+            nested_changes: dict = get_changes(
+                value,
+                previous_source if isinstance(previous_source, type(value)) else None,
+                translation if isinstance(translation, type(value)) else None,
+            )
+            if nested_changes:
+                changes[key] = nested_changes
+            continue
+
+        if not is_leaf(value):
+            continue
+        # * a target equal to its source was kept because the translation failed, a lost placeholder for example
+        translated: bool = isinstance(translation, str) and translation not in (
+            "",
+            value,
+        )
+        unchanged: bool = snapshot is None or previous_source == value
+        if not (translated and unchanged):
+            changes[key] = value
+    return changes
+
+
+def merge(
+    source: Container, target: Optional[Container], translations: Optional[dict]
+) -> Container:
+    # * the target and the translations can miss any leaf, the source has the shape of the result
+    merged: Container = {} if isinstance(source, dict) else [None] * len(source)
+    for key, value in get_items(source):
+        previous: Any = get_value(target, key)
+        translation: Any = get_value(translations, key)
+        if isinstance(value, (dict, list)):
+            merged[key] = merge(
+                value,
+                previous if isinstance(previous, (dict, list)) else None,
+                translation if isinstance(translation, dict) else None,
+            )
+        elif isinstance(translation, str):
+            merged[key] = translation
+        elif is_leaf(value) and isinstance(previous, str) and previous != "":
+            merged[key] = previous
+        else:
+            merged[key] = value
+    return merged
+
+
+def index_lists(container: Container) -> dict:
+    # * a copy where every list is a dictionary keyed by index, so items can be removed without moving the others
+    return {
+        key: index_lists(value) if isinstance(value, (dict, list)) else value
+        for key, value in get_items(container)
+    }
+
+
+def count_leaves(container: Container) -> int:
+    return sum(
+        count_leaves(value) if isinstance(value, (dict, list)) else is_leaf(value)
+        for _, value in get_items(container)
+    )
+
+
+def is_leaf(value: Any) -> bool:
+    return isinstance(value, str) and value.strip() != ""
+
+
+def get_items(container: Container) -> Iterable:
+    return container.items() if isinstance(container, dict) else enumerate(container)
+
+
+def get_value(container: Optional[Container], key: Any) -> Any:
+    if isinstance(container, dict):
+        return container.get(key)
+    if isinstance(container, list) and isinstance(key, int) and 0 <= key < len(container):
+        return container[key]
+    return None
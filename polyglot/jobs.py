@@ -0,0 +1,359 @@
+import asyncio
+import contextlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Union
+
+from polyglot import connectors, license, output, translators
+
+# * a shard whose lease is not renewed in time is given to another worker, e.g. when its worker died
+LEASE_SECONDS: float = 60
+MAX_ATTEMPTS: int = 3
+# * how often a worker without shards checks whether a lease expired
+IDLE_INTERVAL: float = 5
+
+PENDING: str = "pending"
+LEASED: str = "leased"
+DONE: str = "done"
+FAILED: str = "failed"
+
+
+class JobSettings(NamedTuple):
+    source_files: List[str]
+    # * the languages as DeepL wants them, keyed by how they were typed
+    target_langs: Dict[str, str]
+    source_lang: str
+
+
+class JobProgress(NamedTuple):
+    pending: int
+    leased: int
+    done: int
+    failed: int
+
+    @property
+    def finished(self) -> bool:
+        return self.pending == 0 and self.leased == 0
+
+
+@dataclass
+class Shard:
+    id: int
+    target_lang: str
+    texts: List[str]
+
+
+class Job:
+
+    # * a SQLite file, every worker opens it on its own, on this machine or on another one sharing the filesystem
+    # * its locks are used to claim the shards, so the filesystem has to support them
+
+    __connection: sqlite3.Connection
+    __lock: threading.Lock
+
+    def __init__(self, path: str) -> None:
+        self.__lock = threading.Lock()
+        # * the transactions are opened by hand, a claim has to hold the write lock from its read to its update
+        self.__connection = sqlite3.connect(
+            path, timeout=LEASE_SECONDS, isolation_level=None, check_same_thread=False
+        )
+        self.__create_tables()
+
+    def close(self) -> None:
+        self.__connection.close()
+
+    def create(
+        self,
+        settings: JobSettings,
+        texts: Dict[str, List[str]],
+        translations: Dict[str, Dict[str, str]],
+        shard_size: int,
+    ) -> int:
+        # * the texts are keyed by target language, the translations already known are not sharded
+        with self.__transaction():
+            self.__connection.execute(
+                "INSERT INTO settings VALUES (?, ?)",
+                ("job", json.dumps(settings._asdict(), ensure_ascii=False)),
+            )
+
+            shards: int = 0
+            for target_lang, target_texts in texts.items():
+                known_translations: Dict[str, str] = translations.get(target_lang, {})
+                self.__connection.executemany(
+                    "INSERT INTO segments VALUES (?, ?, NULL, ?)",
+                    [
+                        (text, target_lang, translation)
+                        for text, translation in known_translations.items()
+                    ],
+                )
+                new_texts: List[str] = [
+                    text for text in target_texts if text not in known_translations
+                ]
+                for start in range(0, len(new_texts), shard_size):
+                    shard_id: int = self.__connection.execute(
+                        "INSERT INTO shards (target_lang, state, attempts) VALUES (?, ?, 0)",
+                        (target_lang, PENDING),
+                    ).lastrowid
+                    self.__connection.executemany(
+                        "INSERT INTO segments VALUES (?, ?, ?, NULL)",
+                        [
+                            (text, target_lang, shard_id)
+                            for text in new_texts[start : start + shard_size]
+                        ],
+                    )
+                    shards += 1
+        return shards
+
+    @property
+    def settings(self) -> Optional[JobSettings]:
+        with self.__lock:
+            row: Optional[tuple] = self.__connection.execute(
+                "SELECT value FROM settings WHERE key = 'job'"
+            ).fetchone()
+        return JobSettings(**json.loads(row[0])) if row else None
+
+    def claim(self, worker: str) -> Optional[Shard]:
+        now: float = time.time()
+        with self.__transaction():
+            row: Optional[tuple] = self.__connection.execute(
+                "SELECT id, target_lang FROM shards WHERE (state = ? OR (state = ? AND lease_expires < ?)) AND attempts < ? ORDER BY id LIMIT 1",
+                (PENDING, LEASED, now, MAX_ATTEMPTS),
+            ).fetchone()
+            if row is None:
+                return None
+            shard_id, target_lang = row
+            self.__connection.execute(
+                "UPDATE shards SET state = ?, worker = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                (LEASED, worker, now + LEASE_SECONDS, shard_id),
+            )
+            texts: List[str] = [
+                text
+                for (text,) in self.__connection.execute(
+                    "SELECT text FROM segments WHERE shard_id = ?", (shard_id,)
+                )
+            ]
+        return Shard(shard_id, target_lang, texts)
+
+    def renew(self, shard: Shard, worker: str) -> bool:
+        with self.__transaction():
+            return (
+                self.__connection.execute(
+                    "UPDATE shards SET lease_expires = ? WHERE id = ? AND worker = ? AND state = ?",
+                    (time.time() + LEASE_SECONDS, shard.id, worker, LEASED),
+                ).rowcount
+                > 0
+            )
+
+    def complete(self, shard: Shard, translations: Dict[str, str]) -> None:
+        # * a shard taken over after its lease expired can be completed twice, with the same texts
+        with self.__transaction():
+            self.__connection.executemany(
+                "UPDATE segments SET translation = ? WHERE text = ? AND target_lang = ?",
+                [
+                    (translation, text, shard.target_lang)
+                    for text, translation in translations.items()
+                ],
+            )
+            self.__connection.execute(
+                "UPDATE shards SET state = ?, error = NULL WHERE id = ?",
+                (DONE, shard.id),
+            )
+
+    def release(self, shard: Shard, error: str) -> None:
+        with self.__transaction():
+            self.__connection.execute(
+                "UPDATE shards SET state = CASE WHEN attempts < ? THEN ? ELSE ? END, worker = NULL, error = ? WHERE id = ? AND state = ?",
+                (MAX_ATTEMPTS, PENDING, FAILED, error, shard.id, LEASED),
+            )
+
+    def retry_failed(self) -> int:
+        # * the shards that failed too many times, or whose last worker died, get new attempts
+        with self.__transaction():
+            return self.__connection.execute(
+                "UPDATE shards SET state = ?, attempts = 0, worker = NULL WHERE state = ? OR (state = ? AND attempts >= ? AND lease_expires < ?)",
+                (PENDING, FAILED, LEASED, MAX_ATTEMPTS, time.time()),
+            ).rowcount
+
+    def get_progress(self) -> JobProgress:
+        with self.__lock:
+            rows: list = self.__connection.execute(
+                "SELECT state, attempts >= ? AND lease_expires < ?, COUNT(*) FROM shards GROUP BY 1, 2",
+                (MAX_ATTEMPTS, time.time()),
+            ).fetchall()
+        counts: Dict[str, int] = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        for state, abandoned, count in rows:
+            # ! the last attempt of an abandoned shard expired, no worker will claim it again
+            counts[FAILED if state == LEASED and abandoned else state] += count
+        return JobProgress(**counts)
+
+    def get_errors(self) -> List[str]:
+        with self.__lock:
+            return [
+                error
+                for (error,) in self.__connection.execute(
+                    "SELECT DISTINCT error FROM shards WHERE state = ? AND error IS NOT NULL",
+                    (FAILED,),
+                )
+            ]
+
+    def get_translations(self, target_lang: str) -> Dict[str, str]:
+        with self.__lock:
+            return dict(
+                self.__connection.execute(
+                    "SELECT text, translation FROM segments WHERE target_lang = ? AND translation IS NOT NULL",
+                    (target_lang,),
+                ).fetchall()
+            )
+
+    @contextlib.contextmanager
+    def __transaction(self) -> Iterator[None]:
+        # * IMMEDIATE takes the write lock at once, two workers never read the same pending shard
+        with self.__lock:
+            self.__connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self.__connection.execute("ROLLBACK")
+                raise
+            self.__connection.execute("COMMIT")
+
+    def __create_tables(self) -> None:
+        with self.__transaction():
+            self.__connection.execute(
+                """CREATE TABLE IF NOT EXISTS settings (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )"""
+            )
+            self.__connection.execute(
+                """CREATE TABLE IF NOT EXISTS shards (
+                    id INTEGER PRIMARY KEY,
+                    target_lang TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    worker TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL,
+                    error TEXT
+                )"""
+            )
+            self.__connection.execute(
+                """CREATE TABLE IF NOT EXISTS segments (
+                    text TEXT NOT NULL,
+                    target_lang TEXT NOT NULL,
+                    shard_id INTEGER,
+                    translation TEXT,
+                    PRIMARY KEY (text, target_lang)
+                )"""
+            )
+            self.__connection.execute(
+                "CREATE INDEX IF NOT EXISTS segments_shard_id ON segments (shard_id)"
+            )
+
+
+class Worker:
+
+    # * claims shards until the job is finished, a shard is translated by a dictionary translator like the entries of a file
+
+    __job: Job
+    __connector: connectors.EngineConnector
+    __source_lang: str
+    __name: str
+    __translated_shards: int
+
+    def __init__(self, job: Job, connector: connectors.EngineConnector) -> None:
+        self.__job = job
+        self.__connector = connector
+        self.__source_lang = job.settings.source_lang
+        self.__name = f"{socket.gethostname()}:{os.getpid()}"
+        self.__translated_shards = 0
+
+    def run(self) -> int:
+        while True:
+            shard: Optional[Shard] = self.__job.claim(self.__name)
+            if shard is not None:
+                self.__translate(shard)
+                continue
+            if self.__job.get_progress().finished:
+                return self.__translated_shards
+            # * the other shards are leased, they come back if their workers die
+            time.sleep(IDLE_INTERVAL)
+
+    def __translate(self, shard: Shard) -> None:
+        content: Dict[int, str] = dict(enumerate(shard.texts))
+        translator: translators.DictionaryTranslator = translators.DictionaryTranslator(
+            shard.target_lang,
+            self.__source_lang,
+            self.__connector,
+            show_progress=False,
+            show_summary=False,
+        )
+        stop: threading.Event = threading.Event()
+        heartbeat: threading.Thread = threading.Thread(
+            target=self.__renew, args=(shard, stop), daemon=True
+        )
+        heartbeat.start()
+        try:
+            with translator:
+                asyncio.run(translator.translate_async(content))
+        except Exception as error:
+            self.__job.release(shard, str(error))
+            # ! the connector retries what can be retried, the other errors end this worker and the shard waits for another one
+            self.__connector.handle_error(error)
+            return
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        self.__job.complete(shard, dict(zip(shard.texts, content.values())))
+        self.__translated_shards += 1
+        print(
+            f"Shard {shard.id} ({shard.target_lang}): {len(shard.texts)} texts translated."
+        )
+
+    def __renew(self, shard: Shard, stop: threading.Event) -> None:
+        while not stop.wait(LEASE_SECONDS / 3):
+            self.__job.renew(shard, self.__name)
+
+
+def run_worker(
+    path: str,
+    license_manager: license.LicenseManager,
+    max_concurrent_requests: int,
+    output_mode: str,
+) -> None:
+    # * the entry point of the worker processes, each one has its own connector
+    output.set_mode(output_mode)
+    job: Job = Job(path)
+    connector: connectors.AsyncDeeplConnector = connectors.AsyncDeeplConnector(
+        license_manager, max_concurrent_requests
+    )
+    try:
+        Worker(job, connector).run()
+    finally:
+        connector.close()
+        job.close()
+
+
+def apply_translations(
+    container: Union[dict, list], translations: Dict[str, str]
+) -> List[str]:
+    # * the same entries the dictionary translator translates, returns the texts without a translation
+    missing_texts: List[str] = []
+    items: Any = (
+        container.items() if isinstance(container, dict) else enumerate(container)
+    )
+    for key, value in list(items):
+        if isinstance(value, (dict, list)):
+            missing_texts.extend(apply_translations(value, translations))
+        elif isinstance(value, str) and value.strip():
+            translation: Optional[str] = translations.get(value.strip())
+            if translation:
+                container[key] = translation
+            else:
+                missing_texts.append(value)
+    return missing_texts
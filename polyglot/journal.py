@@ -0,0 +1,84 @@
+import json
+import os
+import threading
+from typing import IO, Any, List, NamedTuple, Optional, Tuple
+
+from polyglot import incremental
+
+
+class JournalRecord(NamedTuple):
+    path: List[Any]
+    source: str
+    translation: str
+
+
+class Journal:
+
+    # * append-only, one JSON line for each translated entry, flushed as soon as its batch is done
+
+    __path: str
+    __file: Optional[IO[str]]
+    __lock: threading.Lock
+
+    def __init__(self, path: str) -> None:
+        self.__path = path
+        self.__file = None
+        self.__lock = threading.Lock()
+
+    def read(self) -> List[JournalRecord]:
+        records: List[JournalRecord] = []
+        try:
+            with open(self.__path, "r") as journal:
+                for line in journal:
+                    try:
+                        records.append(JournalRecord(**json.loads(line)))
+                    except (ValueError, TypeError):
+                        # ! the last line is cut when the run was killed while writing it
+                        continue
+        except OSError:
+            pass
+        return records
+
+    def append(self, records: List[JournalRecord]) -> None:
+        lines: str = "".join(
+            json.dumps(record._asdict(), ensure_ascii=False) + "\n" for record in records
+        )
+        with self.__lock:
+            if self.__file is None:
+                # * it sits next to the output, whose directory is created only when the output is written
+                os.makedirs(os.path.dirname(self.__path) or ".", exist_ok=True)
+                self.__file = open(self.__path, "a")
+            self.__file.write(lines)
+            self.__file.flush()
+
+    def clear(self) -> None:
+        self.close()
+        with self.__lock:
+            if os.path.isfile(self.__path):
+                os.remove(self.__path)
+
+    def close(self) -> None:
+        with self.__lock:
+            if self.__file is not None:
+                self.__file.close()
+                self.__file = None
+
+
+def replay(content: dict, records: List[JournalRecord]) -> Tuple[dict, dict]:
+    # * returns the entries still to translate and the translated ones, a record is used only if its source has not changed
+    # * the lists of both are dictionaries keyed by index, as incremental.merge expects them
+    translations: dict = {}
+    remaining: dict = incremental.index_lists(content)
+    for record in records:
+        if not record.path:
+            continue
+        parent: Any = remaining
+        translated_parent: dict = translations
+        for parent_key in record.path[:-1]:
+            parent = parent.get(parent_key) if isinstance(parent, dict) else None
+            translated_parent = translated_parent.setdefault(parent_key, {})
+        key: Any = record.path[-1]
+        if isinstance(parent, dict) and parent.get(key) == record.source:
+            translated_parent[key] = record.translation
+            del parent[key]
+    return remaining, translations
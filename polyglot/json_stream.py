@@ -0,0 +1,175 @@
+import json
+import re
+from json.decoder import scanstring
+from typing import IO, Any, Iterator, List, Tuple
+
+CHUNK_SIZE: int = 64 * 1024
+
+DELIMITERS: str = ",:]} \t\n\r"
+WHITESPACE: re.Pattern = re.compile(r"[ \t\n\r]*")
+SCALAR: re.Pattern = re.compile(
+    r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?|true|false|null"
+)
+
+# * events: start_map, map_key, end_map, start_array, end_array, string and scalar (numbers, booleans and nulls, as they are written)
+Event = Tuple[str, Any]
+
+
+def tokenize(source: IO[str]) -> Iterator[Tuple[str, str]]:
+    # * only a chunk and the token that crosses its end are kept in memory
+    buffer: str = ""
+    position: int = 0
+    end_of_file: bool = False
+
+    while True:
+        position = WHITESPACE.match(buffer, position).end()
+        if position == len(buffer) and end_of_file:
+            return
+
+        token: Any = None
+        if position < len(buffer):
+            character: str = buffer[position]
+            if character in "{}[],:":
+                yield "punctuation", character
+                position += 1
+                continue
+            if character == '"':
+                try:
+                    value, end = scanstring(buffer, position + 1)
+                    token = ("string", value)
+                except json.JSONDecodeError:
+                    if end_of_file:
+                        raise
+            else:
+                match: Any = SCALAR.match(buffer, position)
+                # * a scalar is complete only when followed by a delimiter, "12" could be the start of "12.5"
+                if match and (
+                    end_of_file
+                    or (match.end() < len(buffer) and buffer[match.end()] in DELIMITERS)
+                ):
+                    token, end = ("scalar", match.group(0)), match.end()
+                elif end_of_file:
+                    raise json.JSONDecodeError("Expecting value", buffer, position)
+
+        if token is not None:
+            yield token
+            position = end
+            continue
+
+        # ! the token is incomplete or the buffer is empty, the next chunk is appended
+        chunk: str = source.read(CHUNK_SIZE)
+        end_of_file = chunk == ""
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+def iterparse(source: IO[str]) -> Iterator[Event]:
+    # * the token expected next: value, key, colon, comma (or the end of the container) and end (of the document)
+    containers: List[str] = []
+    expected: str = "value"
+    can_close: bool = False
+
+    for kind, value in tokenize(source):
+        if kind == "punctuation" and value in "}]":
+            if not containers or containers[-1] != {"}": "{", "]": "["}[value]:
+                raise json.JSONDecodeError(f"Unexpected {value!r}", "", 0)
+            if not (can_close or expected == "comma"):
+                raise json.JSONDecodeError(f"Expecting {expected}", "", 0)
+            containers.pop()
+            yield ("end_map" if value == "}" else "end_array"), None
+        elif expected == "key":
+            if kind != "string":
+                raise json.JSONDecodeError(
+                    "Expecting property name enclosed in double quotes", "", 0
+                )
+            expected, can_close = "colon", False
+            yield "map_key", value
+            continue
+        elif expected in ("colon", "comma"):
+            if (kind, value) != ("punctuation", ":" if expected == "colon" else ","):
+                raise json.JSONDecodeError(f"Expecting {expected}", "", 0)
+            expected = "key" if expected == "comma" and containers[-1] == "{" else "value"
+            continue
+        elif expected == "end":
+            raise json.JSONDecodeError("Extra data", "", 0)
+        elif kind == "punctuation" and value in "{[":
+            containers.append(value)
+            expected, can_close = ("key" if value == "{" else "value"), True
+            yield ("start_map" if value == "{" else "start_array"), None
+            continue
+        elif kind == "punctuation":
+            raise json.JSONDecodeError("Expecting value", "", 0)
+        else:
+            yield kind, value
+
+        # * a value or a container was completed
+        expected, can_close = ("comma" if containers else "end"), False
+
+    if expected != "end":
+        raise json.JSONDecodeError("Unexpected end of file", "", 0)
+
+
+def iterleaves(source: IO[str]) -> Iterator[Tuple[Tuple[Any, ...], str]]:
+    # * the path of every string that is not a key, array items are identified by their index
+    path: List[Any] = []
+    in_array: List[bool] = []
+
+    for event, value in iterparse(source):
+        if event in ("string", "scalar", "start_map", "start_array") and (
+            in_array and in_array[-1]
+        ):
+            path[-1] += 1
+
+        if event == "string":
+            yield tuple(path), value
+        elif event == "map_key":
+            path[-1] = value
+        elif event in ("start_map", "start_array"):
+            path.append(None if event == "start_map" else -1)
+            in_array.append(event == "start_array")
+        elif event in ("end_map", "end_array"):
+            path.pop()
+            in_array.pop()
+
+
+class JSONStreamWriter:
+
+    # * the output is the same of json.dumps(indent=2), written while the events arrive
+
+    __INDENT: str = "  "
+
+    __destination: IO[str]
+    __children: List[int]
+    __after_key: bool
+
+    def __init__(self, destination: IO[str]) -> None:
+        self.__destination = destination
+        self.__children = []
+        self.__after_key = False
+
+    def write(self, event: str, value: Any = None) -> None:
+        if event in ("end_map", "end_array"):
+            if self.__children.pop():
+                self.__write_line_break()
+            self.__destination.write("}" if event == "end_map" else "]")
+            return
+
+        if self.__children and not self.__after_key:
+            self.__destination.write("," if self.__children[-1] else "")
+            self.__write_line_break()
+            self.__children[-1] += 1
+        self.__after_key = False
+
+        if event == "map_key":
+            self.__destination.write(f"{json.dumps(value)}: ")
+            self.__after_key = True
+        elif event in ("start_map", "start_array"):
+            self.__destination.write("{" if event == "start_map" else "[")
+            self.__children.append(0)
+        elif event == "string":
+            self.__destination.write(json.dumps(value))
+        else:
+            self.__destination.write(value)
+
+    def __write_line_break(self) -> None:
+        self.__destination.write("\n" + self.__INDENT * len(self.__children))
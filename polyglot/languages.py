@@ -0,0 +1,104 @@
+import json
+import os
+import pathlib
+import time
+from dataclasses import dataclass
+from typing import Dict, List, NamedTuple, Optional, Set
+
+# * DeepL adds languages rarely, --purge-cache drops the cache before a day has passed
+CACHE_TTL: float = 24 * 60 * 60
+
+# * accepted as source languages, but as targets DeepL wants the variant
+DEPRECATED_TARGET_LANGS: Dict[str, str] = {"EN": "EN-US", "PT": "PT-PT"}
+
+
+class Language(NamedTuple):
+    code: str
+    name: str
+    supports_formality: bool = False
+
+
+@dataclass
+class SupportedLanguages:
+    source: List[Language]
+    target: List[Language]
+
+    def get_source_code(self, code: str) -> Optional[str]:
+        # * a variant like EN-US is accepted as a source and sent as EN
+        code = code.upper()
+        codes: Set[str] = {language.code.upper() for language in self.source}
+        if code in codes:
+            return code
+        base_code: str = code.split("-")[0]
+        return base_code if base_code in codes else None
+
+    def get_target_code(self, code: str) -> Optional[str]:
+        code = get_target_code(code)
+        codes: Set[str] = {language.code.upper() for language in self.target}
+        return code if code in codes else None
+
+
+def get_target_code(code: str) -> str:
+    code = code.upper()
+    return DEPRECATED_TARGET_LANGS.get(code, code)
+
+
+class LanguageCache:
+
+    __path: str
+    __ttl: float
+
+    def __init__(self, path: str = "", ttl: float = CACHE_TTL) -> None:
+        self.__path = path if path != "" else self.__default_path
+        self.__ttl = ttl
+
+    def read(self) -> Optional[SupportedLanguages]:
+        try:
+            with open(self.__path, "r") as cache:
+                content: dict = json.load(cache)
+            if time.time() - content["updated"] > self.__ttl:
+                return None
+            return SupportedLanguages(
+                source=[Language(**language) for language in content["source"]],
+                target=[Language(**language) for language in content["target"]],
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def write(self, languages: SupportedLanguages) -> None:
+        content: dict = {
+            "updated": time.time(),
+            "source": [language._asdict() for language in languages.source],
+            "target": [language._asdict() for language in languages.target],
+        }
+        # * replaced at once, a concurrent run never reads half a file
+        temporary_path: str = f"{self.__path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary_path, "w") as cache:
+                json.dump(content, cache)
+            os.replace(temporary_path, self.__path)
+        except OSError:
+            # ! the cache is an optimization, a read-only home only means more requests
+            if os.path.isfile(temporary_path):
+                os.remove(temporary_path)
+
+    def clear(self) -> None:
+        if os.path.isfile(self.__path):
+            os.remove(self.__path)
+
+    @property
+    def __default_path(self) -> str:
+        return f"{pathlib.Path.home()}/.polyglot_languages.json"
+
+
+def print_supported_languages(languages: SupportedLanguages) -> None:
+    print("\nAvailable source languages:")
+    for language in languages.source:
+        print(f"{language.name} ({language.code})")
+
+    print("\nAvailable target languages:")
+    for language in languages.target:
+        lang: str = f"{language.name} ({language.code})"
+        if language.supports_formality:
+            lang += " - formality supported"
+        print(lang)
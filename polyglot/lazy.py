@@ -0,0 +1,18 @@
+import sys
+import types
+from typing import Any
+
+
+class LazyModule(types.ModuleType):
+
+    # * a stand-in that imports the module on its first use, so each command pays only for the modules it needs
+    # * the import system has its own locks, the first use can happen from any thread
+
+    def __getattr__(self, name: str) -> Any:
+        # * through __import__ like an import statement, so -X importtime reports the module when it is loaded
+        __import__(self.__name__)
+        return getattr(sys.modules[self.__name__], name)
+
+
+def load(name: str) -> Any:
+    return LazyModule(name)
@@ -0,0 +1,146 @@
+import pathlib
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+MAX_ENTRIES: int = 500000
+
+
+class TranslationMemory:
+
+    # * SQLite versions before 3.32 allow at most 999 variables per query
+    __QUERY_SIZE: int = 500
+
+    hits: int
+    misses: int
+
+    __path: str
+    __max_entries: int
+    __entries: int
+    __connection: sqlite3.Connection
+    __lock: threading.Lock
+
+    def __init__(self, path: str = "", max_entries: int = MAX_ENTRIES) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.__path = path if path != "" else self.__default_path
+        self.__max_entries = max_entries
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(self.__path, check_same_thread=False)
+        self.__create_table()
+
+    def get(self, text: str, target_lang: str, source_lang: str = "") -> Optional[str]:
+        return self.get_many([text], target_lang, source_lang).get(text)
+
+    def get_many(
+        self, texts: List[str], target_lang: str, source_lang: str = ""
+    ) -> Dict[str, str]:
+        with self.__lock, self.__connection:
+            translations: Dict[str, str] = self.__select(
+                texts, target_lang, source_lang
+            )
+
+            self.__connection.executemany(
+                "UPDATE translations SET last_used = ? WHERE text = ? AND target_lang = ? AND source_lang = ?",
+                [(time.time(), text, target_lang, source_lang) for text in translations],
+            )
+
+            hits: int = sum(1 for text in texts if text in translations)
+            self.hits += hits
+            self.misses += len(texts) - hits
+
+        return translations
+
+    def get_memorized_texts(
+        self, texts: List[str], target_lang: str, source_lang: str = ""
+    ) -> Set[str]:
+        # * unlike get_many, the statistics and the last use of the translations are not updated
+        with self.__lock:
+            return set(self.__select(texts, target_lang, source_lang))
+
+    def set(
+        self, text: str, translation: str, target_lang: str, source_lang: str = ""
+    ) -> None:
+        self.set_many({text: translation}, target_lang, source_lang)
+
+    def set_many(
+        self, translations: Dict[str, str], target_lang: str, source_lang: str = ""
+    ) -> None:
+        now: float = time.time()
+        rows: List[tuple] = [
+            (text, source_lang, target_lang, translation, now)
+            for text, translation in translations.items()
+            if translation
+        ]
+        with self.__lock, self.__connection:
+            # * the new rows are counted, so the size of the table is known without counting it again
+            inserted: int = self.__connection.executemany(
+                "INSERT OR IGNORE INTO translations VALUES (?, ?, ?, ?, ?)", rows
+            ).rowcount
+            if inserted < len(rows):
+                self.__connection.executemany(
+                    "UPDATE translations SET translation = ?, last_used = ? WHERE text = ? AND source_lang = ? AND target_lang = ?",
+                    [
+                        (translation, last_used, text, source, target)
+                        for text, source, target, translation, last_used in rows
+                    ],
+                )
+            self.__entries += inserted
+            self.__evict()
+
+    def purge(self) -> None:
+        with self.__lock, self.__connection:
+            self.__connection.execute("DELETE FROM translations")
+            self.__entries = 0
+        self.__connection.execute("VACUUM")
+
+    def close(self) -> None:
+        self.__connection.close()
+
+    @property
+    def __default_path(self) -> str:
+        return f"{pathlib.Path.home()}/.polyglot_memory.sqlite3"
+
+    def __create_table(self) -> None:
+        with self.__connection:
+            self.__connection.execute(
+                """CREATE TABLE IF NOT EXISTS translations (
+                    text TEXT NOT NULL,
+                    source_lang TEXT NOT NULL,
+                    target_lang TEXT NOT NULL,
+                    translation TEXT NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (text, source_lang, target_lang)
+                )"""
+            )
+            self.__connection.execute(
+                "CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)"
+            )
+            self.__entries = self.__connection.execute(
+                "SELECT COUNT(*) FROM translations"
+            ).fetchone()[0]
+
+    def __select(
+        self, texts: List[str], target_lang: str, source_lang: str
+    ) -> Dict[str, str]:
+        unique_texts: List[str] = list(dict.fromkeys(texts))
+        translations: Dict[str, str] = {}
+        for start in range(0, len(unique_texts), self.__QUERY_SIZE):
+            chunk: List[str] = unique_texts[start : start + self.__QUERY_SIZE]
+            placeholders: str = ",".join("?" * len(chunk))
+            rows: list = self.__connection.execute(
+                f"SELECT text, translation FROM translations WHERE target_lang = ? AND source_lang = ? AND text IN ({placeholders})",
+                [target_lang, source_lang, *chunk],
+            ).fetchall()
+            translations.update(rows)
+        return translations
+
+    def __evict(self) -> None:
+        # * least recently used translations go first
+        # ! the count misses the rows written by other processes since this one opened the memory, they evict on their own writes
+        if self.__entries > self.__max_entries:
+            self.__entries -= self.__connection.execute(
+                "DELETE FROM translations WHERE rowid IN (SELECT rowid FROM translations ORDER BY last_used LIMIT ?)",
+                (self.__entries - self.__max_entries,),
+            ).rowcount
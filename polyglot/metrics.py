@@ -0,0 +1,138 @@
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+
+class RequestMetrics(NamedTuple):
+    # * one for every request sent, retries included: attempt is 0 the first time
+    started: float
+    latency: float
+    texts: int
+    characters: int
+    attempt: int = 0
+    error: Optional[str] = None
+
+
+Listener = Callable[[RequestMetrics], None]
+
+
+@contextmanager
+def measure(
+    notify: Callable[[RequestMetrics], None], contents: List[str], attempt: int = 0
+) -> Iterator[None]:
+    started: float = time.perf_counter()
+    error: Optional[str] = None
+    try:
+        yield
+    except BaseException as exception:
+        error = type(exception).__name__
+        raise
+    finally:
+        notify(
+            RequestMetrics(
+                started=started,
+                latency=time.perf_counter() - started,
+                texts=len(contents),
+                characters=sum(len(content) for content in contents),
+                attempt=attempt,
+                error=error,
+            )
+        )
+
+
+def get_percentile(sorted_values: List[float], percentile: float) -> float:
+    # * nearest rank, so the value is always one that was measured
+    if not sorted_values:
+        return 0.0
+    rank: int = math.ceil(percentile / 100 * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
+
+
+class MetricsCollector:
+
+    # * a connector listener, it is called from the threads that send the requests
+
+    cache_hits: int
+    cache_misses: int
+
+    __requests: List[RequestMetrics]
+    __lock: threading.Lock
+
+    def __init__(self) -> None:
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.__requests = []
+        self.__lock = threading.Lock()
+
+    def __call__(self, request_metrics: RequestMetrics) -> None:
+        with self.__lock:
+            self.__requests.append(request_metrics)
+
+    def get_summary(self) -> dict:
+        with self.__lock:
+            requests: List[RequestMetrics] = list(self.__requests)
+
+        successful_requests: List[RequestMetrics] = [
+            request for request in requests if request.error is None
+        ]
+        latencies: List[float] = sorted(request.latency for request in requests)
+        texts: List[int] = [request.texts for request in successful_requests]
+        start: float = min((request.started for request in requests), default=0.0)
+        end: float = max(
+            (request.started + request.latency for request in requests), default=0.0
+        )
+        in_flight: List[Tuple[float, int]] = self.__get_in_flight(requests, start)
+
+        return {
+            "duration": round(end - start, 3),
+            "requests": len(requests),
+            "failed_requests": len(requests) - len(successful_requests),
+            "retries": sum(request.attempt > 0 for request in requests),
+            "texts": sum(texts),
+            "texts_per_request": {
+                "mean": round(sum(texts) / len(texts), 2) if texts else 0,
+                "max": max(texts, default=0),
+            },
+            "billed_characters": sum(
+                request.characters for request in successful_requests
+            ),
+            "latency": {
+                "p50": round(get_percentile(latencies, 50), 4),
+                "p95": round(get_percentile(latencies, 95), 4),
+                "p99": round(get_percentile(latencies, 99), 4),
+                "max": round(latencies[-1], 4) if latencies else 0.0,
+            },
+            "cache": {"hits": self.cache_hits, "misses": self.cache_misses},
+            "in_flight": {
+                "max": max((count for _, count in in_flight), default=0),
+                "timeline": [
+                    [round(time_point, 4), count] for time_point, count in in_flight
+                ],
+            },
+        }
+
+    def write(self, path: str) -> None:
+        with open(path, "w") as metrics_file:
+            json.dump(self.get_summary(), metrics_file, indent=2)
+
+    def __get_in_flight(
+        self, requests: List[RequestMetrics], start: float
+    ) -> List[Tuple[float, int]]:
+        # * every request adds one when it is sent and removes it when it ends, seconds are relative to the first one
+        changes: Dict[float, int] = {}
+        for request in requests:
+            sent: float = request.started - start
+            changes[sent] = changes.get(sent, 0) + 1
+            changes[sent + request.latency] = changes.get(sent + request.latency, 0) - 1
+
+        in_flight: List[Tuple[float, int]] = []
+        count: int = 0
+        for time_point in sorted(changes):
+            if changes[time_point] == 0:
+                continue
+            count += changes[time_point]
+            in_flight.append((time_point, count))
+        return in_flight
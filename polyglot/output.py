@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+import sys
+import time
+from typing import IO, Iterable, Optional
+
+from polyglot import lazy
+
+# * only the text mode draws a bar
+progressbar = lazy.load("progressbar")
+
+TEXT: str = "text"
+QUIET: str = "quiet"
+JSON: str = "json"
+MODES: list = [TEXT, QUIET, JSON]
+
+# * seconds between two renderings of the same progress
+PROGRESS_INTERVAL: float = 0.2
+
+mode: str = TEXT
+# * the real stdout, colorama wraps sys.stdout and would add its reset codes to the records
+_records_stream: IO[str] = sys.__stdout__
+
+
+def set_mode(output_mode: str) -> None:
+    global mode
+    mode = output_mode
+
+
+def write_records(records: Iterable[dict]) -> None:
+    # * one write for the whole batch, so the lines of concurrent batches are not mixed
+    lines: str = "".join(
+        json.dumps(record, ensure_ascii=False) + "\n" for record in records
+    )
+    _records_stream.write(lines)
+    _records_stream.flush()
+
+
+class ProgressReporter:
+
+    # * updated only from the loop of its translation, so the count needs no lock, and rendered at most once per interval
+
+    __target_lang: str
+    __total: int
+    __count: int
+    __interval: float
+    __next_rendering: float
+    __bar: Optional[progressbar.ProgressBar]
+
+    def __init__(self, total: int, target_lang: str, show_bar: bool = True) -> None:
+        self.__target_lang = target_lang
+        self.__total = total
+        self.__count = 0
+        self.__interval = PROGRESS_INTERVAL
+        self.__next_rendering = 0.0
+        self.__bar = (
+            progressbar.ProgressBar(max_value=total, redirect_stdout=True)
+            if show_bar and mode == TEXT
+            else None
+        )
+
+    def update(self, count: int) -> None:
+        self.__count = count
+        now: float = time.monotonic()
+        if count < self.__total and now < self.__next_rendering:
+            return
+        self.__next_rendering = now + self.__interval
+        self.__render()
+
+    def __render(self) -> None:
+        if self.__bar is not None:
+            self.__bar.update(self.__count)
+        elif mode == JSON:
+            write_records(
+                [
+                    {
+                        "event": "progress",
+                        "target_lang": self.__target_lang,
+                        "completed": self.__count,
+                        "total": self.__total,
+                    }
+                ]
+            )
@@ -0,0 +1,97 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+TOKEN_TAG: str = "x"
+# * texts are joined with this character to mask or restore a whole batch with a single substitution
+SEPARATOR: str = "\x00"
+
+PLACEHOLDER: re.Pattern = re.compile(
+    "|".join(
+        (
+            r"\{\{[^{}]*\}\}",  # * {{name}}
+            r"\{[^{}]*\}",  # * {count}, {0}
+            r"%(?:\d+\$|\([^()]*\))?[-+#0]*\d*(?:\.\d+)?[sdifuxX@]",  # * %s, %1$d, %(name)s
+            r"</?[A-Za-z][^<>]*>",  # * inline markup
+            r"&(?:[A-Za-z]+|#\d+|#x[0-9A-Fa-f]+);",  # * entities
+        )
+    )
+)
+MASK: re.Pattern = re.compile(f"(?P<placeholder>{PLACEHOLDER.pattern})|[&<>]|{SEPARATOR}")
+RESTORE: re.Pattern = re.compile(
+    f'{SEPARATOR}|<{TOKEN_TAG} i="(?P<token>\\d+)"\\s*/>|&(?P<entity>amp|lt|gt|quot|apos);'
+)
+
+XML_ESCAPES: Dict[str, str] = {"&": "&amp;", "<": "&lt;", ">": "&gt;"}
+XML_UNESCAPES: Dict[str, str] = {
+    "amp": "&",
+    "lt": "<",
+    "gt": ">",
+    "quot": '"',
+    "apos": "'",
+}
+
+
+@dataclass
+class MaskedText:
+    text: str
+    masked: str
+    placeholders: List[str]
+
+
+def needs_protection(text: str) -> bool:
+    return SEPARATOR not in text and PLACEHOLDER.search(text) is not None
+
+
+def mask(texts: List[str]) -> List[MaskedText]:
+    # * each placeholder becomes an empty tag numbered within its text, the rest is escaped for the XML tag handling
+    placeholders: List[List[str]] = [[]]
+
+    def replace(match: re.Match) -> str:
+        if match.group("placeholder"):
+            placeholders[-1].append(match.group(0))
+            return f'<{TOKEN_TAG} i="{len(placeholders[-1]) - 1}"/>'
+        if match.group(0) == SEPARATOR:
+            placeholders.append([])
+            return SEPARATOR
+        return XML_ESCAPES[match.group(0)]
+
+    masked_texts: List[str] = MASK.sub(replace, SEPARATOR.join(texts)).split(SEPARATOR)
+    return [
+        MaskedText(text, masked_text, text_placeholders)
+        for text, masked_text, text_placeholders in zip(
+            texts, masked_texts, placeholders
+        )
+    ]
+
+
+def restore(
+    translations: List[str], masked_texts: List[MaskedText]
+) -> List[Optional[str]]:
+    # * a translation is rejected unless each of its placeholders came back exactly once
+    found_tokens: List[List[int]] = [[] for _ in masked_texts]
+    segment: int = 0
+
+    def replace(match: re.Match) -> str:
+        nonlocal segment
+        if match.group(0) == SEPARATOR:
+            segment += 1
+            return SEPARATOR
+        if match.group("token") is not None:
+            token: int = int(match.group("token"))
+            found_tokens[segment].append(token)
+            placeholders: List[str] = masked_texts[segment].placeholders
+            return placeholders[token] if token < len(placeholders) else ""
+        return XML_UNESCAPES[match.group("entity")]
+
+    restored_texts: List[str] = RESTORE.sub(
+        replace, SEPARATOR.join(translations)
+    ).split(SEPARATOR)
+    return [
+        restored_text
+        if sorted(tokens) == list(range(len(masked_text.placeholders)))
+        else None
+        for restored_text, tokens, masked_text in zip(
+            restored_texts, found_tokens, masked_texts
+        )
+    ]
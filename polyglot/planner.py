@@ -0,0 +1,169 @@
+import html
+import os
+import re
+import zipfile
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+import colorama
+
+from polyglot import memory
+
+# * DeepL bills at least 50000 characters for every translated document
+DOCUMENT_MINIMUM_CHARACTERS: int = 50000
+
+XML_TEXT: re.Pattern = re.compile(r"<(?:w|a):t(?:\s[^>]*)?>([^<]*)</(?:w|a):t>")
+HTML_TAG: re.Pattern = re.compile(
+    r"<script.*?</script>|<style.*?</style>|<[^>]*>", re.DOTALL
+)
+
+
+@dataclass
+class PlannedTranslation:
+    name: str
+    target_lang: str
+    characters: int
+    scheduled: bool = True
+    exact: bool = True
+
+
+class Planner:
+
+    # * files are scheduled in their order as long as they fit in the budget, the others are left for a later run
+
+    planned_characters: int
+
+    __memory: Optional[memory.TranslationMemory]
+    __source_lang: str
+    __budget: Optional[int]
+    __seen_texts: Dict[str, Set[str]]
+
+    def __init__(
+        self,
+        translation_memory: Optional[memory.TranslationMemory],
+        source_lang: str,
+        budget: Optional[int],
+    ) -> None:
+        self.planned_characters = 0
+        self.__memory = translation_memory
+        self.__source_lang = source_lang
+        self.__budget = budget
+        self.__seen_texts = {}
+
+    def plan(
+        self,
+        name: str,
+        target_lang: str,
+        texts: Optional[Iterable[str]],
+        deduplicated: bool = False,
+    ) -> PlannedTranslation:
+        # * texts is None for documents, they are billed by DeepL after their conversion
+        if texts is None:
+            characters, exact = get_document_characters(name)
+            new_texts: Set[str] = set()
+        else:
+            characters, new_texts = self.__estimate(texts, target_lang, deduplicated)
+            exact = True
+
+        scheduled: bool = (
+            self.__budget is None
+            or self.planned_characters + characters <= self.__budget
+        )
+        if scheduled:
+            self.planned_characters += characters
+            self.__seen_texts.setdefault(target_lang, set()).update(new_texts)
+        return PlannedTranslation(name, target_lang, characters, scheduled, exact)
+
+    def __estimate(
+        self, texts: Iterable[str], target_lang: str, deduplicated: bool
+    ) -> Tuple[int, Set[str]]:
+        # * without deduplication every occurrence is counted, so the estimate is never lower than the real cost
+        seen_texts: Set[str] = (
+            self.__seen_texts.get(target_lang, set()) if deduplicated else set()
+        )
+        stripped_texts: List[str] = [
+            stripped_text
+            for stripped_text in (text.strip() for text in texts)
+            if stripped_text and stripped_text not in seen_texts
+        ]
+        memorized_texts: Set[str] = (
+            self.__memory.get_memorized_texts(
+                stripped_texts, target_lang, self.__source_lang
+            )
+            if self.__memory
+            else set()
+        )
+        billed_texts: List[str] = [
+            text for text in stripped_texts if text not in memorized_texts
+        ]
+
+        if not deduplicated:
+            return sum(len(text) for text in billed_texts), set()
+        unique_texts: Set[str] = set(billed_texts)
+        return sum(len(text) for text in unique_texts), unique_texts
+
+
+def get_texts(container: Union[dict, list]) -> Iterator[str]:
+    # * the same strings the dictionary translator sends, numbers, booleans and nulls are not billed
+    items: Iterable[Any] = (
+        container.values() if isinstance(container, dict) else container
+    )
+    for value in items:
+        if isinstance(value, (dict, list)):
+            yield from get_texts(value)
+        elif isinstance(value, str):
+            yield value
+
+
+def get_document_characters(path: str) -> Tuple[int, bool]:
+    # * the text of Word, PowerPoint and HTML documents can be counted, PDFs cannot
+    extension: str = os.path.splitext(path)[1]
+    try:
+        if extension in (".docx", ".pptx"):
+            with zipfile.ZipFile(path) as document:
+                characters: int = sum(
+                    len(html.unescape(text))
+                    for name in document.namelist()
+                    if name.endswith(".xml")
+                    and name.startswith(("word/", "ppt/slides/"))
+                    for text in XML_TEXT.findall(document.read(name).decode("utf-8"))
+                )
+        elif extension in (".html", ".htm"):
+            with open(path, "r", errors="replace") as document:
+                characters = len(
+                    " ".join(html.unescape(HTML_TAG.sub(" ", document.read())).split())
+                )
+        else:
+            return DOCUMENT_MINIMUM_CHARACTERS, False
+    except (OSError, zipfile.BadZipFile, UnicodeDecodeError):
+        return DOCUMENT_MINIMUM_CHARACTERS, False
+    return max(characters, DOCUMENT_MINIMUM_CHARACTERS), True
+
+
+def print_plan(
+    planned_translations: List[PlannedTranslation],
+    budget: Optional[int],
+    remaining_characters: Optional[int],
+) -> None:
+    print("\nEstimated characters:")
+    for planned_translation in planned_translations:
+        characters: str = (
+            str(planned_translation.characters)
+            if planned_translation.exact
+            else f"at least {planned_translation.characters}"
+        )
+        line: str = f"{planned_translation.name} ({planned_translation.target_lang}): {characters}"
+        if not planned_translation.scheduled:
+            line = f"{colorama.Fore.YELLOW}{line} - skipped, over the budget{colorama.Fore.RESET}"
+        print(line)
+
+    total: int = sum(
+        planned_translation.characters
+        for planned_translation in planned_translations
+        if planned_translation.scheduled
+    )
+    print(f"Total: {total}")
+    if remaining_characters is not None:
+        print(f"Remaining quota: {remaining_characters}")
+    if budget is not None:
+        print(f"Budget: {budget}")
@@ -1,75 +1,768 @@
+from __future__ import annotations
+
+import contextlib
+import copy
+import glob
 import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 import colorama
 from colorama import init
 
-from polyglot import handlers, arguments, license, translators, connectors
+from polyglot import (
+    arguments,
+    license,
+    incremental,
+    journal,
+    languages,
+    lazy,
+    metrics,
+    output,
+)
+from polyglot.errors import BudgetError, HandlerError, JobError, LanguageError
+from polyglot.utils import TranslatedDocument
+
+# * imported on first use: set-license, languages and info never load the handlers or the translators
+asyncio = lazy.load("asyncio")
+multiprocessing = lazy.load("multiprocessing")
+handlers = lazy.load("polyglot.handlers")
+translators = lazy.load("polyglot.translators")
+connectors = lazy.load("polyglot.connectors")
+memory = lazy.load("polyglot.memory")
+deduplication = lazy.load("polyglot.deduplication")
+planner = lazy.load("polyglot.planner")
+watcher = lazy.load("polyglot.watcher")
+server = lazy.load("polyglot.server")
+jobs = lazy.load("polyglot.jobs")
 
 # ! Do not move colorama init. Autoreset works only here
 init(autoreset=True)
 
 DOCUMENTS_SUPPORTED_BY_DEEPL: list = [".docx", ".pptx", ".html", ".htm", ".pdf"]
+SUPPORTED_FILES: list = [
+    *DOCUMENTS_SUPPORTED_BY_DEEPL,
+    ".json",
+    ".po",
+    ".pot",
+    ".txt",
+    ".dat",
+]
+# * their entries can be split in shards and put back one by one
+JOB_FILES: list = [".json", ".po", ".pot"]
 
 
 @dataclass
 class FileTranslator:
     handler: handlers.FileHandler
     translator: translators.Translator
+    content: Any
+    file_journal: Optional[journal.Journal] = None
 
 
 class Polyglot:
     __arguments: arguments.Arguments
     __connector: connectors.EngineConnector
+    __memory: Optional[memory.TranslationMemory] = None
+    __metrics: Optional[metrics.MetricsCollector] = None
+    __deduplicator: deduplication.Deduplicator
+    # * the languages as DeepL wants them, keyed by how they were typed, which still names the output files
+    __target_langs: Dict[str, str]
+    __source_lang: str
 
     def __init__(self, arguments: arguments.Arguments):
         self.__arguments = arguments
+        self.__target_langs = {
+            target_lang: target_lang for target_lang in arguments.target_langs
+        }
+        self.__source_lang = arguments.source_lang
 
     def execute_command(self):
+        output.set_mode(self.__arguments.output_mode)
+        # * in json mode stdout is left to the records, the messages go to stderr
+        with (
+            contextlib.redirect_stdout(sys.stderr)
+            if output.mode == output.JSON
+            else contextlib.nullcontext()
+        ):
+            self.__execute_command()
+
+    def __execute_command(self) -> None:
+
+        if self.__arguments.purge_cache:
+            self.__purge_memory()
 
         if self.__arguments.action == "set-license":
             self.__license_manager.set_license()
             return
 
-        self.__connector = connectors.DeeplConnector(
+        self.__connector = connectors.AsyncDeeplConnector(
             license_manager=self.__license_manager,
+            max_concurrent_requests=self.__arguments.max_concurrent_requests,
         )
+        if self.__arguments.metrics_file:
+            self.__metrics = metrics.MetricsCollector()
+            self.__connector.add_listener(self.__metrics)
 
-        if self.__arguments.action == "translate":
-            file_translator: FileTranslator = self.__get_file_translator()
-            content: Any = file_translator.handler.read()
-            translated_content: Any = file_translator.translator.translate(content)
-            file_translator.handler.write(translated_content)
-            print(f"\n{colorama.Fore.GREEN}Finish.\n{colorama.Fore.RESET}")
+        try:
+            if self.__arguments.action == "translate":
+                self.__validate_languages()
+                if self.__arguments.use_cache:
+                    self.__memory = memory.TranslationMemory()
+                try:
+                    source_files: List[str] = self.__get_source_files()
+                    self.__translate(
+                        source_files, self.__get_source_root(source_files)
+                    )
+                finally:
+                    # * written even when the run fails, the failed requests are in the metrics too
+                    self.__write_metrics()
+                self.__close_memory()
+                print(f"\n{colorama.Fore.GREEN}Finish.\n{colorama.Fore.RESET}")
+
+            elif self.__arguments.action == "watch":
+                self.__validate_languages()
+                if self.__arguments.use_cache:
+                    self.__memory = memory.TranslationMemory()
+                try:
+                    self.__watch()
+                finally:
+                    # * the watch ends with Ctrl+C, the metrics cover the whole session
+                    self.__write_metrics()
+                    self.__close_memory()
+
+            elif self.__arguments.action == "serve":
+                if self.__arguments.use_cache:
+                    self.__memory = memory.TranslationMemory()
+                try:
+                    self.__serve()
+                finally:
+                    self.__write_metrics()
+                    self.__close_memory()
+
+            elif self.__arguments.action == "job-create":
+                self.__validate_languages()
+                if self.__arguments.use_cache:
+                    self.__memory = memory.TranslationMemory()
+                self.__create_job()
+                self.__close_memory()
+
+            elif self.__arguments.action == "job-work":
+                try:
+                    self.__work()
+                finally:
+                    self.__write_metrics()
+
+            elif self.__arguments.action == "job-merge":
+                if self.__arguments.use_cache:
+                    self.__memory = memory.TranslationMemory()
+                self.__merge_job()
+                self.__close_memory()
 
-        elif self.__arguments.action == "languages":
-            self.__connector.print_supported_languages()
+            elif self.__arguments.action == "languages":
+                languages.print_supported_languages(self.__get_supported_languages())
 
-        elif self.__arguments.action == "info":
-            self.__connector.print_usage_info()
+            elif self.__arguments.action == "info":
+                self.__connector.print_usage_info()
+        finally:
+            self.__connector.close()
 
     @property
     def __license_manager(self) -> license.LicenseManager:
         return self.__arguments.license_manager
 
-    def __get_file_translator(self) -> FileTranslator:
-        extension: str = os.path.splitext(self.__arguments.source_file)[1]
-        handler: handlers.FileHandler = self.__get_handler(extension)
-        translator: translators.Translator = self.__get_translator(extension)
-        return FileTranslator(handler=handler, translator=translator)
+    @property
+    def __incremental(self) -> bool:
+        # * while watching, every save retranslates only the entries that changed
+        return self.__arguments.incremental or self.__arguments.action == "watch"
+
+    def __validate_languages(self) -> None:
+        # * before any file is read, so a typo fails at once and without spending characters
+        supported_languages: languages.SupportedLanguages = (
+            self.__get_supported_languages()
+        )
+
+        for target_lang in self.__arguments.target_langs:
+            target_code: Optional[str] = supported_languages.get_target_code(
+                target_lang
+            )
+            if target_code is None:
+                LanguageError(target_lang, "target")
+            self.__target_langs[target_lang] = target_code
+
+        if self.__arguments.source_lang:
+            source_code: Optional[str] = supported_languages.get_source_code(
+                self.__arguments.source_lang
+            )
+            if source_code is None:
+                LanguageError(self.__arguments.source_lang, "source")
+            self.__source_lang = source_code
+
+    def __get_supported_languages(self) -> languages.SupportedLanguages:
+        # * cached on disk, so only the first run of the day asks DeepL
+        language_cache: languages.LanguageCache = languages.LanguageCache()
+        supported_languages: Optional[
+            languages.SupportedLanguages
+        ] = language_cache.read()
+        if supported_languages is None:
+            supported_languages = self.__connector.get_supported_languages()
+            language_cache.write(supported_languages)
+        return supported_languages
+
+    def __translate(
+        self, source_files: List[str], source_root: Optional[str]
+    ) -> Set[str]:
+        self.__deduplicator = deduplication.Deduplicator()
+        file_translators: List[FileTranslator] = []
+        for source_file in source_files:
+            file_translators.extend(
+                self.__get_file_translators(source_file, source_root)
+            )
+
+        if self.__arguments.max_characters is not None or self.__arguments.dry_run:
+            file_translators = self.__plan(file_translators)
+
+        document_translators: List[FileTranslator] = [
+            file_translator
+            for file_translator in file_translators
+            if isinstance(file_translator.translator, translators.DocumentTranslator)
+        ]
+        other_translators: List[FileTranslator] = [
+            file_translator
+            for file_translator in file_translators
+            if file_translator not in document_translators
+        ]
+
+        document_errors: List[Tuple[FileTranslator, BaseException]] = []
+        if document_translators:
+            document_errors = asyncio.run(
+                self.__translate_documents(document_translators)
+            )
 
-    def __get_handler(self, extension: str) -> handlers.FileHandler:
+        if other_translators:
+            # * every file shares the connector, so they share its connections and its limit of concurrent requests too
+            with ThreadPoolExecutor(
+                max_workers=min(
+                    len(other_translators), self.__arguments.max_concurrent_requests
+                )
+            ) as executor:
+                list(executor.map(self.__translate_file, other_translators))
+            if len(other_translators) > 1 and self.__deduplicator.saved_characters > 0:
+                print(
+                    f"\nDeduplication saved {self.__deduplicator.saved_characters} characters across all files."
+                )
+
+        if document_errors:
+            # * after every other file, one failed document does not abandon the rest
+            print(
+                f"\n{colorama.Fore.RED}{len(document_errors)} of {len(document_translators)} documents were not translated:{colorama.Fore.RESET}"
+            )
+            for file_translator, error in document_errors:
+                print(
+                    f"{file_translator.content} ({file_translator.handler.target_lang}): {error}"
+                )
+            self.__connector.handle_error(document_errors[0][1])
+
+        return {
+            os.path.abspath(file_translator.handler.target_file)
+            for file_translator in file_translators
+        }
+
+    def __plan(self, file_translators: List[FileTranslator]) -> List[FileTranslator]:
+        # * the texts are counted locally, the only request is the one for the remaining quota
+        remaining_characters: Optional[int] = self.__connector.get_remaining_characters()
+        budgets: List[int] = [
+            budget
+            for budget in (self.__arguments.max_characters, remaining_characters)
+            if budget is not None
+        ]
+        budget: Optional[int] = min(budgets) if budgets else None
+
+        translation_planner: planner.Planner = planner.Planner(
+            self.__memory, self.__source_lang, budget
+        )
+        planned_translations: List[planner.PlannedTranslation] = [
+            translation_planner.plan(
+                file_translator.handler.source_file,
+                self.__target_langs[file_translator.handler.target_lang],
+                self.__get_pending_texts(file_translator),
+                deduplicated=isinstance(
+                    file_translator.translator, translators.DictionaryTranslator
+                ),
+            )
+            for file_translator in file_translators
+        ]
+        planner.print_plan(planned_translations, budget, remaining_characters)
+
+        skipped_translations: int = sum(
+            not planned_translation.scheduled
+            for planned_translation in planned_translations
+        )
+        if self.__arguments.dry_run:
+            if skipped_translations:
+                BudgetError(
+                    sum(
+                        planned_translation.characters
+                        for planned_translation in planned_translations
+                    ),
+                    budget,
+                )
+            return []
+
+        if skipped_translations:
+            print(
+                f"{colorama.Fore.YELLOW}{skipped_translations} of {len(file_translators)} translations skipped to stay within the budget.{colorama.Fore.RESET}"
+            )
+        return [
+            file_translator
+            for file_translator, planned_translation in zip(
+                file_translators, planned_translations
+            )
+            if planned_translation.scheduled
+        ]
+
+    def __get_pending_texts(
+        self, file_translator: FileTranslator
+    ) -> Optional[Iterable[str]]:
+        content: Any = file_translator.content
+        if isinstance(file_translator.translator, translators.DocumentTranslator):
+            return None
+        if isinstance(content, handlers.JSONLeaves):
+            return (text for _, text in content)
+        if not isinstance(content, dict):
+            return content
+
+        # * entries already translated by a previous run or kept in the journal are not billed again
+        handler: handlers.FileHandler = file_translator.handler
+        if self.__incremental:
+            previous_translation: Optional[dict] = handler.read_previous()
+            if previous_translation is not None:
+                content = incremental.get_changes(
+                    content, handler.read_snapshot(), previous_translation
+                )
+        if self.__arguments.resume:
+            content, _ = journal.replay(content, file_translator.file_journal.read())
+        return planner.get_texts(content)
+
+    def __watch(self) -> None:
+        source_files: List[str] = self.__get_source_files()
+        output_files: Set[str] = self.__translate(
+            source_files, self.__get_source_root(source_files)
+        )
+
+        # * the directories are watched, editors often save by replacing the file
+        directories: Set[str] = {
+            os.path.dirname(os.path.abspath(source_file))
+            for source_file in source_files
+        }
+        if os.path.isdir(self.__arguments.source_file):
+            directories.add(os.path.abspath(self.__arguments.source_file))
+
+        with watcher.get_watcher(directories) as file_watcher:
+            print(
+                f"\n{colorama.Fore.GREEN}Watching {len(source_files)} files for changes, press Ctrl+C to stop.{colorama.Fore.RESET}"
+            )
+            for changed_files in file_watcher.changes():
+                started: float = time.perf_counter()
+                try:
+                    source_files = self.__get_source_files()
+                    # * the outputs, snapshots, journals and swap files of the editors are not sources
+                    changed_sources: List[str] = [
+                        source_file
+                        for source_file in source_files
+                        if os.path.abspath(source_file) in changed_files
+                        and os.path.abspath(source_file) not in output_files
+                        and not os.path.basename(source_file).startswith(".")
+                    ]
+                    if not changed_sources:
+                        continue
+                    output_files |= self.__translate(
+                        changed_sources, self.__get_source_root(source_files)
+                    )
+                except SystemExit:
+                    # ! a file saved halfway or a failed request must not end the watch
+                    print(
+                        f"{colorama.Fore.YELLOW}Waiting for the next change.{colorama.Fore.RESET}"
+                    )
+                    continue
+                print(
+                    f"{colorama.Fore.GREEN}{len(changed_sources)} changed files translated in {time.perf_counter() - started:.2f}s.{colorama.Fore.RESET}"
+                )
+
+    def __serve(self) -> None:
+        gateway: server.Gateway = server.Gateway(
+            self.__connector,
+            self.__get_supported_languages(),
+            self.__memory,
+            self.__arguments.max_characters,
+        )
+        try:
+            with server.TranslationServer(
+                self.__arguments.port, gateway
+            ) as translation_server:
+                print(
+                    f"{colorama.Fore.GREEN}Serving translations on {translation_server.url}, press Ctrl+C to stop.{colorama.Fore.RESET}"
+                )
+                translation_server.serve_forever()
+        finally:
+            gateway.close()
+
+    def __create_job(self) -> None:
+        job: jobs.Job = jobs.Job(self.__arguments.job_file)
+        try:
+            if job.settings is not None:
+                JobError(
+                    "it already exists, delete it to create a new job",
+                    self.__arguments.job_file,
+                )
+
+            source_files: List[str] = self.__get_source_files()
+            source_texts: List[str] = []
+            for source_file in source_files:
+                extension: str = os.path.splitext(source_file)[1]
+                if extension not in JOB_FILES:
+                    HandlerError(
+                        "Only JSON and PO files can be translated by a job", source_file
+                    )
+                content: dict = self.__get_handler(
+                    source_file, extension, self.__arguments.target_langs[0]
+                ).read()
+                source_texts.extend(
+                    text.strip() for text in planner.get_texts(content) if text.strip()
+                )
+
+            # * each text is sharded once per language, no matter how many files use it
+            texts: List[str] = list(dict.fromkeys(source_texts))
+            target_codes: List[str] = list(dict.fromkeys(self.__target_langs.values()))
+            translations: Dict[str, Dict[str, str]] = {}
+            for target_code in target_codes:
+                translations[target_code] = (
+                    self.__memory.get_many(texts, target_code, self.__source_lang)
+                    if self.__memory
+                    else {}
+                )
+            shards: int = job.create(
+                jobs.JobSettings(
+                    [os.path.abspath(source_file) for source_file in source_files],
+                    self.__target_langs,
+                    self.__source_lang,
+                ),
+                {target_code: texts for target_code in target_codes},
+                translations,
+                self.__arguments.shard_size,
+            )
+        finally:
+            job.close()
+        print(
+            f"{colorama.Fore.GREEN}Job created in {self.__arguments.job_file}: {len(texts)} texts from {len(source_files)} files, {shards} shards to translate.{colorama.Fore.RESET}"
+        )
+
+    def __open_job(self) -> jobs.Job:
+        # * opening a missing job would create an empty one
+        if os.path.isfile(self.__arguments.job_file):
+            job: jobs.Job = jobs.Job(self.__arguments.job_file)
+            if job.settings is not None:
+                return job
+            job.close()
+        JobError("run job-create first", self.__arguments.job_file)
+
+    def __work(self) -> None:
+        job: jobs.Job = self.__open_job()
+        try:
+            retried_shards: int = job.retry_failed()
+            if retried_shards:
+                print(f"{retried_shards} failed shards will be translated again.")
+
+            if self.__arguments.workers == 1:
+                jobs.Worker(job, self.__connector).run()
+            else:
+                self.__run_workers()
+            self.__print_job_progress(job)
+        finally:
+            job.close()
+
+    def __run_workers(self) -> None:
+        # * every worker has its own interpreter and connector, they coordinate only through the job file
+        context: Any = multiprocessing.get_context("spawn")
+        processes: list = [
+            context.Process(
+                target=jobs.run_worker,
+                args=(
+                    self.__arguments.job_file,
+                    self.__license_manager,
+                    self.__arguments.max_concurrent_requests,
+                    output.mode,
+                ),
+            )
+            for _ in range(self.__arguments.workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+    def __print_job_progress(self, job: jobs.Job) -> None:
+        progress: jobs.JobProgress = job.get_progress()
+        print(
+            f"\nShards: {progress.done} done, {progress.pending} pending, {progress.leased} in progress, {progress.failed} failed."
+        )
+        for error in job.get_errors():
+            print(f"{colorama.Fore.YELLOW}{error}{colorama.Fore.RESET}")
+
+    def __merge_job(self) -> None:
+        job: jobs.Job = self.__open_job()
+        try:
+            settings: jobs.JobSettings = job.settings
+            progress: jobs.JobProgress = job.get_progress()
+            if not progress.finished or progress.failed:
+                JobError(
+                    f"{progress.done} of {sum(progress)} shards are done, run job-work until all of them are",
+                    self.__arguments.job_file,
+                )
+            translations: Dict[str, Dict[str, str]] = {
+                target_code: job.get_translations(target_code)
+                for target_code in set(settings.target_langs.values())
+            }
+        finally:
+            job.close()
+
+        # * the next runs find the translations of the job in the memory
+        if self.__memory:
+            for target_code, target_translations in translations.items():
+                self.__memory.set_many(
+                    target_translations, target_code, settings.source_lang
+                )
+
+        for source_file in settings.source_files:
+            source_handler: handlers.FileHandler = self.__get_handler(
+                source_file,
+                os.path.splitext(source_file)[1],
+                next(iter(settings.target_langs)),
+                self.__get_source_root(settings.source_files),
+            )
+            content: dict = source_handler.read()
+            for target_lang, target_code in settings.target_langs.items():
+                translated_content: dict = copy.deepcopy(content)
+                missing_texts: List[str] = jobs.apply_translations(
+                    translated_content, translations[target_code]
+                )
+                source_handler.for_target_lang(target_lang).write(translated_content)
+                if missing_texts:
+                    print(
+                        f"{colorama.Fore.YELLOW}{target_lang}: {len(missing_texts)} entries of {source_file} changed after the job was created, they keep their source text.{colorama.Fore.RESET}"
+                    )
+
+    def __get_source_files(self) -> List[str]:
+        source: str = self.__arguments.source_file
+
+        if os.path.isdir(source):
+            source_files: List[str] = [
+                os.path.join(source, name)
+                for name in os.listdir(source)
+                if os.path.splitext(name)[1] in SUPPORTED_FILES
+            ]
+        elif any(character in source for character in "*?["):
+            source_files = glob.glob(source, recursive=True)
+        else:
+            return [source]
+
+        source_files = sorted(path for path in source_files if os.path.isfile(path))
+        if not source_files:
+            HandlerError("No files found", source)
+        return source_files
+
+    def __get_source_root(self, source_files: List[str]) -> Optional[str]:
+        # * files translated together keep their paths under the directory they share, so files with the same name do not overwrite each other
+        if len(source_files) <= 1:
+            return None
+        return os.path.commonpath(
+            [
+                os.path.dirname(os.path.abspath(source_file))
+                for source_file in source_files
+            ]
+        )
+
+    def __get_file_translators(
+        self, source_file: str, source_root: Optional[str]
+    ) -> List[FileTranslator]:
+        extension: str = os.path.splitext(source_file)[1]
+        target_langs: list = self.__arguments.target_langs
+        source_handler: handlers.FileHandler = self.__get_handler(
+            source_file, extension, target_langs[0], source_root
+        )
+        content: Any = source_handler.read()
+
+        file_translators: List[FileTranslator] = []
+        for target_lang in target_langs:
+            handler: handlers.FileHandler = source_handler.for_target_lang(target_lang)
+            # * only dictionaries are journaled, their entries can be put back one by one
+            file_journal: Optional[journal.Journal] = (
+                journal.Journal(handler.journal_file)
+                if isinstance(content, dict)
+                else None
+            )
+            file_translators.append(
+                FileTranslator(
+                    handler=handler,
+                    translator=self.__get_translator(
+                        extension,
+                        target_lang,
+                        show_progress=len(target_langs) == 1 and source_root is None,
+                        file_journal=file_journal,
+                    ),
+                    content=content,
+                    file_journal=file_journal,
+                )
+            )
+        return file_translators
+
+    def __translate_file(self, file_translator: FileTranslator) -> None:
+        with file_translator.translator:
+            if self.__incremental and isinstance(
+                file_translator.content, dict
+            ):
+                self.__translate_changes(file_translator)
+                return
+
+            content: Any = copy.deepcopy(file_translator.content)
+            translated_content: Any = (
+                self.__translate_dictionary(file_translator, content)
+                if file_translator.file_journal
+                else file_translator.translator.translate(content)
+            )
+            file_translator.handler.write(translated_content)
+            if file_translator.file_journal:
+                file_translator.file_journal.clear()
+
+    def __translate_dictionary(
+        self, file_translator: FileTranslator, content: dict
+    ) -> dict:
+        file_journal: journal.Journal = file_translator.file_journal
+        if not self.__arguments.resume:
+            file_journal.clear()
+            return file_translator.translator.translate(content)
+
+        remaining_content, journaled_translations = journal.replay(
+            content, file_journal.read()
+        )
+        print(
+            f"{file_translator.handler.target_lang}: {incremental.count_leaves(content) - incremental.count_leaves(remaining_content)} entries resumed from the journal."
+        )
+        return incremental.merge(
+            content,
+            journaled_translations,
+            file_translator.translator.translate(remaining_content),
+        )
+
+    def __translate_changes(self, file_translator: FileTranslator) -> None:
+        handler: handlers.FileHandler = file_translator.handler
+        content: dict = copy.deepcopy(file_translator.content)
+        previous_translation: Optional[dict] = handler.read_previous()
+
+        if previous_translation is None:
+            translated_content: dict = self.__translate_dictionary(
+                file_translator, content
+            )
+        else:
+            changes: dict = incremental.get_changes(
+                content, handler.read_snapshot(), previous_translation
+            )
+            print(
+                f"{handler.target_lang}: {incremental.count_leaves(changes)} of {incremental.count_leaves(content)} entries changed since the last run."
+            )
+            translated_content = incremental.merge(
+                content,
+                previous_translation,
+                self.__translate_dictionary(file_translator, changes),
+            )
+
+        handler.write(translated_content)
+        handler.write_snapshot(file_translator.content)
+        file_translator.file_journal.clear()
+
+    async def __translate_documents(
+        self, file_translators: List[FileTranslator]
+    ) -> List[Tuple[FileTranslator, BaseException]]:
+        # * every document is polled from this loop, each one is written as soon as it is ready
+        # * the failed ones are returned, the others are still written and billed
+        semaphore: asyncio.Semaphore = asyncio.Semaphore(
+            self.__arguments.max_concurrent_requests
+        )
+        results: List[Any] = await asyncio.gather(
+            *(
+                self.__translate_document(file_translator, semaphore)
+                for file_translator in file_translators
+            ),
+            return_exceptions=True,
+        )
+        translated: List[Tuple[FileTranslator, TranslatedDocument]] = [
+            (file_translator, result)
+            for file_translator, result in zip(file_translators, results)
+            if not isinstance(result, BaseException)
+        ]
+        if translated:
+            self.__print_billed_characters(
+                [file_translator for file_translator, _ in translated],
+                [document for _, document in translated],
+            )
+        return [
+            (file_translator, result)
+            for file_translator, result in zip(file_translators, results)
+            if isinstance(result, BaseException)
+        ]
+
+    async def __translate_document(
+        self, file_translator: FileTranslator, semaphore: asyncio.Semaphore
+    ) -> TranslatedDocument:
+        async with semaphore:
+            document: TranslatedDocument = await file_translator.translator.translate_async(
+                file_translator.content
+            )
+            await asyncio.get_running_loop().run_in_executor(
+                None, file_translator.handler.write, document.stream
+            )
+        return document
+
+    def __print_billed_characters(
+        self, file_translators: List[FileTranslator], documents: List[TranslatedDocument]
+    ) -> None:
+        print("\nBilled characters:")
+        for file_translator, document in zip(file_translators, documents):
+            billed_characters: str = (
+                str(document.billed_characters)
+                if document.billed_characters is not None
+                else "unknown"
+            )
+            print(
+                f"{file_translator.content} ({file_translator.handler.target_lang}): {billed_characters}"
+            )
+        total: int = sum(document.billed_characters or 0 for document in documents)
+        print(f"Total: {total}")
+
+    def __get_handler(
+        self,
+        source_file: str,
+        extension: str,
+        target_lang: str,
+        source_root: Optional[str] = None,
+    ) -> handlers.FileHandler:
 
         file_handler_options: dict = {
-            "source_file": self.__arguments.source_file,
+            "source_file": source_file,
             "output_directory": self.__arguments.output_directory,
-            "target_lang": self.__arguments.target_lang,
+            "target_lang": target_lang,
+            "source_root": source_root,
         }
 
         if extension in DOCUMENTS_SUPPORTED_BY_DEEPL:
             return handlers.DocumentHandler(**file_handler_options)
 
+        if extension == ".json" and self.__arguments.stream:
+            return handlers.JSONStreamHandler(**file_handler_options)
+
         if extension == ".json":
             return handlers.JSONHandler(**file_handler_options)
 
@@ -78,18 +771,56 @@ class Polyglot:
 
         return handlers.TextHandler(**file_handler_options)
 
-    def __get_translator(self, extension: str) -> translators.Translator:
+    def __get_translator(
+        self,
+        extension: str,
+        target_lang: str,
+        show_progress: bool = True,
+        file_journal: Optional[journal.Journal] = None,
+    ) -> translators.Translator:
 
         translator_options: dict = {
-            "target_lang": self.__arguments.target_lang,
-            "source_lang": self.__arguments.source_lang,
+            "target_lang": self.__target_langs[target_lang],
+            "source_lang": self.__source_lang,
             "connector": self.__connector,
+            "memory": self.__memory,
         }
 
         if extension in DOCUMENTS_SUPPORTED_BY_DEEPL:
             return translators.DocumentTranslator(**translator_options)
 
+        if extension == ".json" and self.__arguments.stream:
+            return translators.StreamTranslator(**translator_options)
+
         if extension == ".json" or extension == ".po" or extension == ".pot":
-            return translators.DictionaryTranslator(**translator_options)
+            return translators.DictionaryTranslator(
+                **translator_options,
+                show_progress=show_progress,
+                deduplicator=self.__deduplicator,
+                journal=file_journal,
+            )
 
         return translators.TextTranslator(**translator_options)
+
+    def __purge_memory(self) -> None:
+        translation_memory: memory.TranslationMemory = memory.TranslationMemory()
+        translation_memory.purge()
+        translation_memory.close()
+        languages.LanguageCache().clear()
+        print("Translation memory purged.")
+
+    def __write_metrics(self) -> None:
+        if not self.__metrics:
+            return
+        if self.__memory:
+            self.__metrics.cache_hits = self.__memory.hits
+            self.__metrics.cache_misses = self.__memory.misses
+        self.__metrics.write(self.__arguments.metrics_file)
+        print(f"Metrics written to {self.__arguments.metrics_file}.")
+
+    def __close_memory(self) -> None:
+        if self.__memory:
+            print(
+                f"Translation memory: {self.__memory.hits} hits, {self.__memory.misses} misses."
+            )
+            self.__memory.close()
@@ -0,0 +1,90 @@
+import asyncio
+import random
+from typing import Awaitable, Callable, TypeVar
+
+Result = TypeVar("Result")
+
+MAX_RETRIES: int = 8
+BACKOFF_BASE: float = 0.5
+BACKOFF_MAX: float = 60.0
+
+
+class AdaptiveScheduler:
+
+    # * AIMD: the limit grows by one request per window of successes and halves when the engine pushes back
+
+    __max_limit: int
+    __min_limit: int
+    __limit: float
+    __in_flight: int
+    __epoch: int
+    __is_retryable: Callable[[Exception], bool]
+    __condition: asyncio.Condition
+
+    def __init__(
+        self,
+        max_concurrent_requests: int,
+        is_retryable: Callable[[Exception], bool],
+        min_concurrent_requests: int = 1,
+    ) -> None:
+        self.__max_limit = max_concurrent_requests
+        self.__min_limit = min(min_concurrent_requests, max_concurrent_requests)
+        self.__limit = float(max_concurrent_requests)
+        self.__in_flight = 0
+        self.__epoch = 0
+        self.__is_retryable = is_retryable
+        self.__condition = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self.__limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self.__in_flight
+
+    async def run(self, request: Callable[[], Awaitable[Result]]) -> Result:
+        retries: int = 0
+        while True:
+            epoch: int = await self.__acquire()
+            try:
+                result: Result = await request()
+            except Exception as error:
+                await self.__release()
+                if not self.__is_retryable(error) or retries >= MAX_RETRIES:
+                    raise
+                await self.__decrease(epoch)
+                await asyncio.sleep(self.__get_backoff(retries))
+                retries += 1
+                continue
+            await self.__release()
+            await self.__increase()
+            return result
+
+    async def __acquire(self) -> int:
+        async with self.__condition:
+            await self.__condition.wait_for(
+                lambda: self.__in_flight < int(self.__limit)
+            )
+            self.__in_flight += 1
+            return self.__epoch
+
+    async def __release(self) -> None:
+        async with self.__condition:
+            self.__in_flight -= 1
+            self.__condition.notify_all()
+
+    async def __increase(self) -> None:
+        async with self.__condition:
+            self.__limit = min(self.__max_limit, self.__limit + 1 / self.__limit)
+            self.__condition.notify_all()
+
+    async def __decrease(self, epoch: int) -> None:
+        # * requests sent before the last decrease already got their share of the blame
+        async with self.__condition:
+            if epoch == self.__epoch:
+                self.__limit = max(self.__min_limit, self.__limit / 2)
+                self.__epoch += 1
+
+    def __get_backoff(self, retries: int) -> float:
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2**retries))
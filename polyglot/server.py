@@ -0,0 +1,270 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from polyglot import connectors, deduplication, languages, memory, metrics, translators
+
+# * the requests for the same languages that arrive within the window are sent together
+BATCH_WINDOW: float = 0.01
+MAX_BODY_BYTES: int = 10 * 1024 * 1024
+
+
+class RequestError(Exception):
+
+    status: int
+
+    def __init__(self, message: str, status: int = 400) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class PendingRequest:
+    texts: List[str]
+    future: Future = field(default_factory=Future)
+
+
+class Gateway:
+
+    # * every client shares the connector, so its connections and its rate limiter see all the requests
+    # * identical texts in flight are sent once, the translated ones are answered by the memory
+
+    __connector: connectors.EngineConnector
+    __memory: Optional[memory.TranslationMemory]
+    __supported_languages: languages.SupportedLanguages
+    __max_characters: Optional[int]
+    __characters: int
+    __deduplicator: deduplication.Deduplicator
+    __translators: Dict[Tuple[str, str], translators.DictionaryTranslator]
+    __pending: Dict[Tuple[str, str], List[PendingRequest]]
+    __lock: threading.Lock
+
+    def __init__(
+        self,
+        connector: connectors.EngineConnector,
+        supported_languages: languages.SupportedLanguages,
+        memory: Optional[memory.TranslationMemory] = None,
+        max_characters: Optional[int] = None,
+    ) -> None:
+        self.__connector = connector
+        self.__memory = memory
+        self.__supported_languages = supported_languages
+        self.__max_characters = max_characters
+        self.__characters = 0
+        self.__deduplicator = deduplication.Deduplicator(keep_translations=False)
+        self.__translators = {}
+        self.__pending = {}
+        self.__lock = threading.Lock()
+        self.__connector.add_listener(self.__count_characters)
+
+    @property
+    def supported_languages(self) -> languages.SupportedLanguages:
+        return self.__supported_languages
+
+    def close(self) -> None:
+        self.__connector.remove_listener(self.__count_characters)
+        with self.__lock:
+            for translator in self.__translators.values():
+                translator.close()
+            self.__translators = {}
+
+    def translate(
+        self, texts: List[str], target_lang: str, source_lang: str = ""
+    ) -> List[str]:
+        key: Tuple[str, str] = self.__get_languages(target_lang, source_lang)
+        # ! checked before the batch is sent, the last batch can go over the budget
+        if (
+            self.__max_characters is not None
+            and self.__characters >= self.__max_characters
+        ):
+            raise RequestError(
+                f"The budget of {self.__max_characters} characters has been spent.", 429
+            )
+        if not texts:
+            return []
+
+        request: PendingRequest = PendingRequest(texts)
+        with self.__lock:
+            batch: List[PendingRequest] = self.__pending.setdefault(key, [])
+            batch.append(request)
+            full: bool = (
+                sum(len(pending_request.texts) for pending_request in batch)
+                >= self.__connector.max_batch_size
+            )
+            if len(batch) == 1 and not full:
+                timer: threading.Timer = threading.Timer(
+                    BATCH_WINDOW, self.__flush, (key, batch)
+                )
+                timer.daemon = True
+                timer.start()
+
+        # * a full batch is sent at once by the request that filled it
+        if full:
+            self.__flush(key, batch)
+        return request.future.result()
+
+    def __get_languages(self, target_lang: str, source_lang: str) -> Tuple[str, str]:
+        target_code: Optional[str] = self.__supported_languages.get_target_code(
+            target_lang
+        )
+        if target_code is None:
+            raise RequestError(f"{target_lang} is not a supported target language.")
+        if not source_lang:
+            return target_code, ""
+        source_code: Optional[str] = self.__supported_languages.get_source_code(
+            source_lang
+        )
+        if source_code is None:
+            raise RequestError(f"{source_lang} is not a supported source language.")
+        return target_code, source_code
+
+    def __flush(self, key: Tuple[str, str], batch: List[PendingRequest]) -> None:
+        with self.__lock:
+            # * already sent by the request that filled it
+            if self.__pending.get(key) is not batch:
+                return
+            del self.__pending[key]
+
+        content: Dict[int, str] = {}
+        for request in batch:
+            for text in request.texts:
+                content[len(content)] = text
+        try:
+            asyncio.run(self.__get_translator(key).translate_async(content))
+        except Exception as error:
+            for request in batch:
+                request.future.set_exception(error)
+            return
+
+        translations: List[str] = list(content.values())
+        offset: int = 0
+        for request in batch:
+            request.future.set_result(
+                translations[offset : offset + len(request.texts)]
+            )
+            offset += len(request.texts)
+
+    def __get_translator(
+        self, key: Tuple[str, str]
+    ) -> translators.DictionaryTranslator:
+        # * one translator for each pair of languages, it can run many translations at once
+        with self.__lock:
+            if key not in self.__translators:
+                target_lang, source_lang = key
+                self.__translators[key] = translators.DictionaryTranslator(
+                    target_lang,
+                    source_lang,
+                    self.__connector,
+                    self.__memory,
+                    show_progress=False,
+                    deduplicator=self.__deduplicator,
+                    show_summary=False,
+                )
+            return self.__translators[key]
+
+    def __count_characters(self, request_metrics: metrics.RequestMetrics) -> None:
+        if request_metrics.error is not None:
+            return
+        with self.__lock:
+            self.__characters += request_metrics.characters
+
+
+class TranslationServer(ThreadingHTTPServer):
+
+    # * bound to localhost only, there is no authentication
+
+    daemon_threads: bool = True
+    # * many build agents can connect at the same time
+    request_queue_size: int = 128
+    gateway: Gateway
+
+    def __init__(self, port: int, gateway: Gateway) -> None:
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.gateway = gateway
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    # * the connections are kept alive, a build agent can send all its requests on one
+    protocol_version: str = "HTTP/1.1"
+    # ! the headers and the body are written apart, with Nagle the body of every answer on a kept connection waits for the delayed ACK of the client
+    disable_nagle_algorithm: bool = True
+    server: TranslationServer
+
+    def do_GET(self) -> None:
+        if self.path != "/languages":
+            self.__send_json({"error": "Not found."}, 404)
+            return
+        supported_languages: languages.SupportedLanguages = (
+            self.server.gateway.supported_languages
+        )
+        self.__send_json(
+            {
+                "source": [
+                    language._asdict() for language in supported_languages.source
+                ],
+                "target": [
+                    language._asdict() for language in supported_languages.target
+                ],
+            }
+        )
+
+    def do_POST(self) -> None:
+        if self.path != "/translate":
+            self.__send_json({"error": "Not found."}, 404)
+            return
+        try:
+            texts, target_lang, source_lang = self.__read_request()
+            translations: List[str] = self.server.gateway.translate(
+                texts, target_lang, source_lang
+            )
+        except RequestError as error:
+            self.__send_json({"error": str(error)}, error.status)
+            return
+        except Exception as error:
+            # * DeepL failed, the client can retry later
+            self.__send_json({"error": f"DeepL error: {error}"}, 502)
+            return
+        self.__send_json({"translations": translations})
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def __read_request(self) -> Tuple[List[str], str, str]:
+        length: int = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            # ! the body is not read, the connection cannot be used again
+            self.close_connection = True
+            raise RequestError("The request is too large.", 413)
+        try:
+            body: Any = json.loads(self.rfile.read(length))
+            texts: Any = body["texts"]
+            target_lang: Any = body["target_lang"]
+            source_lang: Any = body.get("source_lang") or ""
+        except (ValueError, KeyError, TypeError, AttributeError):
+            raise RequestError(
+                'The body must be a JSON object with "texts" and "target_lang".'
+            )
+        if not isinstance(texts, list) or not all(
+            isinstance(text, str) for text in texts
+        ):
+            raise RequestError('"texts" must be a list of strings.')
+        if not isinstance(target_lang, str) or not isinstance(source_lang, str):
+            raise RequestError('"target_lang" and "source_lang" must be strings.')
+        return texts, target_lang, source_lang
+
+    def __send_json(self, body: Any, status: int = 200) -> None:
+        content: bytes = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
@@ -1,14 +1,44 @@
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import re
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 
 from abc import ABC, abstractmethod
-from typing import Any
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import colorama
-import progressbar
+import deepl
 
-from polyglot import connectors
-from polyglot.utils import DownloadedDocumentStream
+from polyglot import (
+    connectors,
+    deduplication,
+    journal,
+    memory,
+    output,
+    placeholders,
+)
+from polyglot.utils import (
+    DownloadedDocumentStream,
+    TranslatedDocument,
+    get_batches,
+    get_payload_size,
+)
+
+SENTENCE_SEPARATOR: re.Pattern = re.compile(r"(?<=[.!?。！？])(\s+)")
+SURROUNDING_SPACES: re.Pattern = re.compile(r"^(\s*)(.*?)(\s*)$", re.DOTALL)
 
 
 class Translator(ABC):
@@ -16,92 +46,585 @@ class Translator(ABC):
     _target_lang: str
     _source_lang: str
     _connector: connectors.EngineConnector
+    _memory: Optional[memory.TranslationMemory]
 
     def __init__(
         self,
         target_lang: str,
         source_lang: str,
         connector: connectors.EngineConnector,
+        memory: Optional[memory.TranslationMemory] = None,
     ) -> None:
         self._target_lang = target_lang
         self._source_lang = source_lang
         self._connector = connector
+        self._memory = memory
 
     @abstractmethod
     def translate(self, content: Any) -> Any:
         pass
 
+    def close(self) -> None:
+        pass
+
+    def _map_batches(
+        self, function: Callable[[list], Any], batches: Iterable[list]
+    ) -> Iterator[Any]:
+        # * the results keep the order of the batches, only a window of requests is kept in memory
+        window: int = self._connector.max_concurrent_requests
+
+        with ThreadPoolExecutor(max_workers=window) as executor:
+            pending: Deque[Future] = deque()
+            for batch in batches:
+                pending.append(executor.submit(function, batch))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _translate_texts(
+        self, texts: List[str], protect_placeholders: bool = False
+    ) -> Dict[str, str]:
+        # * the texts are unique and not blank, a failed translation is an empty string
+        translations: Dict[str, str] = (
+            self._memory.get_many(texts, self._target_lang, self._source_lang)
+            if self._memory
+            else {}
+        )
+
+        plain_texts: List[str] = []
+        protected_texts: List[str] = []
+        for text in texts:
+            if text in translations:
+                continue
+            if protect_placeholders and placeholders.needs_protection(text):
+                protected_texts.append(text)
+            else:
+                plain_texts.append(text)
+        new_translations: Dict[str, str] = {}
+        if plain_texts:
+            new_translations.update(
+                zip(plain_texts, self._request_translations(plain_texts))
+            )
+        if protected_texts:
+            masked_texts: List[placeholders.MaskedText] = placeholders.mask(
+                protected_texts
+            )
+            new_translations.update(
+                zip(
+                    protected_texts,
+                    self._restore_translations(
+                        masked_texts,
+                        self._request_translations(
+                            [masked_text.masked for masked_text in masked_texts],
+                            tag_handling="xml",
+                            ignore_tags=[placeholders.TOKEN_TAG],
+                        ),
+                    ),
+                )
+            )
+
+        if self._memory:
+            self._memory.set_many(
+                {
+                    text: translation
+                    for text, translation in new_translations.items()
+                    if translation
+                },
+                self._target_lang,
+                self._source_lang,
+            )
+        translations.update(new_translations)
+        return translations
+
+    def _request_translations(
+        self,
+        texts: List[str],
+        tag_handling: Optional[str] = None,
+        ignore_tags: Optional[List[str]] = None,
+    ) -> List[str]:
+        return self._check_translations(
+            texts,
+            self._connector.translate_batch(
+                texts, self._target_lang, self._source_lang, tag_handling, ignore_tags
+            ),
+        )
+
+    @staticmethod
+    def _check_translations(texts: List[str], translations: List[str]) -> List[str]:
+        # ! the translations are matched to the texts by position, a short answer would shift them
+        if len(translations) != len(texts):
+            raise deepl.DeepLException(
+                f"{len(translations)} translations received for {len(texts)} texts"
+            )
+        return translations
+
+    @staticmethod
+    def _restore_translations(
+        masked_texts: List[placeholders.MaskedText], translations: List[str]
+    ) -> List[str]:
+        # * a translation that lost a placeholder is discarded, the entry keeps its source text
+        restored_translations: List[str] = []
+        for masked_text, restored_translation in zip(
+            masked_texts, placeholders.restore(translations, masked_texts)
+        ):
+            if restored_translation is None:
+                print(
+                    f'{colorama.Fore.YELLOW}The placeholders of "{masked_text.text}" did not survive the translation.'
+                )
+            restored_translations.append(restored_translation or "")
+        return restored_translations
+
+    def __enter__(self) -> "Translator":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+@dataclass
+class TextSegment:
+    prefix: str
+    text: str
+    suffix: str
+
 
 class TextTranslator(Translator):
-    def translate(self, content: str) -> str:
-        return self._connector.translate(content, self._target_lang, self._source_lang)
+
+    # * the content is translated as a stream, only a window of requests is kept in memory
+
+    def translate(self, content: Iterable[str]) -> Iterator[str]:
+        if isinstance(content, str):
+            content = [content]
+
+        segments: Iterator[TextSegment] = self.__get_segments(content)
+        batches: Iterator[list] = get_batches(
+            segments,
+            lambda segment: segment.text,
+            self._connector.max_batch_size,
+            self._connector.max_batch_bytes,
+        )
+        yield from self._map_batches(self.__translate_batch, batches)
+
+    def __get_segments(self, blocks: Iterable[str]) -> Iterator[TextSegment]:
+        for block in blocks:
+            prefix, text, suffix = SURROUNDING_SPACES.match(block).groups()
+            if get_payload_size(text) <= self._connector.max_batch_bytes:
+                yield TextSegment(prefix, text, suffix)
+            else:
+                sentences: List[TextSegment] = list(self.__split_text(text))
+                sentences[0].prefix = prefix + sentences[0].prefix
+                sentences[-1].suffix += suffix
+                yield from sentences
+
+    def __split_text(self, text: str) -> Iterator[TextSegment]:
+        # * too long for a single request: split at sentences first, then anywhere
+        parts: List[str] = SENTENCE_SEPARATOR.split(text)
+        sentences: Iterator[TextSegment] = (
+            TextSegment("", parts[index], parts[index + 1] if index + 1 < len(parts) else "")
+            for index in range(0, len(parts), 2)
+        )
+        current: Optional[TextSegment] = None
+
+        for sentence in sentences:
+            for piece in self.__split_sentence(sentence):
+                if current is None:
+                    current = piece
+                    continue
+                joined: str = current.text + current.suffix + piece.text
+                if get_payload_size(joined) <= self._connector.max_batch_bytes:
+                    current = TextSegment(current.prefix, joined, piece.suffix)
+                else:
+                    yield current
+                    current = piece
+
+        if current is not None:
+            yield current
+
+    def __split_sentence(self, sentence: TextSegment) -> Iterator[TextSegment]:
+        if get_payload_size(sentence.text) <= self._connector.max_batch_bytes:
+            yield sentence
+            return
+        # * a form-encoded character takes at most 12 bytes
+        size: int = self._connector.max_batch_bytes // 12
+        for start in range(0, len(sentence.text), size):
+            end: int = start + size
+            suffix: str = sentence.suffix if end >= len(sentence.text) else ""
+            yield TextSegment("", sentence.text[start:end], suffix)
+
+    def __translate_batch(self, segments: List[TextSegment]) -> str:
+        texts: List[str] = list(dict.fromkeys(segment.text for segment in segments if segment.text))
+        translations: Dict[str, str] = self._translate_texts(texts)
+
+        return "".join(
+            segment.prefix
+            + (translations.get(segment.text) or segment.text)
+            + segment.suffix
+            for segment in segments
+        )
+
+
+class StreamTranslator(Translator):
+
+    # * translates (path, text) leaves in their order, only a window of requests is kept in memory
+
+    def translate(self, content: Iterable[Tuple[Any, str]]) -> Iterator[str]:
+        batches: Iterator[list] = get_batches(
+            (text for _, text in content),
+            lambda text: text.strip(),
+            self._connector.max_batch_size,
+            self._connector.max_batch_bytes,
+        )
+        for translations in self._map_batches(self.__translate_batch, batches):
+            yield from translations
+
+    def __translate_batch(self, texts: List[str]) -> List[str]:
+        stripped_texts: List[str] = [text.strip() for text in texts]
+        translations: Dict[str, str] = self._translate_texts(
+            [text for text in dict.fromkeys(stripped_texts) if text],
+            protect_placeholders=True,
+        )
+
+        # * like DictionaryTranslator, the translation replaces the whole value and the source is kept when it fails
+        return [
+            translations.get(stripped_text) or text
+            for stripped_text, text in zip(stripped_texts, texts)
+        ]
+
+
+@dataclass
+class DictionaryEntry:
+    dictionary: Union[dict, list]
+    key: Any
+    text: str
+    path: Tuple[Any, ...]
+
+
+@dataclass
+class DictionaryTranslation:
+    # * the state of a single call, so the same translator can run many translations at once
+    progress: output.ProgressReporter
+    completion_count: int = 0
+    saved_characters: int = 0
+    not_translated_entries: List[str] = field(default_factory=list)
 
 
 class DictionaryTranslator(Translator):
 
-    __progress_bar: progressbar.ProgressBar
-    __completion_count: int = 0
-    __not_translated_entries: list = []
+    __show_progress: bool
+    __show_summary: bool
+    __deduplicator: Optional[deduplication.Deduplicator]
+    __journal: Optional[journal.Journal]
+    __executor: Optional[ThreadPoolExecutor]
+    __lock: threading.Lock
 
-    __loop: asyncio.AbstractEventLoop = asyncio.get_event_loop()
-    __futures: list = []
-    __executor: ThreadPoolExecutor = ThreadPoolExecutor(
-        max_workers=30
-    )  # ? I honestly don't know whether it is too much or too little
+    def __init__(
+        self,
+        target_lang: str,
+        source_lang: str,
+        connector: connectors.EngineConnector,
+        memory: Optional[memory.TranslationMemory] = None,
+        show_progress: bool = True,
+        deduplicator: Optional[deduplication.Deduplicator] = None,
+        journal: Optional[journal.Journal] = None,
+        show_summary: bool = True,
+    ) -> None:
+        super().__init__(target_lang, source_lang, connector, memory)
+        self.__show_progress = show_progress
+        self.__show_summary = show_summary
+        self.__deduplicator = deduplicator
+        self.__journal = journal
+        self.__executor = None
+        self.__lock = threading.Lock()
 
     def translate(self, content: dict) -> dict:
-        self.__set_progress_bar(content)
-        self.__populate_futures(content)
-        loop: asyncio.AbstractEventLoop = asyncio.get_event_loop()
-        loop.run_until_complete(self.__translate_dictionary())
-        self.__print_messages()
+        try:
+            return asyncio.run(self.translate_async(content))
+        except Exception as error:
+            self._connector.handle_error(error)
+            return content
+
+    async def translate_async(self, content: dict) -> dict:
+        entries: List[DictionaryEntry] = self.__get_entries(content)
+        translation: DictionaryTranslation = DictionaryTranslation(
+            output.ProgressReporter(
+                len(entries), self._target_lang, self.__show_progress
+            )
+        )
+        entries = await self.__apply_memory(entries, translation)
+
+        # * without a shared deduplicator only the keys of this content are deduplicated
+        deduplicator: deduplication.Deduplicator = (
+            self.__deduplicator or deduplication.Deduplicator()
+        )
+        claim: deduplication.Claim = deduplicator.claim(
+            [entry.text.strip() for entry in entries],
+            self._target_lang,
+            self._source_lang,
+        )
+        translation.saved_characters = claim.saved_characters
+
+        # * released once, the waiters of the other translators get the error or a cancellation
+        error: Optional[Exception] = None
+        try:
+            await self.__translate_entries(
+                self.__group_entries(entries), claim, translation
+            )
+        except Exception as translation_error:
+            error = translation_error
+            raise
+        finally:
+            deduplicator.release(claim, error)
+        self.__print_messages(translation)
         return content
 
-    def __set_progress_bar(self, content: dict) -> None:
-        number_of_translations: int = self.__get_number_of_translations(content)
-        self.__progress_bar = progressbar.ProgressBar(
-            max_value=number_of_translations, redirect_stdout=True
+    def close(self) -> None:
+        with self.__lock:
+            if self.__executor is not None:
+                self.__executor.shutdown()
+                self.__executor = None
+
+    def __get_executor(self) -> ThreadPoolExecutor:
+        # * used for the memory and for connectors that cannot be awaited, it is created on first use
+        with self.__lock:
+            if self.__executor is None:
+                self.__executor = ThreadPoolExecutor(
+                    max_workers=self._connector.max_concurrent_requests
+                )
+            return self.__executor
+
+    async def __run_in_executor(self, function: Callable, *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(
+            self.__get_executor(), function, *args
         )
 
-    def __get_number_of_translations(self, dictionary: dict) -> int:
-        return sum(
-            self.__get_number_of_translations(value) if isinstance(value, dict) else 1
-            for key, value in dictionary.items()
+    def __get_entries(
+        self, container: Union[dict, list], path: Tuple[Any, ...] = ()
+    ) -> List[DictionaryEntry]:
+        # * lists are translated item by item, numbers, booleans, nulls and blank strings are left as they are
+        entries: List[DictionaryEntry] = []
+        items: Iterable = (
+            container.items() if isinstance(container, dict) else enumerate(container)
         )
+        for key, value in items:
+            if isinstance(value, (dict, list)):
+                entries.extend(self.__get_entries(value, (*path, key)))
+            elif isinstance(value, str) and value.strip():
+                entries.append(DictionaryEntry(container, key, value, (*path, key)))
+        return entries
+
+    def __group_entries(
+        self, entries: List[DictionaryEntry]
+    ) -> Dict[str, List[DictionaryEntry]]:
+        grouped_entries: Dict[str, List[DictionaryEntry]] = {}
+        for entry in entries:
+            grouped_entries.setdefault(entry.text.strip(), []).append(entry)
+        return grouped_entries
 
-    def __populate_futures(self, dictionary: dict) -> None:
-        for key, value in dictionary.items():
+    async def __apply_memory(
+        self, entries: List[DictionaryEntry], translation: DictionaryTranslation
+    ) -> List[DictionaryEntry]:
+        if not self._memory:
+            return entries
 
-            if isinstance(value, dict):
-                self.__populate_futures(value)
+        translations: Dict[str, str] = await self.__run_in_executor(
+            self._memory.get_many,
+            [entry.text.strip() for entry in entries],
+            self._target_lang,
+            self._source_lang,
+        )
+        not_memorized_entries: List[DictionaryEntry] = []
+        for entry in entries:
+            memorized_translation: Optional[str] = translations.get(entry.text.strip())
+            if memorized_translation:
+                entry.dictionary[entry.key] = memorized_translation
+            else:
+                not_memorized_entries.append(entry)
 
+        translation.completion_count += len(entries) - len(not_memorized_entries)
+        translation.progress.update(translation.completion_count)
+        return not_memorized_entries
+
+    async def __translate_entries(
+        self,
+        grouped_entries: Dict[str, List[DictionaryEntry]],
+        claim: deduplication.Claim,
+        translation: DictionaryTranslation,
+    ) -> None:
+        # * texts with placeholders or markup are sent apart, only they need the tag handling
+        plain_texts: List[str] = []
+        protected_texts: List[str] = []
+        for text in claim.owned:
+            if placeholders.needs_protection(text):
+                protected_texts.append(text)
             else:
-                self.__futures.append(
-                    self.__loop.run_in_executor(
-                        self.__executor, self.__translate_entry, value, dictionary, key
+                plain_texts.append(text)
+
+        batches = get_batches(
+            plain_texts,
+            lambda text: text,
+            self._connector.max_batch_size,
+            self._connector.max_batch_bytes,
+        )
+        protected_batches = get_batches(
+            placeholders.mask(protected_texts) if protected_texts else [],
+            lambda masked_text: masked_text.masked,
+            self._connector.max_batch_size,
+            self._connector.max_batch_bytes,
+        )
+        tasks: List[asyncio.Future] = [
+            *(
+                asyncio.ensure_future(
+                    self.__translate_batch(batch, claim, grouped_entries, translation)
+                )
+                for batch in batches
+            ),
+            *(
+                asyncio.ensure_future(
+                    self.__translate_protected_batch(
+                        batch, claim, grouped_entries, translation
+                    )
+                )
+                for batch in protected_batches
+            ),
+            *(
+                asyncio.ensure_future(
+                    self.__wait_for_translation(
+                        future, grouped_entries[text], translation
                     )
                 )
+                for text, future in claim.pending.items()
+            ),
+        ]
+        # * the loop may outlive this call, so the requests of a failed translation are not left running
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
 
-    def __translate_entry(self, entry: str, dictionary: dict, key: str) -> None:
-        translation: str = self._connector.translate(
-            entry.strip(), self._target_lang, self._source_lang
+    async def __translate_batch(
+        self,
+        texts: List[str],
+        claim: deduplication.Claim,
+        grouped_entries: Dict[str, List[DictionaryEntry]],
+        translation: DictionaryTranslation,
+    ) -> None:
+        translations: List[str] = await self.__request_translations(texts)
+        await self.__resolve_batch(
+            texts, translations, claim, grouped_entries, translation
+        )
+
+    async def __translate_protected_batch(
+        self,
+        masked_texts: List[placeholders.MaskedText],
+        claim: deduplication.Claim,
+        grouped_entries: Dict[str, List[DictionaryEntry]],
+        translation: DictionaryTranslation,
+    ) -> None:
+        translations: List[str] = await self.__request_translations(
+            [masked_text.masked for masked_text in masked_texts],
+            tag_handling="xml",
+            ignore_tags=[placeholders.TOKEN_TAG],
+        )
+        await self.__resolve_batch(
+            [masked_text.text for masked_text in masked_texts],
+            self._restore_translations(masked_texts, translations),
+            claim,
+            grouped_entries,
+            translation,
         )
-        if not translation:
-            self.__not_translated_entries.append(entry)
-        self.__completion_count += 1
-        self.__progress_bar.update(self.__completion_count)
-        dictionary[key] = translation if translation else entry
 
-    async def __translate_dictionary(self) -> None:
-        await asyncio.gather(*self.__futures)
+    async def __request_translations(
+        self,
+        texts: List[str],
+        tag_handling: Optional[str] = None,
+        ignore_tags: Optional[List[str]] = None,
+    ) -> List[str]:
+        if isinstance(self._connector, connectors.AsyncEngineConnector):
+            translations: List[str] = await self._connector.translate_batch_async(
+                texts, self._target_lang, self._source_lang, tag_handling, ignore_tags
+            )
+        else:
+            translations = await self.__run_in_executor(
+                self._connector.translate_batch,
+                texts,
+                self._target_lang,
+                self._source_lang,
+                tag_handling,
+                ignore_tags,
+            )
+        return self._check_translations(texts, translations)
 
-    def __print_messages(self) -> None:
+    async def __resolve_batch(
+        self,
+        texts: List[str],
+        translations: List[str],
+        claim: deduplication.Claim,
+        grouped_entries: Dict[str, List[DictionaryEntry]],
+        translation: DictionaryTranslation,
+    ) -> None:
+        for text, text_translation in zip(texts, translations):
+            claim.owned[text].set_result(text_translation)
+            self.__apply_translation(
+                grouped_entries[text], text_translation, translation
+            )
+        if self._memory:
+            await self.__run_in_executor(
+                self._memory.set_many,
+                {
+                    text: text_translation
+                    for text, text_translation in zip(texts, translations)
+                    if text_translation
+                },
+                self._target_lang,
+                self._source_lang,
+            )
+
+    async def __wait_for_translation(
+        self,
+        future: Future,
+        entries: List[DictionaryEntry],
+        translation: DictionaryTranslation,
+    ) -> None:
+        self.__apply_translation(entries, await deduplication.wait(future), translation)
+
+    def __apply_translation(
+        self,
+        entries: List[DictionaryEntry],
+        text_translation: str,
+        translation: DictionaryTranslation,
+    ) -> None:
+        for entry in entries:
+            if not text_translation:
+                translation.not_translated_entries.append(entry.text)
+            entry.dictionary[entry.key] = (
+                text_translation if text_translation else entry.text
+            )
+        if self.__journal and text_translation:
+            self.__journal.append(
+                [
+                    journal.JournalRecord(
+                        list(entry.path), entry.text, text_translation
+                    )
+                    for entry in entries
+                ]
+            )
+        translation.completion_count += len(entries)
+        translation.progress.update(translation.completion_count)
+
+    def __print_messages(self, translation: DictionaryTranslation) -> None:
+        if not self.__show_summary:
+            return
         print("\nTranslation completed.")
-        if len(self.__not_translated_entries) > 0:
+        if translation.saved_characters > 0:
+            print(f"Deduplication saved {translation.saved_characters} characters.")
+        if len(translation.not_translated_entries) > 0:
             print(
                 f"{colorama.Fore.YELLOW}\nThe following entries have not been translated:\n"
             )
-            for entry in self.__not_translated_entries:
+            for entry in translation.not_translated_entries:
                 print(f'{colorama.Fore.RESET}"{entry}"\n')
 
 
@@ -110,3 +633,13 @@ class DocumentTranslator(Translator):
         return self._connector.translate_document(
             content, self._target_lang, self._source_lang
         )
+
+    async def translate_async(self, content: str) -> TranslatedDocument:
+        if isinstance(self._connector, connectors.AsyncEngineConnector):
+            return await self._connector.translate_document_async(
+                content, self._target_lang, self._source_lang
+            )
+        stream: DownloadedDocumentStream = await asyncio.get_running_loop().run_in_executor(
+            None, self.translate, content
+        )
+        return TranslatedDocument(stream, None)
@@ -1,8 +1,24 @@
-from typing import Any, Iterator, Optional
+import urllib.parse
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Optional
 import colorama
 
 DownloadedDocumentStream = Optional[Iterator[Any]]
 
+# * here and not in connectors, so the arguments can be parsed without importing the DeepL clients
+# * a ceiling, not a target: the scheduler starts here, halves the limit when DeepL pushes back with 429 or 5xx and grows it again by one request per window of successes
+# * so it only has to be high enough for a fast account, and low enough that the connection and thread pools it sizes stay cheap
+MAX_CONCURRENT_REQUESTS: int = 30
+SERVE_PORT: int = 8765
+JOB_FILE: str = "polyglot_job.sqlite3"
+SHARD_SIZE: int = 500
+
+
+@dataclass
+class TranslatedDocument:
+    stream: DownloadedDocumentStream
+    billed_characters: Optional[int]
+
 
 def get_truncated_text(text: str, limit: int) -> str:
     return text[:limit] + "..." if len(text) > limit else text
@@ -14,3 +30,25 @@ def get_color_by_percentage(percentage: int) -> str:
     if percentage > 50:
         return colorama.Fore.YELLOW
     return colorama.Fore.RESET
+
+
+def get_payload_size(text: str) -> int:
+    # * texts are sent form-encoded, each one as a "&text=" parameter
+    return len(urllib.parse.quote_plus(text)) + len("&text=")
+
+
+def get_batches(
+    items: list, get_text: Callable[[Any], str], max_size: int, max_bytes: int
+) -> Iterator[list]:
+    batch: list = []
+    batch_bytes: int = 0
+    for item in items:
+        item_bytes: int = get_payload_size(get_text(item))
+        if batch and (len(batch) >= max_size or batch_bytes + item_bytes > max_bytes):
+            yield batch
+            batch = []
+            batch_bytes = 0
+        batch.append(item)
+        batch_bytes += item_bytes
+    if batch:
+        yield batch
@@ -0,0 +1,170 @@
+import ctypes
+import os
+import select
+import struct
+import sys
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+# * editors save in bursts: a temporary file, a rename, a change of permissions
+DEBOUNCE_SECONDS: float = 0.2
+POLL_INTERVAL: float = 0.5
+
+# * from sys/inotify.h
+IN_CLOSE_WRITE: int = 0x00000008
+IN_MOVED_TO: int = 0x00000080
+IN_Q_OVERFLOW: int = 0x00004000
+INOTIFY_EVENT: struct.Struct = struct.Struct("iIII")
+
+
+class Watcher(ABC):
+
+    # * the files changed in the given directories, with their absolute paths
+
+    _directories: Set[str]
+
+    def __init__(self, directories: Iterable[str]) -> None:
+        self._directories = {os.path.abspath(directory) for directory in directories}
+
+    def __enter__(self) -> "Watcher":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        pass
+
+    def changes(self) -> Iterator[Set[str]]:
+        while True:
+            changed_files: Set[str] = self.read(None)
+            # * the files are translated once the burst is over, not at its first event
+            while True:
+                burst: Set[str] = self.read(DEBOUNCE_SECONDS)
+                if not burst:
+                    break
+                changed_files |= burst
+            yield changed_files
+
+    @abstractmethod
+    def read(self, timeout: Optional[float]) -> Set[str]:
+        # * waits for changes, an empty set means that the timeout expired
+        pass
+
+    def _list_files(self) -> Set[str]:
+        files: Set[str] = set()
+        for directory in self._directories:
+            try:
+                names: list = os.listdir(directory)
+            except OSError:
+                continue
+            files.update(os.path.join(directory, name) for name in names)
+        return files
+
+
+class InotifyWatcher(Watcher):
+
+    # * Linux only, through the C library, so no dependency is needed
+
+    __descriptor: int
+    __watches: Dict[int, str]
+
+    def __init__(self, directories: Iterable[str]) -> None:
+        super().__init__(directories)
+        libc: ctypes.CDLL = ctypes.CDLL(None, use_errno=True)
+        self.__descriptor = libc.inotify_init1(os.O_CLOEXEC)
+        if self.__descriptor < 0:
+            raise OSError(ctypes.get_errno(), "inotify is not available")
+
+        self.__watches = {}
+        for directory in self._directories:
+            watch: int = libc.inotify_add_watch(
+                self.__descriptor,
+                os.fsencode(directory),
+                IN_CLOSE_WRITE | IN_MOVED_TO,
+            )
+            if watch < 0:
+                error: int = ctypes.get_errno()
+                os.close(self.__descriptor)
+                raise OSError(error, f"Cannot watch {directory}")
+            self.__watches[watch] = directory
+
+    def close(self) -> None:
+        os.close(self.__descriptor)
+
+    def read(self, timeout: Optional[float]) -> Set[str]:
+        ready, _, _ = select.select([self.__descriptor], [], [], timeout)
+        if not ready:
+            return set()
+
+        events: bytes = os.read(self.__descriptor, 64 * 1024)
+        changed_files: Set[str] = set()
+        offset: int = 0
+        while offset < len(events):
+            watch, mask, _, length = INOTIFY_EVENT.unpack_from(events, offset)
+            offset += INOTIFY_EVENT.size
+            name: bytes = events[offset : offset + length].rstrip(b"\0")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                # ! events were lost, every file could have changed
+                return self._list_files()
+            if watch in self.__watches and name:
+                changed_files.add(
+                    os.path.join(self.__watches[watch], os.fsdecode(name))
+                )
+        return changed_files
+
+
+class PollingWatcher(Watcher):
+
+    # * every other platform, the directories are listed again at every interval
+
+    __states: Dict[str, Tuple[int, int]]
+
+    def __init__(self, directories: Iterable[str]) -> None:
+        super().__init__(directories)
+        self.__states = self.__get_states()
+
+    def read(self, timeout: Optional[float]) -> Set[str]:
+        deadline: Optional[float] = (
+            time.monotonic() + timeout if timeout is not None else None
+        )
+        while True:
+            states: Dict[str, Tuple[int, int]] = self.__get_states()
+            changed_files: Set[str] = {
+                path
+                for path, state in states.items()
+                if self.__states.get(path) != state
+            }
+            self.__states = states
+            if changed_files:
+                return changed_files
+            if deadline is None:
+                time.sleep(POLL_INTERVAL)
+                continue
+            remaining: float = deadline - time.monotonic()
+            if remaining <= 0:
+                return set()
+            time.sleep(min(POLL_INTERVAL, remaining))
+
+    def __get_states(self) -> Dict[str, Tuple[int, int]]:
+        states: Dict[str, Tuple[int, int]] = {}
+        for path in self._list_files():
+            try:
+                stat: os.stat_result = os.stat(path)
+            except OSError:
+                continue
+            states[path] = (stat.st_mtime_ns, stat.st_size)
+        return states
+
+
+def get_watcher(directories: Iterable[str]) -> Watcher:
+    directories = list(directories)
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directories)
+        except (OSError, AttributeError):
+            # * no inotify, e.g. in some containers or when the watches are exhausted
+            pass
+    return PollingWatcher(directories)
@@ -26,9 +26,9 @@ setup(
         "Operating System :: OS Independent",
     ],
     python_requires=">=3.8",
-    packages=find_packages(exclude=("tests",)),
+    packages=find_packages(exclude=("tests", "benchmarks")),
     include_package_data=True,
-    install_requires=["requests", "colorama", "polib", "progressbar2", "deepl"],
+    install_requires=["requests", "colorama", "polib", "progressbar2", "deepl>=1.10,<2", "aiohttp"],
     entry_points={
         "console_scripts": [
             "polyglot=polyglot.__main__:main",
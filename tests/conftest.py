@@ -0,0 +1,19 @@
+from typing import Iterator
+
+import pytest
+
+from benchmarks.fake_deepl import FakeDeeplServer
+from polyglot import output
+
+
+@pytest.fixture(autouse=True)
+def quiet_output() -> Iterator[None]:
+    output.set_mode(output.QUIET)
+    yield
+    output.set_mode(output.TEXT)
+
+
+@pytest.fixture
+def fake_server() -> Iterator[FakeDeeplServer]:
+    with FakeDeeplServer(document_seconds=0) as server:
+        yield server
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+from typing import List
+
+import deepl
+import pytest
+
+from benchmarks.fake_deepl import FakeDeeplServer, FakeLicenseManager
+from polyglot import connectors, scheduler
+
+TEXTS: List[str] = [f"Text number {index}" for index in range(20)]
+
+
+def test_retries_unavailable_service(monkeypatch) -> None:
+    monkeypatch.setattr(scheduler, "BACKOFF_BASE", 0.001)
+    with FakeDeeplServer(error_rate=0.3, seed=1) as server:
+        connector: connectors.AsyncDeeplConnector = connectors.AsyncDeeplConnector(
+            FakeLicenseManager(), server_url=server.url
+        )
+        try:
+            translations: List[str] = [
+                connector.translate(text, "IT") for text in TEXTS
+            ]
+            batch_translations: List[str] = asyncio.run(
+                connector.translate_batch_async(TEXTS, "IT")
+            )
+        finally:
+            connector.close()
+
+    assert translations == batch_translations == [f"IT:{text}" for text in TEXTS]
+    assert server.errors["/v2/translate"] > 0
+
+
+def test_retries_document_requests(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(scheduler, "BACKOFF_BASE", 0.001)
+    document = tmp_path / "document.docx"
+    document.write_bytes(b"content")
+    with FakeDeeplServer(document_seconds=0, error_rate=0.3, seed=2) as server:
+        connector: connectors.AsyncDeeplConnector = connectors.AsyncDeeplConnector(
+            FakeLicenseManager(), server_url=server.url
+        )
+        try:
+            translated_document = asyncio.run(
+                connector.translate_document_async(str(document), "IT")
+            )
+            content: bytes = b"".join(translated_document.stream)
+        finally:
+            connector.close()
+
+    assert content == b"translated" * translated_document.billed_characters
+    assert sum(server.errors.values()) > 0
+
+
+def test_does_not_retry_client_errors(monkeypatch) -> None:
+    monkeypatch.setattr(scheduler, "BACKOFF_BASE", 0.001)
+    with FakeDeeplServer(error_rate=1, error_status=400) as server:
+        connector: connectors.AsyncDeeplConnector = connectors.AsyncDeeplConnector(
+            FakeLicenseManager(), server_url=server.url
+        )
+        try:
+            try:
+                asyncio.run(connector.translate_batch_async(TEXTS, "IT"))
+            except Exception as error:
+                assert "Bad request" in str(error)
+            else:
+                raise AssertionError("the request did not fail")
+        finally:
+            connector.close()
+
+    assert server.requests["/v2/translate"] == 1
+
+
+def test_close_stops_the_loop_thread(fake_server: FakeDeeplServer) -> None:
+    threads: int = threading.active_count()
+    connector: connectors.AsyncDeeplConnector = connectors.AsyncDeeplConnector(
+        FakeLicenseManager(), server_url=fake_server.url
+    )
+    assert connector.translate("Hello", "IT") == "IT:Hello"
+    assert threading.active_count() > threads
+
+    connector.close()
+
+    assert threading.active_count() == threads
+
+
+def test_missing_deepl_internals_fail_loudly(
+    monkeypatch, fake_server: FakeDeeplServer
+) -> None:
+    monkeypatch.delattr(deepl.Translator, "_raise_for_status")
+
+    with pytest.raises(SystemExit):
+        connectors.AsyncDeeplConnector(FakeLicenseManager(), server_url=fake_server.url)
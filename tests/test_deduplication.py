@@ -0,0 +1,96 @@
+import asyncio
+from typing import Iterator, List
+
+import pytest
+
+from benchmarks.fake_deepl import FakeDeeplServer, FakeLicenseManager
+from polyglot import connectors, deduplication, translators
+
+
+@pytest.fixture
+def connector(fake_server: FakeDeeplServer) -> Iterator[connectors.AsyncDeeplConnector]:
+    connector = connectors.AsyncDeeplConnector(
+        FakeLicenseManager(), server_url=fake_server.url
+    )
+    yield connector
+    connector.close()
+
+
+async def translate_all(
+    connector: connectors.EngineConnector,
+    deduplicator: deduplication.Deduplicator,
+    contents: List[dict],
+) -> List[dict]:
+    dictionary_translators: List[translators.DictionaryTranslator] = [
+        translators.DictionaryTranslator(
+            "IT",
+            "",
+            connector,
+            show_progress=False,
+            deduplicator=deduplicator,
+            show_summary=False,
+        )
+        for _ in contents
+    ]
+    try:
+        return await asyncio.gather(
+            *(
+                translator.translate_async(content)
+                for translator, content in zip(dictionary_translators, contents)
+            )
+        )
+    finally:
+        for translator in dictionary_translators:
+            translator.close()
+
+
+def test_identical_claims_share_one_request(
+    fake_server: FakeDeeplServer, connector: connectors.AsyncDeeplConnector
+) -> None:
+    deduplicator = deduplication.Deduplicator()
+
+    assert asyncio.run(
+        translate_all(
+            connector,
+            deduplicator,
+            [{"title": "Hello"}, {"header": "Hello", "footer": "Bye"}],
+        )
+    ) == [{"title": "IT:Hello"}, {"header": "IT:Hello", "footer": "IT:Bye"}]
+    assert fake_server.characters == len("Hello") + len("Bye")
+    assert deduplicator.saved_characters == len("Hello")
+
+
+def test_error_is_propagated_to_the_waiters() -> None:
+    deduplicator = deduplication.Deduplicator()
+    owner: deduplication.Claim = deduplicator.claim(["Hello"], "IT")
+    waiter: deduplication.Claim = deduplicator.claim(["Hello"], "IT")
+
+    assert list(waiter.pending) == ["Hello"]
+    deduplicator.release(owner, ValueError("failed"))
+
+    with pytest.raises(ValueError, match="failed"):
+        asyncio.run(deduplication.wait(waiter.pending["Hello"]))
+
+
+def test_released_translations_are_kept() -> None:
+    deduplicator = deduplication.Deduplicator()
+    owner: deduplication.Claim = deduplicator.claim(["Hello"], "IT")
+    owner.owned["Hello"].set_result("Ciao")
+    deduplicator.release(owner)
+
+    claim: deduplication.Claim = deduplicator.claim(["Hello"], "IT")
+
+    assert claim.owned == {}
+    assert claim.pending["Hello"].result() == "Ciao"
+
+
+def test_released_translations_are_dropped_without_keep_translations() -> None:
+    deduplicator = deduplication.Deduplicator(keep_translations=False)
+    owner: deduplication.Claim = deduplicator.claim(["Hello"], "IT")
+    owner.owned["Hello"].set_result("Ciao")
+    deduplicator.release(owner)
+
+    claim: deduplication.Claim = deduplicator.claim(["Hello"], "IT")
+
+    assert list(claim.owned) == ["Hello"]
+    assert claim.pending == {}
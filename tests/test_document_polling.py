@@ -0,0 +1,40 @@
+import asyncio
+from typing import List
+
+from benchmarks.fake_deepl import FakeDeeplServer, FakeLicenseManager
+from polyglot import connectors
+
+DOCUMENTS: int = 5
+DOCUMENT_SECONDS: float = 2.0
+# * a status check right away, then one for each halving of the remaining seconds and the last one
+MAX_STATUS_REQUESTS_PER_DOCUMENT: int = 5
+
+
+def test_status_requests_are_bounded(tmp_path) -> None:
+    paths: List[str] = []
+    for index in range(DOCUMENTS):
+        path = tmp_path / f"document_{index}.docx"
+        path.write_bytes(b"content")
+        paths.append(str(path))
+
+    async def translate_documents(connector: connectors.AsyncDeeplConnector) -> list:
+        return await asyncio.gather(
+            *(connector.translate_document_async(path, "IT") for path in paths)
+        )
+
+    with FakeDeeplServer(document_seconds=DOCUMENT_SECONDS) as server:
+        connector = connectors.AsyncDeeplConnector(
+            FakeLicenseManager(), server_url=server.url
+        )
+        try:
+            documents: list = asyncio.run(translate_documents(connector))
+        finally:
+            connector.close()
+
+    assert all(document.billed_characters for document in documents)
+    assert server.requests["/v2/document"] == DOCUMENTS
+    assert server.requests["/v2/document/result"] == DOCUMENTS
+    assert (
+        server.requests["/v2/document/status"]
+        <= DOCUMENTS * MAX_STATUS_REQUESTS_PER_DOCUMENT
+    )
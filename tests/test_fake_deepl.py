@@ -0,0 +1,19 @@
+import asyncio
+from typing import List
+
+from benchmarks.fake_deepl import FakeDeeplServer, FakeLicenseManager
+from polyglot import connectors
+
+
+def test_blank_texts_keep_their_position(fake_server: FakeDeeplServer) -> None:
+    connector = connectors.AsyncDeeplConnector(
+        FakeLicenseManager(), server_url=fake_server.url
+    )
+    try:
+        translations: List[str] = asyncio.run(
+            connector.translate_batch_async(["One", "", "Three"], "IT")
+        )
+    finally:
+        connector.close()
+
+    assert translations == ["IT:One", "IT:", "IT:Three"]
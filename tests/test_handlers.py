@@ -0,0 +1,116 @@
+import gettext
+import json
+import os
+
+import polib
+
+from polyglot import handlers
+
+
+def test_target_files_keep_their_path_under_the_source_root(tmp_path) -> None:
+    output_directory = tmp_path / "out"
+    output_directory.mkdir()
+    source_root = tmp_path / "src"
+
+    target_files = [
+        handlers.JSONHandler(
+            str(source_root / directory / "messages.json"),
+            str(output_directory),
+            "IT",
+            str(source_root),
+        ).target_file
+        for directory in ("a", "b")
+    ]
+
+    assert target_files == [
+        f"{output_directory}/it/a/messages.json",
+        f"{output_directory}/it/b/messages.json",
+    ]
+    # * nothing is created until a file is written
+    assert os.listdir(output_directory) == []
+
+
+def test_write_creates_the_target_directory(tmp_path) -> None:
+    source_root = tmp_path / "src"
+    (source_root / "a").mkdir(parents=True)
+    (source_root / "a" / "messages.json").write_text('{"title": "Hello"}')
+    handler = handlers.JSONHandler(
+        str(source_root / "a" / "messages.json"), str(tmp_path), "IT", str(source_root)
+    )
+
+    handler.write({"title": "Ciao"})
+
+    with open(tmp_path / "it" / "a" / "messages.json") as target:
+        assert json.load(target) == {"title": "Ciao"}
+
+
+PO_SOURCE: str = r'''msgid ""
+msgstr ""
+"Content-Type: text/plain; charset=UTF-8\n"
+"Plural-Forms: nplurals=2; plural=(n != 1);\n"
+
+#: app.py:1
+msgid "Hello"
+msgstr ""
+
+msgctxt "menu"
+msgid "Open"
+msgstr ""
+
+#, fuzzy
+msgid "Save"
+msgstr "Save file"
+
+msgid "One file"
+msgid_plural "Many files"
+msgstr[0] ""
+msgstr[1] ""
+
+#~ msgid "Gone"
+#~ msgstr "Gone"
+'''
+
+
+def translate_po(content: dict) -> dict:
+    return {
+        key: {index: f"IT:{text}" for index, text in value.items()}
+        if isinstance(value, dict)
+        else f"IT:{value}"
+        for key, value in content.items()
+    }
+
+
+def test_po_round_trip(tmp_path) -> None:
+    source_file = tmp_path / "messages.po"
+    source_file.write_text(PO_SOURCE)
+    handler = handlers.POHandler(str(source_file), str(tmp_path), "IT")
+
+    content: dict = handler.read()
+    handler.write(translate_po(content))
+
+    assert content == {
+        "Hello": "Hello",
+        "menu\x04Open": "Open",
+        "Save": "Save file",
+        "One file": {"0": "One file", "1": "Many files"},
+    }
+    translated = polib.pofile(str(tmp_path / "it.po"))
+    assert translated.metadata["Plural-Forms"] == "nplurals=2; plural=(n != 1);"
+    assert translated.find("Hello").occurrences == [("app.py", "1")]
+    assert translated.find("Open", msgctxt="menu").msgstr == "IT:Open"
+    assert translated.find("Save").flags == ["fuzzy"]
+    assert translated.find("One file").msgstr_plural == {
+        0: "IT:One file",
+        1: "IT:Many files",
+    }
+    assert translated.obsolete_entries()[0].msgstr == "Gone"
+    assert handler.read_previous() == translate_po(content)
+
+    with open(tmp_path / "it.mo", "rb") as mofile:
+        catalog = gettext.GNUTranslations(mofile)
+    assert catalog.gettext("Hello") == "IT:Hello"
+    assert catalog.pgettext("menu", "Open") == "IT:Open"
+    # * fuzzy messages are translated, so they are in the .mo too
+    assert catalog.gettext("Save") == "IT:Save file"
+    assert catalog.ngettext("One file", "Many files", 2) == "IT:Many files"
+    assert catalog.gettext("Gone") == "Gone"
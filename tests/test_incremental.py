@@ -0,0 +1,65 @@
+from polyglot import incremental
+
+SOURCE: dict = {
+    "title": "Hello",
+    "items": ["One", "Two", {"nested": "Three"}],
+    "count": 3,
+    "enabled": True,
+    "missing": None,
+    "blank": " ",
+}
+TARGET: dict = {
+    "title": "Ciao",
+    "items": ["Uno", "Due", {"nested": "Tre"}],
+    "count": 3,
+    "enabled": True,
+    "missing": None,
+    "blank": " ",
+}
+
+
+def test_unchanged_source_has_no_changes() -> None:
+    assert incremental.get_changes(SOURCE, SOURCE, TARGET) == {}
+
+
+def test_changed_list_item_is_keyed_by_index() -> None:
+    source: dict = {**SOURCE, "items": ["One", "2", {"nested": "Three"}]}
+
+    changes: dict = incremental.get_changes(source, SOURCE, TARGET)
+
+    assert changes == {"items": {1: "2"}}
+    assert incremental.count_leaves(changes) == 1
+
+
+def test_new_list_items_are_changes() -> None:
+    source: dict = {**SOURCE, "items": ["One", "Two", {"nested": "Three"}, "Four"]}
+
+    assert incremental.get_changes(source, SOURCE, TARGET) == {"items": {3: "Four"}}
+
+
+def test_merge_keeps_the_shape_of_the_source() -> None:
+    source: dict = {**SOURCE, "items": ["One", "2", {"nested": "Three"}, "Four"]}
+
+    merged: dict = incremental.merge(source, TARGET, {"items": {1: "2!", 3: "Quattro"}})
+
+    assert merged == {
+        **TARGET,
+        "items": ["Uno", "2!", {"nested": "Tre"}, "Quattro"],
+    }
+
+
+def test_count_leaves_skips_non_string_scalars() -> None:
+    assert incremental.count_leaves(SOURCE) == 4
+
+
+def test_entries_kept_in_the_source_language_are_retried() -> None:
+    target: dict = {
+        **TARGET,
+        "title": "Hello",
+        "items": ["Uno", "Two", {"nested": "Tre"}],
+    }
+
+    assert incremental.get_changes(SOURCE, SOURCE, target) == {
+        "title": "Hello",
+        "items": {1: "Two"},
+    }
@@ -0,0 +1,72 @@
+from typing import Iterator
+
+import pytest
+
+from benchmarks.fake_deepl import FakeDeeplServer, FakeLicenseManager
+from polyglot import connectors, jobs
+
+SETTINGS: jobs.JobSettings = jobs.JobSettings(["messages.json"], {"it": "IT"}, "")
+TEXTS: list = [f"Text number {index}" for index in range(5)]
+
+
+@pytest.fixture
+def job(tmp_path) -> Iterator[jobs.Job]:
+    job = jobs.Job(str(tmp_path / "job.sqlite3"))
+    job.create(SETTINGS, {"IT": TEXTS}, {}, shard_size=2)
+    yield job
+    job.close()
+
+
+def test_shards_are_claimed_once(job: jobs.Job) -> None:
+    shards: list = [job.claim("worker"), job.claim("worker"), job.claim("worker")]
+
+    assert [shard.texts for shard in shards] == [TEXTS[0:2], TEXTS[2:4], TEXTS[4:5]]
+    assert job.claim("worker") is None
+    assert job.get_progress() == jobs.JobProgress(pending=0, leased=3, done=0, failed=0)
+
+
+def test_expired_lease_is_claimed_again(monkeypatch, job: jobs.Job) -> None:
+    shard: jobs.Shard = job.claim("dead worker")
+    monkeypatch.setattr(jobs.time, "time", lambda: 10**12)
+
+    assert job.claim("worker").id == shard.id
+    # * the first worker lost its lease, it cannot renew it
+    assert not job.renew(shard, "dead worker")
+    assert job.renew(shard, "worker")
+
+
+def test_failed_shard_is_retried_until_max_attempts(job: jobs.Job) -> None:
+    for _ in range(jobs.MAX_ATTEMPTS):
+        shard: jobs.Shard = job.claim("worker")
+        assert shard.id == 1
+        job.release(shard, "DeepL is down")
+
+    assert job.get_progress().failed == 1
+    assert job.get_errors() == ["DeepL is down"]
+    assert job.retry_failed() == 1
+    assert job.claim("worker").id == 1
+
+
+def test_worker_translates_every_shard(job: jobs.Job) -> None:
+    with FakeDeeplServer() as server:
+        connector = connectors.AsyncDeeplConnector(
+            FakeLicenseManager(), server_url=server.url
+        )
+        try:
+            jobs.Worker(job, connector).run()
+        finally:
+            connector.close()
+
+    assert job.get_progress() == jobs.JobProgress(pending=0, leased=0, done=3, failed=0)
+    assert job.get_translations("IT") == {text: f"IT:{text}" for text in TEXTS}
+
+
+def test_apply_translations_returns_missing_texts() -> None:
+    content: dict = {"a": " Hello ", "b": ["World", 1, ""], "c": "New"}
+
+    missing_texts: list = jobs.apply_translations(
+        content, {"Hello": "Ciao", "World": "Mondo"}
+    )
+
+    assert content == {"a": "Ciao", "b": ["Mondo", 1, ""], "c": "New"}
+    assert missing_texts == ["New"]
@@ -0,0 +1,44 @@
+from polyglot import incremental, journal
+
+CONTENT: dict = {"title": "Hello", "items": ["One", {"nested": "Two"}], "count": 3}
+
+
+def test_replay_follows_list_indexes(tmp_path) -> None:
+    file_journal: journal.Journal = journal.Journal(str(tmp_path / "it.journal"))
+    file_journal.append(
+        [
+            journal.JournalRecord(["items", 0], "One", "Uno"),
+            journal.JournalRecord(["items", 1, "nested"], "Two", "Due"),
+        ]
+    )
+    file_journal.close()
+
+    remaining, translations = journal.replay(CONTENT, file_journal.read())
+
+    assert translations == {"items": {0: "Uno", 1: {"nested": "Due"}}}
+    assert incremental.count_leaves(remaining) == 1
+    assert incremental.merge(CONTENT, translations, {"title": "Ciao"}) == {
+        "title": "Ciao",
+        "items": ["Uno", {"nested": "Due"}],
+        "count": 3,
+    }
+
+
+def test_replay_skips_records_whose_source_changed() -> None:
+    records: list = [journal.JournalRecord(["items", 0], "Uno?", "Uno")]
+
+    remaining, translations = journal.replay(CONTENT, records)
+
+    assert translations == {"items": {}}
+    assert incremental.count_leaves(remaining) == incremental.count_leaves(CONTENT)
+
+
+def test_read_skips_a_cut_last_line(tmp_path) -> None:
+    path = tmp_path / "it.journal"
+    path.write_text(
+        '{"path": ["title"], "source": "Hello", "translation": "Ciao"}\n{"path": ["it'
+    )
+
+    assert journal.Journal(str(path)).read() == [
+        journal.JournalRecord(["title"], "Hello", "Ciao")
+    ]
@@ -0,0 +1,114 @@
+import io
+import json
+from typing import Any, List
+
+import pytest
+
+from polyglot import json_stream
+
+DOCUMENT: str = json.dumps(
+    {
+        "title": "Café \"quoted\" \\ back\\slash\n\ttab",
+        "emoji": "\U0001f600 smile",
+        "numbers": [0, -1.5, 2e10, True, False, None],
+        "nested": [[], {}, [[{"deep": ["a", "b"]}]]],
+        "empty": "",
+    }
+)
+
+
+def get_events(text: str) -> List[Any]:
+    return list(json_stream.iterparse(io.StringIO(text)))
+
+
+def rewrite(text: str) -> str:
+    destination: io.StringIO = io.StringIO()
+    writer: json_stream.JSONStreamWriter = json_stream.JSONStreamWriter(destination)
+    for event, value in json_stream.iterparse(io.StringIO(text)):
+        writer.write(event, value)
+    return destination.getvalue()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 64 * 1024])
+def test_tokens_split_across_chunks_are_read_whole(monkeypatch, chunk_size) -> None:
+    monkeypatch.setattr(json_stream, "CHUNK_SIZE", chunk_size)
+    # * the surrogate pair is escaped, so the chunks can end between its two halves
+    text: str = '["\\ud83d\\ude00", "a\\"b\\\\c\\u00e9", 12.5e-3, true, null]'
+
+    assert list(json_stream.tokenize(io.StringIO(text))) == [
+        ("punctuation", "["),
+        ("string", "\U0001f600"),
+        ("punctuation", ","),
+        ("string", 'a"b\\cé'),
+        ("punctuation", ","),
+        ("scalar", "12.5e-3"),
+        ("punctuation", ","),
+        ("scalar", "true"),
+        ("punctuation", ","),
+        ("scalar", "null"),
+        ("punctuation", "]"),
+    ]
+
+
+def test_events_of_nested_and_empty_containers() -> None:
+    assert get_events('{"a": [[], {}], "b": {"c": "d"}}') == [
+        ("start_map", None),
+        ("map_key", "a"),
+        ("start_array", None),
+        ("start_array", None),
+        ("end_array", None),
+        ("start_map", None),
+        ("end_map", None),
+        ("end_array", None),
+        ("map_key", "b"),
+        ("start_map", None),
+        ("map_key", "c"),
+        ("string", "d"),
+        ("end_map", None),
+        ("end_map", None),
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 64 * 1024])
+def test_written_document_is_the_same_of_json_dumps(monkeypatch, chunk_size) -> None:
+    monkeypatch.setattr(json_stream, "CHUNK_SIZE", chunk_size)
+
+    assert rewrite(DOCUMENT) == json.dumps(json.loads(DOCUMENT), indent=2)
+    assert rewrite("[]") == "[]"
+    assert rewrite('"text"') == '"text"'
+
+
+def test_leaves_are_strings_with_their_path() -> None:
+    assert list(json_stream.iterleaves(io.StringIO(DOCUMENT))) == [
+        (("title",), "Café \"quoted\" \\ back\\slash\n\ttab"),
+        (("emoji",), "\U0001f600 smile"),
+        (("nested", 2, 0, 0, "deep", 0), "a"),
+        (("nested", 2, 0, 0, "deep", 1), "b"),
+        (("empty",), ""),
+    ]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        '{"a": }',
+        "[1,,2]",
+        '{"a" "b"}',
+        '{"a": 1,}',
+        "[1,]",
+        "[1 2]",
+        "{1: 2}",
+        '{"a": 1]',
+        "[}",
+        "]",
+        "[1] [2]",
+        '{"a": 1',
+        '["unterminated]',
+        "[nul]",
+        "[1.]",
+    ],
+)
+def test_malformed_documents_are_rejected(text) -> None:
+    with pytest.raises(json.JSONDecodeError):
+        get_events(text)
@@ -0,0 +1,50 @@
+import sqlite3
+
+from polyglot import memory
+
+
+def count_rows(path: str) -> int:
+    with sqlite3.connect(path) as connection:
+        return connection.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+
+def test_least_recently_used_translations_are_evicted(tmp_path) -> None:
+    path: str = str(tmp_path / "memory.sqlite3")
+    translation_memory = memory.TranslationMemory(path, max_entries=3)
+    translation_memory.set_many({"One": "Uno", "Two": "Due", "Three": "Tre"}, "IT")
+    translation_memory.get("One", "IT")
+    translation_memory.set("Four", "Quattro", "IT")
+
+    assert translation_memory.get_many(["One", "Two", "Three", "Four"], "IT") == {
+        "One": "Uno",
+        "Three": "Tre",
+        "Four": "Quattro",
+    }
+    translation_memory.close()
+    assert count_rows(path) == 3
+
+
+def test_replaced_translations_are_not_counted_again(tmp_path) -> None:
+    path: str = str(tmp_path / "memory.sqlite3")
+    translation_memory = memory.TranslationMemory(path, max_entries=2)
+    translation_memory.set_many({"One": "Uno", "Two": "Due"}, "IT")
+    translation_memory.set_many({"One": "Uno!", "Two": "Due!"}, "IT")
+
+    assert translation_memory.get_many(["One", "Two"], "IT") == {
+        "One": "Uno!",
+        "Two": "Due!",
+    }
+    translation_memory.close()
+
+
+def test_existing_rows_are_counted_when_opened(tmp_path) -> None:
+    path: str = str(tmp_path / "memory.sqlite3")
+    translation_memory = memory.TranslationMemory(path)
+    translation_memory.set_many({"One": "Uno", "Two": "Due", "Three": "Tre"}, "IT")
+    translation_memory.close()
+
+    translation_memory = memory.TranslationMemory(path, max_entries=3)
+    translation_memory.set("Four", "Quattro", "IT")
+    translation_memory.close()
+
+    assert count_rows(path) == 3
@@ -0,0 +1,66 @@
+from typing import List, Optional
+
+from polyglot import placeholders
+
+
+def translate(texts: List[str], *translations: str) -> List[Optional[str]]:
+    masked_texts: List[placeholders.MaskedText] = placeholders.mask(texts)
+    return placeholders.restore(list(translations), masked_texts)
+
+
+def test_placeholders_are_masked_within_their_text() -> None:
+    masked_texts: List[placeholders.MaskedText] = placeholders.mask(
+        ["Hello {name}", "%d of {{total}}"]
+    )
+
+    assert [masked_text.masked for masked_text in masked_texts] == [
+        'Hello <x i="0"/>',
+        '<x i="0"/> of <x i="1"/>',
+    ]
+    assert [masked_text.placeholders for masked_text in masked_texts] == [
+        ["{name}"],
+        ["%d", "{{total}}"],
+    ]
+
+
+def test_reordered_tokens_are_restored() -> None:
+    assert translate(
+        ["%(count)d files in {folder}"], '<x i="1"/> contiene <x i="0"/> file'
+    ) == ["{folder} contiene %(count)d file"]
+
+
+def test_dropped_token_rejects_the_translation() -> None:
+    assert translate(
+        ["Hello {name}", "Bye {name}, {day}"],
+        'Ciao <x i="0"/>',
+        'Addio <x i="1"/>',
+    ) == ["Ciao {name}", None]
+
+
+def test_duplicated_token_rejects_the_translation() -> None:
+    assert translate(["Hello {name}"], 'Ciao <x i="0"/> <x i="0"/>') == [None]
+
+
+def test_unknown_token_rejects_the_translation() -> None:
+    assert translate(["Hello {name}"], 'Ciao <x i="0"/> <x i="1" />') == [None]
+
+
+def test_entities_and_escaped_markup_survive() -> None:
+    texts: List[str] = [
+        "&lt;b&gt;{name}&lt;/b&gt;",
+        "a < b & {name};",
+        "<b>{0}</b> &amp; more",
+    ]
+    masked_texts: List[placeholders.MaskedText] = placeholders.mask(texts)
+
+    assert masked_texts[1].masked == 'a &lt; b &amp; <x i="0"/>;'
+    assert placeholders.restore(
+        [masked_text.masked for masked_text in masked_texts], masked_texts
+    ) == texts
+
+
+def test_text_without_placeholders_is_only_escaped() -> None:
+    assert not placeholders.needs_protection("Plain text, 100% & more")
+    assert translate(
+        ["Plain text, 100% & more"], "Testo semplice, 100% &amp; altro"
+    ) == ["Testo semplice, 100% & altro"]
@@ -0,0 +1,88 @@
+import asyncio
+from typing import Iterator, List
+
+import deepl
+import pytest
+
+from benchmarks.fake_deepl import FakeDeeplServer, FakeLicenseManager
+from polyglot import connectors, memory, translators
+
+
+@pytest.fixture
+def connector(fake_server: FakeDeeplServer) -> Iterator[connectors.AsyncDeeplConnector]:
+    connector = connectors.AsyncDeeplConnector(
+        FakeLicenseManager(), server_url=fake_server.url
+    )
+    yield connector
+    connector.close()
+
+
+def translate(connector: connectors.EngineConnector, content: dict, **options) -> dict:
+    with translators.DictionaryTranslator(
+        "IT", "", connector, show_progress=False, show_summary=False, **options
+    ) as translator:
+        return asyncio.run(translator.translate_async(content))
+
+
+def test_blank_strings_are_not_sent(
+    fake_server: FakeDeeplServer, connector: connectors.AsyncDeeplConnector
+) -> None:
+    content: dict = {"title": "Hello", "empty": "", "spaces": "  ", "items": ["", 1]}
+
+    assert translate(connector, content) == {
+        "title": "IT:Hello",
+        "empty": "",
+        "spaces": "  ",
+        "items": ["", 1],
+    }
+    assert fake_server.characters == len("Hello")
+
+
+def test_cached_file_sends_no_request(
+    tmp_path, fake_server: FakeDeeplServer, connector: connectors.AsyncDeeplConnector
+) -> None:
+    translation_memory = memory.TranslationMemory(str(tmp_path / "memory.sqlite3"))
+    content: dict = {"title": "Hello", "empty": ""}
+    translate(connector, dict(content), memory=translation_memory)
+    fake_server.reset()
+
+    assert translate(connector, dict(content), memory=translation_memory) == {
+        "title": "IT:Hello",
+        "empty": "",
+    }
+    assert fake_server.requests["/v2/translate"] == 0
+    translation_memory.close()
+
+
+class ShortConnector(connectors.DeeplConnector):
+    def translate_batch(self, contents: List[str], *args) -> List[str]:
+        return [f"IT:{text}" for text in contents[1:]]
+
+
+def test_short_answer_raises(fake_server: FakeDeeplServer) -> None:
+    connector = ShortConnector(FakeLicenseManager(), server_url=fake_server.url)
+
+    with pytest.raises(deepl.DeepLException):
+        with translators.DictionaryTranslator(
+            "IT", "", connector, show_progress=False, show_summary=False
+        ) as translator:
+            asyncio.run(translator.translate_async({"a": "One", "b": "Two"}))
+    connector.close()
+
+
+def test_short_answer_raises_while_streaming(fake_server: FakeDeeplServer) -> None:
+    connector = ShortConnector(FakeLicenseManager(), server_url=fake_server.url)
+
+    with pytest.raises(deepl.DeepLException):
+        with translators.StreamTranslator("IT", "", connector) as translator:
+            list(translator.translate([(("a",), "One"), (("b",), "{name} Two")]))
+    connector.close()
+
+
+def test_short_answer_raises_for_texts(fake_server: FakeDeeplServer) -> None:
+    connector = ShortConnector(FakeLicenseManager(), server_url=fake_server.url)
+
+    with pytest.raises(deepl.DeepLException):
+        with translators.TextTranslator("IT", "", connector) as translator:
+            list(translator.translate(["One\n", "Two\n"]))
+    connector.close()